@@ -0,0 +1,132 @@
+//PyJ2D - Copyright (C) 2011 James Garnon <https://gatc.ca/>
+//Released under the MIT License <https://opensource.org/licenses/MIT>
+
+import javax.sound.sampled.AudioFormat;
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+import java.nio.ShortBuffer;
+import java.util.Random;
+
+
+public class MixerBench {
+
+    /**
+    * MixerBench times the mixing throughput of pyj2d.Mixer by channel
+    * count, with the previous double accumulator mixing as reference.
+    * Compile from package root with 'javac -cp . bench/MixerBench.java'
+    * and run with 'java -cp .:bench MixerBench'.
+    */
+    static final int BUFFER = 4096;
+    static final int REPEAT = 5;
+    static final int ITERATIONS = 2000;
+    static final int[] CHANNELS = {1, 2, 4, 8, 16, 32};
+
+    public static void main(String[] args) {
+        AudioFormat audioFormat = new AudioFormat(AudioFormat.Encoding.PCM_SIGNED,
+                                                  22050f, 16, 2, 4, 22050f, false);
+        pyj2d.Mixer mixer = new pyj2d.Mixer(audioFormat, BUFFER);
+        int buffer = mixer.getBufferSize();
+        double bufferTime = buffer / (audioFormat.getSampleRate() * audioFormat.getFrameSize()) * 1000.0;
+        byte[][] data = new byte[CHANNELS[CHANNELS.length-1]][buffer];
+        Random random = new Random(1);
+        for (int i = 0; i < data.length; i++)
+            random.nextBytes(data[i]);
+        byte[] byteArray = new byte[buffer];
+        Reference reference = new Reference(buffer);
+        System.out.println("Benchmark Mixer (buffer " + buffer + " bytes, "
+                           + String.format("%.2f", bufferTime) + " ms)");
+        for (int c = 0; c < CHANNELS.length; c++) {
+            int channels = CHANNELS[c];
+            double time = bench(mixer, null, data, channels, byteArray, buffer);
+            report("mix_channels_" + channels, time, bufferTime);
+            time = bench(null, reference, data, channels, byteArray, buffer);
+            report("mix_channels_" + channels + "_reference", time, bufferTime);
+            }
+        mixer.quit();
+        }
+
+    static double bench(pyj2d.Mixer mixer, Reference reference, byte[][] data,
+                        int channels, byte[] byteArray, int buffer) {
+        double timeMin = Double.MAX_VALUE;
+        for (int r = 0; r < REPEAT; r++) {
+            long start = System.nanoTime();
+            for (int n = 0; n < ITERATIONS; n++) {
+                for (int i = 0; i < channels; i++) {
+                    if (mixer != null)
+                        mixer.setAudioData(data[i], buffer, 0.8f, 0.6f);
+                    else
+                        reference.setAudioData(data[i], buffer, 0.8f, 0.6f);
+                    }
+                if (mixer != null)
+                    mixer.getAudioData(byteArray);
+                else
+                    reference.getAudioData(byteArray);
+                }
+            double time = (System.nanoTime() - start) / 1000000.0 / ITERATIONS;
+            if (time < timeMin)
+                timeMin = time;
+            }
+        return timeMin;
+        }
+
+    static void report(String name, double time, double bufferTime) {
+        System.out.println(String.format("Bench %-45s min %8.4f ms/buffer  realtime %8.1fx",
+                                         name, time, bufferTime / time));
+        }
+
+    /**
+    * Reference of previous mixing with double accumulator and separate
+    * level check, correction, conversion and reset passes.
+    */
+    static class Reference {
+
+        double[] data;
+        int dataLen;
+        int sampleMax = 32767;
+        int sampleMin = -32768;
+        int[] shift = new int[] {0,8};
+
+        Reference(int buffer) {
+            this.data = new double[buffer/2];
+            }
+
+        void setAudioData(byte[] data, int dataLen, float lvolume, float rvolume) {
+            ShortBuffer dataBuffer = ByteBuffer.wrap(data).order(ByteOrder.LITTLE_ENDIAN).asShortBuffer();
+            for (int i = 0; i < dataLen/2; i+=2) {
+                this.data[i] += (double) (dataBuffer.get(i) * lvolume);
+                this.data[i+1] += (double) (dataBuffer.get(i+1) * rvolume);
+                }
+            if (dataLen > this.dataLen)
+                this.dataLen = dataLen;
+            }
+
+        int getAudioData(byte[] byteArray) {
+            double xmax = (double) this.sampleMax;
+            double xmin = (double) this.sampleMin;
+            for (int i = 0; i < this.dataLen/2; i++) {
+                if (this.data[i] > xmax)
+                    xmax = this.data[i];
+                else if (this.data[i] < xmin)
+                    xmin = this.data[i];
+                }
+            if (Math.abs(xmin)-1 > xmax)
+                xmax = (double) Math.abs(xmin)-1;
+            if (xmax > this.sampleMax) {
+                float correction = (float) (this.sampleMax/xmax);
+                for (int i = 0; i < this.dataLen/2; i++)
+                    this.data[i] = (double) this.data[i] * correction;
+                }
+            int pos = 0;
+            for (int i = 0; i < this.dataLen/2; i++) {
+                byteArray[pos] = (byte) ((int) (this.data[i])>>this.shift[0] & 0xff);
+                byteArray[pos+1] = (byte) ((int) (this.data[i])>>this.shift[1] & 0xff);
+                pos += 2;
+                }
+            for (int i = 0; i < this.dataLen/2; i++)
+                this.data[i] = 0;
+            int dataLen = this.dataLen;
+            this.dataLen = 0;
+            return dataLen;
+            }
+        }
+    }
@@ -0,0 +1,111 @@
+"""
+Libbench
+
+Check doc/libbench.txt for information.
+"""
+
+
+import os, sys, time
+
+if os.name == 'java':
+    import pyj2d as pg
+    platform = 'jvm'
+    executor = 'jython'
+    library = 'pyj2d'
+    from java.lang import Thread
+    from java.lang.management import ManagementFactory
+else:
+    os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+    import pygame as pg
+    platform = 'pc'
+    executor = 'python'
+    library = 'pygame'
+
+from bench import sprite_bench
+from bench import transform_bench
+from bench import surfarray_bench
+
+
+lib_bench = [sprite_bench, transform_bench, surfarray_bench]
+
+
+lib_bench_name = {'sprite_bench': sprite_bench,
+                  'transform_bench': transform_bench,
+                  'surfarray_bench': surfarray_bench}
+
+
+env = {}
+benches = []
+bench_repeat = 5
+
+
+def _time():
+    return time.time() * 1000.0
+
+
+def _allocated():
+    #bytes allocated by thread, None if not available
+    if platform != 'jvm':
+        return None
+    try:
+        thread_bean = ManagementFactory.getThreadMXBean()
+        return thread_bean.getThreadAllocatedBytes(
+                                    Thread.currentThread().getId())
+    except (AttributeError, TypeError):
+        return None
+
+
+def bench_init():
+    pg.init()
+    env['pg'] = pg
+    env['platform'] = platform
+    env['executor'] = executor
+    env['library'] = library
+    for bch in lib_bench:
+        bench_list = bch.init(env)
+        benches.extend(bench_list)
+
+
+def run_bench(bench):
+    times = []
+    allocs = []
+    try:
+        for i in range(bench_repeat):
+            alloc_i = _allocated()
+            time_i = _time()
+            bench()
+            times.append(_time() - time_i)
+            if alloc_i is not None:
+                allocs.append(_allocated() - alloc_i)
+    except NotImplementedError:
+        print('Bench %-45s %24s' % (bench.__name__, 'skipped'))
+        return
+    time_min = min(times)
+    time_ave = sum(times) / len(times)
+    if allocs:
+        alloc_ave = sum(allocs) / len(allocs) / 1024.0
+        print('Bench %-45s min %8.2f ms  ave %8.2f ms  alloc %10.1f KB'
+              % (bench.__name__, time_min, time_ave, alloc_ave))
+    else:
+        print('Bench %-45s min %8.2f ms  ave %8.2f ms'
+              % (bench.__name__, time_min, time_ave))
+
+
+def main(benches_selected=None, repeat=None):
+    global bench_repeat
+    if benches_selected is not None:
+        if isinstance(benches_selected, list) and len(benches_selected) > 0:
+            lib_bench[:] = []
+            for bch in benches_selected:
+                lib_bench.append(lib_bench_name[bch])
+    if repeat:
+        bench_repeat = repeat
+    bench_init()
+    print('Benchmark %s (%s)' % (library, executor))
+    for bench in benches:
+        run_bench(bench)
+    pg.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import random
+
+env = None
+pg = None
+sprites = None
+order = None
+
+
+def init(environ):
+    global env, pg, sprites, order
+    env = environ
+    pg = env['pg']
+    sprites = [pg.sprite.Sprite() for i in range(10000)]
+    order = list(range(len(sprites)))
+    random.Random(1).shuffle(order)
+    benches = [bench_orderedupdates_add_remove,
+               bench_list_add_remove,
+               bench_layeredupdates_change_layer,
+               bench_groupcollide,
+               bench_layeredupdates_get_sprites_at,
+               bench_layeredupdates_get_sprites_at_index]
+    return benches
+
+
+def bench_orderedupdates_add_remove():
+    group = pg.sprite.OrderedUpdates()
+    for sprite in sprites:
+        group.add(sprite)
+    for i in order:
+        group.remove(sprites[i])
+    assert len(group) == 0
+
+
+def bench_list_add_remove():
+    #reference of previous OrderedUpdates list removal
+    spritelist = []
+    for sprite in sprites:
+        spritelist.append(sprite)
+    for i in order:
+        spritelist.remove(sprites[i])
+    assert len(spritelist) == 0
+
+
+def bench_layeredupdates_change_layer():
+    group = pg.sprite.LayeredUpdates()
+    for i in range(5000):
+        group.add(sprites[i], layer=i%20)
+    for i in range(5000):
+        group.change_layer(sprites[order[i]%5000], i%20)
+    for sprite in group:
+        pass
+
+
+def bench_groupcollide():
+    group1 = pg.sprite.Group()
+    group2 = pg.sprite.Group()
+    for i in range(2000):
+        sprite = sprites[i]
+        sprite.rect = pg.Rect((order[i]*7)%4000, (i*13)%600,
+                              4+(i%5)*4, 4+(i%5)*4)
+        if i % 4:
+            group1.add(sprite)
+        else:
+            group2.add(sprite)
+    for frame in range(10):
+        for sprite in group1:
+            sprite.rect.x += 2
+        pg.sprite.groupcollide(group1, group2, False, False)
+
+
+def _get_sprites_at(index):
+    group = pg.sprite.LayeredUpdates()
+    for i in range(10000):
+        sprite = sprites[i]
+        sprite.rect = pg.Rect((order[i]*7)%4000, (i*13)%2000, 16, 16)
+        group.add(sprite, layer=i%20)
+    if index:
+        if not hasattr(group, 'set_index'):
+            raise NotImplementedError
+        group.set_index(True)
+    for i in range(200):
+        group.get_sprites_at(((i*97)%4000, (i*31)%2000))
+
+
+def bench_layeredupdates_get_sprites_at():
+    _get_sprites_at(False)
+
+
+def bench_layeredupdates_get_sprites_at_index():
+    _get_sprites_at(True)
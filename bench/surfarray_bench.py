@@ -0,0 +1,56 @@
+env = None
+pg = None
+surface = None
+implemented = None
+
+
+def init(environ):
+    global env, pg, surface, implemented
+    env = environ
+    pg = env['pg']
+    surface = pg.Surface((640,480), pg.SRCALPHA)
+    for i in range(0, 640, 16):
+        surface.fill((i%256,(i*3)%256,(i*7)%256,255), (i,0,16,480))
+    try:
+        pg.surfarray.array2d(pg.Surface((1,1)))
+        implemented = True
+    except:
+        implemented = False
+    benches = [bench_surfarray_array2d,
+               bench_surfarray_array3d,
+               bench_surfarray_array_alpha,
+               bench_surfarray_blit_array2d,
+               bench_surfarray_blit_array3d]
+    return benches
+
+
+def bench_surfarray_array2d():
+    if not implemented:
+        raise NotImplementedError
+    array = pg.surfarray.array2d(surface)
+
+
+def bench_surfarray_array3d():
+    if not implemented:
+        raise NotImplementedError
+    array = pg.surfarray.array3d(surface)
+
+
+def bench_surfarray_array_alpha():
+    if not implemented:
+        raise NotImplementedError
+    array = pg.surfarray.array_alpha(surface)
+
+
+def bench_surfarray_blit_array2d():
+    if not implemented:
+        raise NotImplementedError
+    array = pg.surfarray.array2d(surface)
+    pg.surfarray.blit_array(surface, array)
+
+
+def bench_surfarray_blit_array3d():
+    if not implemented:
+        raise NotImplementedError
+    array = pg.surfarray.array3d(surface)
+    pg.surfarray.blit_array(surface, array)
@@ -0,0 +1,134 @@
+env = None
+pg = None
+surface = None
+dest = None
+surface_1024 = None
+dest_1024 = None
+
+
+def init(environ):
+    global env, pg, surface, dest, surface_1024, dest_1024
+    env = environ
+    pg = env['pg']
+    surface = pg.Surface((64,64), pg.SRCALPHA)
+    surface.fill((255,0,0,255), (0,0,32,64))
+    dest = pg.Surface((192,192), pg.SRCALPHA)
+    surface_1024 = pg.Surface((1024,1024), pg.SRCALPHA)
+    dest_1024 = pg.Surface((1024,1024), pg.SRCALPHA)
+    for i in range(0, 1024, 32):
+        surface_1024.fill((255,i//4,0,255), (i,i,32,1024-i))
+    benches = [bench_rotate,
+               bench_rotate_dest,
+               bench_rotozoom,
+               bench_rotozoom_dest,
+               bench_flip,
+               bench_flip_dest,
+               bench_flip_1024,
+               bench_flip_dest_1024,
+               bench_scale2x_1024,
+               bench_scale_1024,
+               bench_scale_quality_fast,
+               bench_scale_quality_balanced,
+               bench_scale_quality_quality,
+               bench_smoothscale_quality_quality,
+               bench_transform_serial,
+               bench_transform_batch]
+    return benches
+
+
+def bench_rotate():
+    for i in range(1000):
+        surf = pg.transform.rotate(surface, i%360)
+
+
+def bench_rotate_dest():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    for i in range(1000):
+        surf = pg.transform.rotate(surface, i%360, dest)
+
+
+def bench_rotozoom():
+    for i in range(1000):
+        surf = pg.transform.rotozoom(surface, i%360, 2.0)
+
+
+def bench_rotozoom_dest():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    for i in range(1000):
+        surf = pg.transform.rotozoom(surface, i%360, 2.0, dest)
+
+
+def bench_flip():
+    for i in range(1000):
+        surf = pg.transform.flip(surface, True, i%2)
+
+
+def bench_flip_dest():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    surf = dest.subsurface((0,0,64,64))
+    for i in range(1000):
+        pg.transform.flip(surface, True, i%2, surf)
+
+
+def bench_flip_1024():
+    for xbool, ybool in ((True,False), (False,True), (True,True)):
+        surf = pg.transform.flip(surface_1024, xbool, ybool)
+
+
+def bench_flip_dest_1024():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    for xbool, ybool in ((True,False), (False,True), (True,True)):
+        pg.transform.flip(surface_1024, xbool, ybool, dest_1024)
+
+
+def bench_scale2x_1024():
+    surf = pg.transform.scale2x(surface_1024)
+
+
+def bench_scale_1024():
+    #reference of previous scale2x bilinear scale
+    surf = pg.transform.scale(surface_1024, (2048,2048))
+
+
+def _bench_scale_quality(quality):
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    for i in range(10):
+        surf = pg.transform.scale(surface_1024, (600,600), quality=quality)
+
+
+def bench_scale_quality_fast():
+    _bench_scale_quality('fast')
+
+
+def bench_scale_quality_balanced():
+    _bench_scale_quality('balanced')
+
+
+def bench_scale_quality_quality():
+    _bench_scale_quality('quality')
+
+
+def bench_smoothscale_quality_quality():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    for i in range(10):
+        surf = pg.transform.smoothscale(surface_1024, (600,600),
+                                        quality='quality')
+
+
+def bench_transform_serial():
+    #reference of serial transform of sprite sheet variants
+    for i in range(360):
+        surf = pg.transform.rotozoom(surface, i, 1.5)
+
+
+def bench_transform_batch():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    jobs = [(pg.transform.rotozoom, surface, i, 1.5) for i in range(360)]
+    surfs = pg.transform.batch(jobs)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+
+"""
+Libbench
+
+Check doc/libbench.txt for information.
+
+
+benches = ['sprite_bench',
+           'transform_bench',
+           'surfarray_bench']
+"""
+
+
+benches = []    #bench specific module if added to benches list, default all
+repeat = 5    #number of runs of each bench, minimum and average time reported
+
+
+import sys
+sys.dont_write_bytecode = True
+
+from bench import libbench
+
+libbench.main(benches, repeat)
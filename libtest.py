@@ -17,7 +17,8 @@ tests = ['surface_test',
          'sprite_test',
          'event_test',
          'time_test',
-         'vector_test']
+         'vector_test',
+         'mixer_test']
 """
 
 
@@ -9,28 +9,166 @@ import javax.sound.sampled.DataLine;
 import javax.sound.sampled.AudioFormat;
 import javax.sound.sampled.LineUnavailableException;
 import javax.sound.sampled.UnsupportedAudioFileException;
+import java.beans.PropertyChangeEvent;
+import java.beans.PropertyChangeListener;
+import javax.sound.sampled.AudioInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.OutputStream;
+import java.io.RandomAccessFile;
+import java.net.URL;
+import java.nio.Buffer;
 import java.nio.ByteBuffer;
 import java.nio.ByteOrder;
 import java.nio.ShortBuffer;
+import java.nio.channels.FileChannel;
+import java.util.ArrayList;
+import java.util.Comparator;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.TreeSet;
 
 
-public class Mixer {
+public class Mixer implements Runnable, Comparator {
 
     AudioFormat audioFormat;
     int buffer;
+    int period;
+    volatile boolean lowLatency;
+    int latencyTarget;
+    int latencyStable;
+    double latency;
     int sampleByte;
     int sampleMax;
-    int sampleMin;
-    ByteOrder endian;
-    int[] shift;
-    double[] data;
+    boolean signed;
+    boolean bigEndian;
+    int channels;
+    int[] data;
+    byte[] dataArray;
+    ShortBuffer dataView;
+    byte[] outputArray;
+    ShortBuffer outputView;
     int dataLen;
     SourceDataLine line;
+    boolean offline;
+    boolean realtime;
+    RandomAccessFile outputFile;
+    AudioFormat outputFormat;
+    OutputStream outputStream;
+    long outputLen;
+    long outputStart;
+    int frameSize;
+    double byteRate;
+    byte[] byteArray;
+    int channelNum;
+    int[] channelState;
+    int[] channelCount;
+    Object[] channelSource;
+    Object[] channelQueue;
+    byte[][] channelData;
+    int[] channelPosition;
+    InputStream[] channelStream;
+    byte[][] channelBuffer;
+    ShortBuffer[] channelDataView;
+    ShortBuffer[] channelBufferView;
+    ByteBuffer[] channelMap;
+    ShortBuffer[] channelMapView;
+    Object[] channelMapSource;
+    int[] channelLoops;
+    long[] channelPlayed;
+    long[] channelMaxtime;
+    long[] channelFadein;
+    long[] channelFadeout;
+    long[] channelFadeoutLength;
+    float[] channelFade;
+    float[] channelLvolume;
+    float[] channelRvolume;
+    float[] channelSoundVolume;
+    boolean[] channelPositional;
+    float[] channelX;
+    float[] channelY;
+    float[] channelPanLvolume;
+    float[] channelPanRvolume;
+    int[] channelLgain;
+    int[] channelRgain;
+    int[] channelPriority;
+    long[] channelStart;
+    long playSequence;
+    TreeSet voices = new TreeSet(this);
+    TreeSet reservedVoices = new TreeSet(this);
+    int reservedNum;
+    int stealPolicy = OLDEST;
+    boolean[] channelEffect;
+    double[][] channelFilter;
+    double[][] channelDelay;
+    float[][] channelDelayBuffer;
+    int[] channelDelayPosition;
+    int[] channelTail;
+    boolean[] channelSidechain;
+    float[] channelDuck;
+    float[] channelDuckVolume;
+    int[] effectData;
+    double[] masterFilter;
+    double[] reverb;
+    float[][] reverbBuffer;
+    int[] reverbPosition;
+    double[] reverbStore;
+    int effectTail;
+    double compressorThreshold = 1.0;
+    double compressorRatio = 1.0;
+    double compressorRelease = 100.0;
+    double compressorGain = 1.0;
+    double duckThreshold = 0.05;
+    double duckAttack = 10.0;
+    double duckRelease = 300.0;
+    double duckLevel;
+    int sidechainPeak;
+    float listenerX;
+    float listenerY;
+    int attenuationModel = INVERSE;
+    float minDistance = 1.0f;
+    float maxDistance = 1000.0f;
+    float rolloff = 1.0f;
+    ArrayList channelEvents;
+    byte[] mixSource;
+    ShortBuffer mixView;
+    int mixOffset;
+    float mixLvolume;
+    float mixRvolume;
+    PropertyChangeListener listener;
+    volatile boolean running;
+    boolean writing;
+    int underruns;
+    static final int IDLE = 0;
+    static final int PLAYING = 1;
+    static final int PAUSED = 2;
+    static final int LOW_LATENCY_FRAMES = 128;
+    public static final int LINEAR = 0;
+    public static final int INVERSE = 1;
+    public static final int EXPONENTIAL = 2;
+    public static final int OLDEST = 0;
+    public static final int PRIORITY = 1;
+    public static final int QUIETEST = 2;
+    public static final int LOWPASS = 1;
+    public static final int HIGHPASS = 2;
+    public static final int BANDPASS = 3;
+    static final double SMOOTH_TIME = 50.0;
+    static final int[] REVERB_TUNING = {1116, 1188, 1277, 1356, 556, 441};
+    static final int LOW_LATENCY_STABLE = 400;
+    static LinkedHashMap soundCache = new LinkedHashMap(16, 0.75f, true);
+    static long soundCacheSize = 0;
+    static long soundCacheLimit = 64L * 1024 * 1024;
 
     /**
      * Mixer combines multiple audio data input to a single output. Can operate
      * with javax.sound.sampled, input obtained from an AudioInputStream and
-     * output directed to a SourceDataLine. Supports PCM 16-bit audio format.
+     * output directed to a SourceDataLine. Supports PCM 8-bit and 16-bit
+     * audio format, signed or unsigned. Audio data is mixed in an int
+     * accumulator with fixed-point volume.
+     * Run on a thread, the mixer processes channels of sound data with
+     * volume, fade, loop, maxtime and queue until quit.
      * Argument audioFormat and buffer are the AudioFormat and buffer size to 
      * initialize the mixer and the SourceDataLine.
      */
@@ -39,16 +177,23 @@ public class Mixer {
         this.buffer = buffer;
         this.sampleByte = audioFormat.getSampleSizeInBits() == 16 ? 2 : 1;
         this.sampleMax = audioFormat.getSampleSizeInBits() == 16 ? 32767 : 127;
-        this.sampleMin = audioFormat.getSampleSizeInBits() == 16 ? -32768 : -128;
-        this.endian = !audioFormat.isBigEndian() ? ByteOrder.LITTLE_ENDIAN : ByteOrder.BIG_ENDIAN;
-        this.shift = !audioFormat.isBigEndian() ? new int[] {0,8} : new int[] {8,0};
+        this.signed = !AudioFormat.Encoding.PCM_UNSIGNED.equals(audioFormat.getEncoding());
+        this.bigEndian = audioFormat.isBigEndian();
+        this.channels = audioFormat.getChannels();
         this.line = getLine(this.audioFormat, this.buffer);
         if (this.line == null)
             this.line = getLine(this.audioFormat, this.buffer, true);
         if (this.line != null)
             this.buffer = this.line.getBufferSize();
-            this.data = new double[this.buffer/this.sampleByte];
-            this.dataLen = 0;
+        this.data = new int[this.buffer/this.sampleByte];
+        this.dataLen = 0;
+        this.frameSize = audioFormat.getFrameSize();
+        this.byteRate = audioFormat.getSampleRate() * this.frameSize / 1000.0;
+        this.byteArray = new byte[this.buffer];
+        this.period = this.buffer;
+        this.channelEvents = new ArrayList();
+        this.channelNum = 0;
+        setNumChannels(8);
         }
 
     /**
@@ -116,15 +261,23 @@ public class Mixer {
     Set mixer line. Line should support AudioFormat initialized.
     */
     public void setLine(SourceDataLine line) {
-        if (this.line != null)
+        if (this.line != null || this.offline)
             close();
         this.line = line;
         try {
             if (!this.line.isOpen())
                 this.line.open(this.audioFormat, this.buffer);
-            this.buffer = this.line.getBufferSize();
-            this.data = new double[this.buffer/this.sampleByte];
-            this.dataLen = 0;
+            synchronized (this) {
+                this.buffer = this.line.getBufferSize();
+                this.data = new int[this.buffer/this.sampleByte];
+                this.dataLen = 0;
+                this.byteArray = new byte[this.buffer];
+                setPeriod();
+                for (int i = 0; i < this.channelBuffer.length; i++) {
+                    this.channelBuffer[i] = null;
+                    this.channelBufferView[i] = null;
+                    }
+                }
             this.line.start();
             }
         catch (LineUnavailableException e) { this.line=null; }
@@ -133,7 +286,87 @@ public class Mixer {
         }
 
     /**
-    Close mixer line.
+    Set mixer output without a line, for offline rendering.
+    Argument output is a File to write WAV audio, an OutputStream to write
+    audio data in the mixer audio format, or null to discard the audio.
+    Argument realtime paces output to the audio rate, otherwise audio is
+    mixed as fast as possible.
+    */
+    public void setOutput(Object output, boolean realtime) throws IOException {
+        close();
+        if (output instanceof File) {
+            boolean wide = this.sampleByte == 2;
+            this.outputFormat = new AudioFormat(this.audioFormat.getSampleRate(),
+                this.sampleByte * 8, this.channels, wide, false);
+            this.outputFile = new RandomAccessFile((File) output, "rw");
+            this.outputFile.setLength(0);
+            writeWaveHeader();
+            }
+        else if (output instanceof OutputStream)
+            this.outputStream = (OutputStream) output;
+        else if (output != null)
+            throw new IllegalArgumentException("output must be File, OutputStream or null");
+        this.realtime = realtime;
+        this.outputLen = 0;
+        this.outputStart = 0;
+        this.offline = true;
+        }
+
+    /**
+    Return data length written to offline output.
+    */
+    public long getOutputLength() {
+        return this.outputLen;
+        }
+
+    /**
+    Write WAV header for data written to output file.
+    */
+    private void writeWaveHeader() throws IOException {
+        RandomAccessFile file = this.outputFile;
+        int dataLen = (int) Math.min(this.outputLen, Integer.MAX_VALUE - 36);
+        int frameSize = this.outputFormat.getFrameSize();
+        int rate = (int) this.outputFormat.getSampleRate();
+        file.seek(0);
+        file.writeBytes("RIFF");
+        file.writeInt(Integer.reverseBytes(36 + dataLen));
+        file.writeBytes("WAVEfmt ");
+        file.writeInt(Integer.reverseBytes(16));
+        file.writeShort(Short.reverseBytes((short) 1));
+        file.writeShort(Short.reverseBytes((short) this.channels));
+        file.writeInt(Integer.reverseBytes(rate));
+        file.writeInt(Integer.reverseBytes(rate * frameSize));
+        file.writeShort(Short.reverseBytes((short) frameSize));
+        file.writeShort(Short.reverseBytes((short) (this.sampleByte * 8)));
+        file.writeBytes("data");
+        file.writeInt(Integer.reverseBytes(dataLen));
+        file.seek(file.length());
+        }
+
+    /**
+    Close offline output, completing the WAV file header.
+    */
+    private void closeOutput() {
+        if (this.outputFile != null) {
+            try {
+                writeWaveHeader();
+                this.outputFile.close();
+                }
+            catch (IOException e) {}
+            }
+        if (this.outputStream != null) {
+            try {
+                this.outputStream.flush();
+                }
+            catch (IOException e) {}
+            }
+        this.outputFile = null;
+        this.outputStream = null;
+        this.offline = false;
+        }
+
+    /**
+    Close mixer line or offline output.
     */
     public void close() {
         if (this.line != null)
@@ -144,6 +377,8 @@ public class Mixer {
                 }
             catch (SecurityException e) {}
         this.line = null;
+        if (this.offline)
+            closeOutput();
         }
 
     /**
@@ -164,17 +399,30 @@ public class Mixer {
 
     /**
     Uninitialize mixer.
+    If the mixer thread is running, the thread is stopped and uninitializes
+    the mixer on exit.
     */
     public void quit() {
+        if (this.running) {
+            this.running = false;
+            synchronized (this) {
+                notifyAll();
+                }
+            return;
+            }
+        synchronized (this) {
+            for (int i = 0; i < this.channelNum+1; i++)
+                resetChannel(i);
+            }
         close();
-        this.data = null;    
-        }    
+        this.data = null;
+        }
 
     /**
     Check if mixer line is initialized.
     */
     public boolean isInitialized() {
-        return (this.line != null);
+        return (this.line != null || this.offline);
         }
 
     /**
@@ -187,7 +435,7 @@ public class Mixer {
         if (!(lvolume < 1.0) && !(rvolume < 1.0))
             setByteData(data, dataLen);
         else
-            setByteData(data, dataLen, lvolume, rvolume);
+            setByteData(data, getDataView(data), 0, dataLen, 0, getGain(lvolume), getGain(rvolume));
         if (dataLen > this.dataLen)
             this.dataLen = dataLen;
         }
@@ -215,20 +463,102 @@ public class Mixer {
     * Add data to internal array.
     */
     private void setByteData(byte[] data, int dataLen) {
-        ShortBuffer dataBuffer = ByteBuffer.wrap(data).order(this.endian).asShortBuffer();
-        for (int i = 0; i < dataLen/this.sampleByte; i++) {
-            this.data[i] += (double) dataBuffer.get(i);
+        setByteData(data, getDataView(data), 0, dataLen, 0);
+        }
+
+    /**
+    * Add data from offset of byte array to internal array at position.
+    * Argument view is the cached view of 16-bit data, or null.
+    */
+    private void setByteData(byte[] data, ShortBuffer view, int offset, int dataLen, int position) {
+        int[] mix = this.data;
+        int step = this.sampleByte;
+        int pos = position/step;
+        int samples = dataLen/step;
+        if (view != null && this.signed) {
+            int index = offset/2;
+            for (int i = 0; i < samples; i++) {
+                mix[pos+i] += view.get(index+i) << 8;
+                }
+            return;
+            }
+        for (int i = 0; i < samples; i++) {
+            mix[pos+i] += getSample(data, offset+i*step) << 8;
             }
         }
 
     /**
-    * Add data to internal array.
+    * Add data from offset of byte array to internal array at position,
+    * with volume applied as 16-bit fixed-point gain.
+    * The internal array holds samples with 8 fraction bits.
+    * Argument view is the cached view of 16-bit data, or null.
+    */
+    private void setByteData(byte[] data, ShortBuffer view, int offset, int dataLen, int position, int lgain, int rgain) {
+        int[] mix = this.data;
+        int step = this.sampleByte;
+        int pos = position/step;
+        int samples = dataLen/step;
+        if (this.channels == 1)
+            rgain = lgain;
+        int frames = samples - (samples % 2);
+        if (view != null && this.signed) {
+            int index = offset/2;
+            for (int i = 0; i < frames; i += 2) {
+                mix[pos+i] += (view.get(index+i) * lgain) >> 8;
+                mix[pos+i+1] += (view.get(index+i+1) * rgain) >> 8;
+                }
+            }
+        else {
+            for (int i = 0; i < frames; i += 2) {
+                mix[pos+i] += (getSample(data, offset+i*step) * lgain) >> 8;
+                mix[pos+i+1] += (getSample(data, offset+(i+1)*step) * rgain) >> 8;
+                }
+            }
+        if (frames < samples) {
+            if (view != null && this.signed)
+                mix[pos+frames] += (view.get(offset/2+frames) * lgain) >> 8;
+            else
+                mix[pos+frames] += (getSample(data, offset+frames*step) * lgain) >> 8;
+            }
+        }
+
+    /**
+    * Add data from offset of byte array to internal array at position,
+    * with gain ramped per frame from start gain to end gain.
+    * Argument view is the cached view of 16-bit data, or null.
     */
-    private void setByteData(byte[] data, int dataLen, float lvolume, float rvolume) {
-        ShortBuffer dataBuffer = ByteBuffer.wrap(data).order(this.endian).asShortBuffer();
-        for (int i = 0; i < dataLen/this.sampleByte; i+=2) {
-            this.data[i] += (double) (dataBuffer.get(i) * lvolume);
-            this.data[i+1] += (double) (dataBuffer.get(i+1) * rvolume);
+    private void setByteData(byte[] data, ShortBuffer view, int offset, int dataLen, int position,
+                             int lgain, int rgain, int lgainEnd, int rgainEnd) {
+        int[] mix = this.data;
+        int step = this.sampleByte;
+        int pos = position/step;
+        int channels = this.channels;
+        int frames = dataLen/(step*channels);
+        if (frames == 0)
+            return;
+        long lacc = (long) lgain << 16;
+        long racc = (long) rgain << 16;
+        long lstep = ((long) (lgainEnd - lgain) << 16) / frames;
+        long rstep = ((long) (rgainEnd - rgain) << 16) / frames;
+        boolean direct = view != null && this.signed;
+        int index = offset/2;
+        for (int f = 0; f < frames; f++) {
+            int i = f * channels;
+            int sample;
+            if (direct)
+                sample = view.get(index+i);
+            else
+                sample = getSample(data, offset+i*step);
+            mix[pos+i] += (sample * (int) (lacc >> 16)) >> 8;
+            if (channels == 2) {
+                if (direct)
+                    sample = view.get(index+i+1);
+                else
+                    sample = getSample(data, offset+(i+1)*step);
+                mix[pos+i+1] += (sample * (int) (racc >> 16)) >> 8;
+                }
+            lacc += lstep;
+            racc += rstep;
             }
         }
 
@@ -238,62 +568,127 @@ public class Mixer {
     * Return data length of ByteArray used.
     */
     public int getAudioData(byte[] byteArray) {
-        double samplePeak = checkAudioLevel(this.data, this.dataLen);
-        if (samplePeak > this.sampleMax)
-            correctAudioLevel(this.data, this.dataLen, samplePeak);
-        getByteData(this.data, this.dataLen, byteArray);
+        int[] mix = this.data;
+        int step = this.sampleByte;
+        int samples = this.dataLen/step;
+        if (this.masterFilter != null)
+            processFilter(this.masterFilter, mix, samples);
+        if (this.reverb != null)
+            processReverb(mix, samples);
+        processCompressor(mix, samples);
+        if (step == 2 && this.signed) {
+            if (byteArray != this.outputArray) {
+                this.outputArray = byteArray;
+                this.outputView = getView(byteArray);
+                }
+            ShortBuffer view = this.outputView;
+            for (int i = 0; i < samples; i++) {
+                view.put(i, (short) ((mix[i] + 128) >> 8));
+                mix[i] = 0;
+                }
+            }
+        else {
+            for (int i = 0; i < samples; i++) {
+                putSample(byteArray, i*step, (mix[i] + 128) >> 8);
+                mix[i] = 0;
+                }
+            }
         int dataLen = this.dataLen;
-        resetMixer();
+        this.dataLen = 0;
         return dataLen;
         }
 
     /**
-    * Get mixed data from internal array.
+    * Return view of 16-bit audio data, or null for 8-bit audio data.
     */
-    private void getByteData(double[] data, int dataLen, byte[] byteArray) {
-        int pos = 0;
-        for (int i = 0; i < dataLen/this.sampleByte; i++) {
-            byteArray[pos] = (byte) ((int) (data[i])>>this.shift[0] & 0xff);
-            byteArray[pos+1] = (byte) ((int) (data[i])>>this.shift[1] & 0xff);
-            pos += this.sampleByte;
+    private ShortBuffer getView(byte[] data) {
+        if (this.sampleByte != 2)
+            return null;
+        ByteOrder order = this.bigEndian ? ByteOrder.BIG_ENDIAN : ByteOrder.LITTLE_ENDIAN;
+        return ByteBuffer.wrap(data).order(order).asShortBuffer();
+        }
+
+    /**
+    * Return cached view of audio data added to the mixer.
+    */
+    private ShortBuffer getDataView(byte[] data) {
+        if (data != this.dataArray) {
+            this.dataArray = data;
+            this.dataView = getView(data);
             }
+        return this.dataView;
         }
 
     /**
-    * Check whether audio data level goes over threshold.
+    * Check audio data level, return peak level with 8 fraction bits.
     */
-    private double checkAudioLevel(double[] data, int dataLen) {
-        double xmax = (double) this.sampleMax;
-        double xmin = (double) this.sampleMin;
-        for (int i = 0; i < dataLen/this.sampleByte; i++) {
-            if (data[i] > xmax)
-                xmax = data[i];
-            else if (data[i] < xmin)
-                xmin = data[i];
+    private int checkAudioLevel(int[] mix, int samples) {
+        int peak = 0;
+        for (int i = 0; i < samples; i++) {
+            int value = mix[i];
+            if (value > peak)
+                peak = value;
+            else if (-value-256 > peak)
+                peak = -value-256;
             }
-        if (Math.abs(xmin)-1 > xmax)
-            xmax = (double) Math.abs(xmin)-1;
-        return xmax;
+        return peak;
         }
 
     /**
-    * Correct audio data level if exceed threshold.
+    * Get sample value at index of audio data.
     */
-    private void correctAudioLevel(double[] data, int dataLen, double overflow) {
-        float correction = (float) (this.sampleMax/overflow);
-        for (int i = 0; i < dataLen/this.sampleByte; i++) {
-            data[i] = (double) data[i] * correction;
+    private int getSample(byte[] data, int index) {
+        int value;
+        if (this.sampleByte == 2) {
+            if (this.bigEndian)
+                value = (data[index] << 8) | (data[index+1] & 0xff);
+            else
+                value = (data[index+1] << 8) | (data[index] & 0xff);
+            if (!this.signed)
+                value = (value & 0xffff) - 32768;
             }
+        else {
+            if (this.signed)
+                value = data[index];
+            else
+                value = (data[index] & 0xff) - 128;
+            }
+        return value;
         }
 
     /**
-    * Internal array is zeroed.
+    * Put sample value at index of audio data.
     */
-    private void resetMixer() {
-        for (int i = 0; i < this.dataLen/this.sampleByte; i++) {
-            this.data[i] = 0;
+    private void putSample(byte[] data, int index, int value) {
+        if (this.sampleByte == 2) {
+            if (!this.signed)
+                value += 32768;
+            if (this.bigEndian) {
+                data[index] = (byte) (value >> 8);
+                data[index+1] = (byte) value;
+                }
+            else {
+                data[index] = (byte) value;
+                data[index+1] = (byte) (value >> 8);
+                }
             }
-        this.dataLen = 0;
+        else {
+            if (!this.signed)
+                value += 128;
+            data[index] = (byte) value;
+            }
+        }
+
+    /**
+    * Return volume of value 0.0 to 1.0 as 16-bit fixed-point gain.
+    */
+    private static int getGain(float volume) {
+        int gain = (int) (volume * 65536.0f + 0.5f);
+        if (gain > 65536)
+            return 65536;
+        else if (gain < 0)
+            return 0;
+        return gain;
         }
 
     /**
@@ -304,10 +699,19 @@ public class Mixer {
     * Return input ByteArray adjusted for volume.
     */
     public byte[] processVolume(byte[] data, int dataLen, float lvolume, float rvolume) {
-        ShortBuffer dataBuffer = ByteBuffer.wrap(data).order(this.endian).asShortBuffer();
-        for (int i = 0; i < dataLen/this.sampleByte; i+=2) {
-            dataBuffer.put(i, (short) (dataBuffer.get(i)*lvolume));
-            dataBuffer.put(i+1, (short) (dataBuffer.get(i+1)*rvolume));
+        int step = this.sampleByte;
+        int lgain = getGain(lvolume);
+        int rgain = getGain(rvolume);
+        if (this.channels == 1) {
+            for (int i = 0; i < dataLen - (dataLen % step); i += step) {
+                putSample(data, i, (getSample(data, i) * lgain) >> 16);
+                }
+            return data;
+            }
+        int frame = step * 2;
+        for (int i = 0; i < dataLen - (dataLen % frame); i += frame) {
+            putSample(data, i, (getSample(data, i) * lgain) >> 16);
+            putSample(data, i+step, (getSample(data, i+step) * rgain) >> 16);
             }
         return data;
         }
@@ -335,6 +739,1864 @@ public class Mixer {
         return byteArray;
         }
 
+    /**
+    * Set number of mixer channels.
+    * Channel id 0 to num-1 are sound channels and id -1 is the music
+    * channel. Channels above num are stopped.
+    */
+    public synchronized void setNumChannels(int num) {
+        int size = num + 1;
+        int current = 0;
+        if (this.channelState != null) {
+            current = this.channelNum + 1;
+            for (int i = size; i < current; i++)
+                resetChannel(i);
+            }
+        this.channelState = resize(this.channelState, size);
+        this.channelCount = resize(this.channelCount, size);
+        this.channelSource = resize(this.channelSource, size);
+        this.channelQueue = resize(this.channelQueue, size);
+        this.channelData = (byte[][]) resize((Object[]) this.channelData, new byte[size][]);
+        this.channelPosition = resize(this.channelPosition, size);
+        this.channelStream = (InputStream[]) resize((Object[]) this.channelStream, new InputStream[size]);
+        this.channelBuffer = (byte[][]) resize((Object[]) this.channelBuffer, new byte[size][]);
+        this.channelDataView = (ShortBuffer[]) resize((Object[]) this.channelDataView, new ShortBuffer[size]);
+        this.channelBufferView = (ShortBuffer[]) resize((Object[]) this.channelBufferView, new ShortBuffer[size]);
+        this.channelMap = (ByteBuffer[]) resize((Object[]) this.channelMap, new ByteBuffer[size]);
+        this.channelMapView = (ShortBuffer[]) resize((Object[]) this.channelMapView, new ShortBuffer[size]);
+        this.channelMapSource = resize(this.channelMapSource, size);
+        this.channelLoops = resize(this.channelLoops, size);
+        this.channelPlayed = resize(this.channelPlayed, size);
+        this.channelMaxtime = resize(this.channelMaxtime, size);
+        this.channelFadein = resize(this.channelFadein, size);
+        this.channelFadeout = resize(this.channelFadeout, size);
+        this.channelFadeoutLength = resize(this.channelFadeoutLength, size);
+        this.channelFade = resize(this.channelFade, size);
+        this.channelLvolume = resize(this.channelLvolume, size);
+        this.channelRvolume = resize(this.channelRvolume, size);
+        this.channelSoundVolume = resize(this.channelSoundVolume, size);
+        this.channelPositional = resize(this.channelPositional, size);
+        this.channelX = resize(this.channelX, size);
+        this.channelY = resize(this.channelY, size);
+        this.channelPanLvolume = resize(this.channelPanLvolume, size);
+        this.channelPanRvolume = resize(this.channelPanRvolume, size);
+        this.channelLgain = resize(this.channelLgain, size);
+        this.channelRgain = resize(this.channelRgain, size);
+        this.channelPriority = resize(this.channelPriority, size);
+        this.channelStart = resize(this.channelStart, size);
+        this.channelEffect = resize(this.channelEffect, size);
+        this.channelFilter = (double[][]) resize((Object[]) this.channelFilter, new double[size][]);
+        this.channelDelay = (double[][]) resize((Object[]) this.channelDelay, new double[size][]);
+        this.channelDelayBuffer = (float[][]) resize((Object[]) this.channelDelayBuffer, new float[size][]);
+        this.channelDelayPosition = resize(this.channelDelayPosition, size);
+        this.channelTail = resize(this.channelTail, size);
+        this.channelSidechain = resize(this.channelSidechain, size);
+        this.channelDuck = resize(this.channelDuck, size);
+        this.channelDuckVolume = resize(this.channelDuckVolume, size);
+        for (int i = current; i < size; i++) {
+            this.channelLvolume[i] = 1.0f;
+            this.channelRvolume[i] = 1.0f;
+            this.channelSoundVolume[i] = 1.0f;
+            this.channelFade[i] = 1.0f;
+            this.channelPanLvolume[i] = 1.0f;
+            this.channelPanRvolume[i] = 1.0f;
+            this.channelLgain[i] = -1;
+            this.channelRgain[i] = -1;
+            this.channelDuckVolume[i] = 1.0f;
+            }
+        this.channelNum = num;
+        }
+
+    /**
+    * Get number of mixer channels.
+    */
+    public int getNumChannels() {
+        return this.channelNum;
+        }
+
+    /**
+    * Set listener notified of channel events.
+    * Property name is 'end' when a channel sound ends and 'queue' when
+    * a channel starts the queued sound, with old value the play count
+    * returned by play and new value the channel id.
+    * The listener is called on the mixer thread.
+    */
+    public void setListener(PropertyChangeListener listener) {
+        this.listener = listener;
+        }
+
+    /**
+    * Play sound on channel.
+    * Argument id is the channel, source is a byte array or ByteBuffer of
+    * audio data, or a File or URL of an audio stream, loops is repeat number or -1
+    * for continuous, maxtime is maximum play time in ms, fadein is
+    * fade-in time in ms, and volume is the sound volume.
+    * Return channel play count identifying the play in events.
+    */
+    public synchronized int play(int id, Object source, int loops, int maxtime, int fadein, float volume) {
+        int index = id + 1;
+        closeChannel(index);
+        this.channelSource[index] = source;
+        this.channelQueue[index] = null;
+        this.channelLoops[index] = loops;
+        this.channelMaxtime[index] = (long) (maxtime * this.byteRate);
+        this.channelMaxtime[index] -= this.channelMaxtime[index] % this.frameSize;
+        this.channelFadein[index] = (long) (fadein * this.byteRate);
+        this.channelFadeout[index] = 0;
+        this.channelFade[index] = 1.0f;
+        this.channelPlayed[index] = 0;
+        this.channelSoundVolume[index] = volume;
+        this.channelLgain[index] = -1;
+        this.channelRgain[index] = -1;
+        if (!openChannel(index)) {
+            resetChannel(index);
+            return this.channelCount[index];
+            }
+        this.channelState[index] = PLAYING;
+        this.channelCount[index]++;
+        this.channelStart[index] = ++this.playSequence;
+        addVoice(index);
+        notifyAll();
+        return this.channelCount[index];
+        }
+
+    /**
+    * Return play count of channel, incremented by each play.
+    */
+    public synchronized int getCount(int id) {
+        return this.channelCount[id+1];
+        }
+
+    /**
+    * Queue sound to play on channel after current sound ends.
+    * Argument id is the channel and source is the sound source.
+    */
+    public synchronized void queue(int id, Object source) {
+        this.channelQueue[id+1] = source;
+        }
+
+    /**
+    * Stop sound on channel.
+    */
+    public synchronized void stop(int id) {
+        resetChannel(id+1);
+        }
+
+    /**
+    * Pause sound on channel.
+    */
+    public synchronized void pause(int id) {
+        if (this.channelState[id+1] == PLAYING)
+            this.channelState[id+1] = PAUSED;
+        }
+
+    /**
+    * Unpause sound on channel.
+    */
+    public synchronized void unpause(int id) {
+        if (this.channelState[id+1] == PAUSED) {
+            this.channelState[id+1] = PLAYING;
+            notifyAll();
+            }
+        }
+
+    /**
+    * Stop sound on channel after fadeout time in ms.
+    */
+    public synchronized void fadeout(int id, int time) {
+        int index = id + 1;
+        if (this.channelState[index] == IDLE)
+            return;
+        long length = (long) (time * this.byteRate);
+        length = Math.max(length - length % this.frameSize, this.frameSize);
+        this.channelFadeout[index] = this.channelPlayed[index] + length;
+        this.channelFadeoutLength[index] = length;
+        }
+
+    /**
+    * Rewind sound on channel to start.
+    */
+    public void rewind(int id) {
+        int index = id + 1;
+        synchronized (this) {
+            if (this.channelState[index] == IDLE)
+                return;
+            this.channelPlayed[index] = 0;
+            }
+        setPosition(id, 0);
+        }
+
+    /**
+    * Set channel play position.
+    * Argument id is the channel and time is the position in ms from
+    * start of the sound. Sound data and mapped sound files seek directly,
+    * and streams are reopened and skipped to the position without the
+    * mixer lock, then replace the channel stream if the channel source
+    * is unchanged.
+    */
+    public void setPosition(int id, long time) {
+        int index = id + 1;
+        long position = (long) (time * this.byteRate);
+        position -= position % this.frameSize;
+        if (position < 0)
+            position = 0;
+        Object source;
+        int count;
+        synchronized (this) {
+            if (this.channelState[index] == IDLE)
+                return;
+            if (this.channelData[index] != null) {
+                this.channelPosition[index] = (int) Math.min(position, this.channelData[index].length);
+                return;
+                }
+            if (this.channelStream[index] == null && this.channelMap[index] != null) {
+                this.channelPosition[index] = (int) Math.min(position, this.channelMap[index].limit());
+                return;
+                }
+            source = this.channelSource[index];
+            count = this.channelCount[index];
+            if (source instanceof InputStream)
+                closeStream(index);
+            }
+        InputStream stream = openStream(source);
+        if (stream != null) {
+            try {
+                while (position > 0) {
+                    long n = stream.skip(position);
+                    if (n <= 0)
+                        break;
+                    position -= n;
+                    }
+                }
+            catch (IOException e) {}
+            }
+        synchronized (this) {
+            if (this.channelState[index] == IDLE || this.channelSource[index] != source
+                    || this.channelCount[index] != count) {
+                if (stream != null && stream != source)
+                    closeStream(stream);
+                return;
+                }
+            if (this.channelStream[index] != stream)
+                closeStream(index);
+            if (stream == null) {
+                resetChannel(index);
+                return;
+                }
+            this.channelStream[index] = stream;
+            this.channelPosition[index] = 0;
+            }
+        }
+
+    /**
+    * Set channel volume.
+    * Argument id is the channel, lvolume and rvolume are L/R volume of
+    * values 0.0 to 1.0.
+    */
+    public synchronized void setVolume(int id, float lvolume, float rvolume) {
+        this.channelLvolume[id+1] = lvolume;
+        this.channelRvolume[id+1] = rvolume;
+        }
+
+    /**
+    * Set volume of sound playing on channel.
+    */
+    public synchronized void setSoundVolume(int id, float volume) {
+        this.channelSoundVolume[id+1] = volume;
+        }
+
+    /**
+    * Set channel emitter position for positional audio, with volume
+    * attenuated by distance from the listener and panned by direction.
+    */
+    public synchronized void setEmitter(int id, float x, float y) {
+        int index = id + 1;
+        this.channelPositional[index] = true;
+        this.channelX[index] = x;
+        this.channelY[index] = y;
+        updatePosition(index);
+        }
+
+    /**
+    * Clear channel emitter position.
+    */
+    public synchronized void clearEmitter(int id) {
+        int index = id + 1;
+        this.channelPositional[index] = false;
+        this.channelPanLvolume[index] = 1.0f;
+        this.channelPanRvolume[index] = 1.0f;
+        }
+
+    /**
+    * Set listener position for positional audio.
+    */
+    public synchronized void setListenerPosition(float x, float y) {
+        this.listenerX = x;
+        this.listenerY = y;
+        updatePositions();
+        }
+
+    /**
+    * Set distance attenuation of positional audio.
+    * Argument model is LINEAR, INVERSE or EXPONENTIAL, minDistance is
+    * the distance of full volume, maxDistance is the distance beyond
+    * which volume is not attenuated further, and rolloff is the rate
+    * of attenuation.
+    */
+    public synchronized void setAttenuation(int model, float minDistance, float maxDistance, float rolloff) {
+        this.attenuationModel = model;
+        this.minDistance = Math.max(minDistance, 0.0001f);
+        this.maxDistance = Math.max(maxDistance, this.minDistance);
+        this.rolloff = rolloff;
+        updatePositions();
+        }
+
+    /**
+    * Update pan volume of positional channels.
+    */
+    private void updatePositions() {
+        for (int i = 0; i < this.channelNum+1; i++) {
+            if (this.channelPositional[i])
+                updatePosition(i);
+            }
+        }
+
+    /**
+    * Update pan volume of channel from emitter position relative to
+    * listener, with equal-power panning normalized to full volume at center.
+    */
+    private void updatePosition(int index) {
+        float dx = this.channelX[index] - this.listenerX;
+        float dy = this.channelY[index] - this.listenerY;
+        double distance = Math.sqrt(dx*dx + dy*dy);
+        double d = Math.min(Math.max(distance, this.minDistance), this.maxDistance);
+        double gain;
+        if (this.attenuationModel == LINEAR)
+            gain = 1.0 - this.rolloff * (d - this.minDistance) / (this.maxDistance - this.minDistance);
+        else if (this.attenuationModel == EXPONENTIAL)
+            gain = Math.pow(d / this.minDistance, -this.rolloff);
+        else
+            gain = this.minDistance / (this.minDistance + this.rolloff * (d - this.minDistance));
+        gain = Math.min(Math.max(gain, 0.0), 1.0);
+        if (this.channels == 1) {
+            this.channelPanLvolume[index] = (float) gain;
+            this.channelPanRvolume[index] = (float) gain;
+            return;
+            }
+        double pan = dx / Math.max(distance, this.minDistance);
+        double angle = (pan + 1.0) * Math.PI / 4.0;
+        this.channelPanLvolume[index] = (float) (gain * Math.min(1.0, Math.sqrt(2.0) * Math.cos(angle)));
+        this.channelPanRvolume[index] = (float) (gain * Math.min(1.0, Math.sqrt(2.0) * Math.sin(angle)));
+        }
+
+    /**
+    * Set priority of channel for voice stealing, used from next play.
+    */
+    public synchronized void setPriority(int id, int priority) {
+        int index = id + 1;
+        boolean busy = this.channelState[index] != IDLE;
+        if (busy)
+            removeVoice(index);
+        this.channelPriority[index] = priority;
+        if (busy)
+            addVoice(index);
+        }
+
+    /**
+    * Set voice stealing policy of OLDEST, PRIORITY or QUIETEST.
+    */
+    public synchronized void setStealPolicy(int policy) {
+        this.stealPolicy = policy;
+        updateVoices();
+        }
+
+    /**
+    * Set number of reserved channels, only stolen when no unreserved
+    * channel is busy.
+    */
+    public synchronized void setReserved(int num) {
+        this.reservedNum = num;
+        updateVoices();
+        }
+
+    /**
+    * Find busy channel to steal by the steal policy. With PRIORITY policy,
+    * a channel of lowest priority is stolen if not above priority.
+    * Return channel id, or -1 if none as the music channel is not stolen.
+    */
+    public synchronized int findVoice(int priority) {
+        TreeSet voices = this.voices;
+        if (voices.isEmpty())
+            voices = this.reservedVoices;
+        if (voices.isEmpty())
+            return -1;
+        int index = ((Integer) voices.first()).intValue();
+        if (this.stealPolicy == PRIORITY && this.channelPriority[index] > priority)
+            return -1;
+        return index - 1;
+        }
+
+    /**
+    * Compare channel index for voice stealing order by steal policy,
+    * first is the channel to steal.
+    */
+    public int compare(Object a, Object b) {
+        int i = ((Integer) a).intValue();
+        int j = ((Integer) b).intValue();
+        if (this.stealPolicy == PRIORITY) {
+            if (this.channelPriority[i] != this.channelPriority[j])
+                return this.channelPriority[i] < this.channelPriority[j] ? -1 : 1;
+            }
+        else if (this.stealPolicy == QUIETEST) {
+            int gi = getVoiceGain(i);
+            int gj = getVoiceGain(j);
+            if (gi != gj)
+                return gi < gj ? -1 : 1;
+            }
+        if (this.channelStart[i] != this.channelStart[j])
+            return this.channelStart[i] < this.channelStart[j] ? -1 : 1;
+        return i - j;
+        }
+
+    /**
+    * Return channel gain applied for quietest order, full gain if not mixed.
+    */
+    private int getVoiceGain(int index) {
+        if (this.channelLgain[index] < 0)
+            return 65536;
+        return Math.max(this.channelLgain[index], this.channelRgain[index]);
+        }
+
+    private void addVoice(int index) {
+        if (index == 0)
+            return;
+        if (index - 1 < this.reservedNum)
+            this.reservedVoices.add(new Integer(index));
+        else
+            this.voices.add(new Integer(index));
+        }
+
+    private void removeVoice(int index) {
+        if (index == 0)
+            return;
+        if (index - 1 < this.reservedNum)
+            this.reservedVoices.remove(new Integer(index));
+        else
+            this.voices.remove(new Integer(index));
+        }
+
+    /**
+    * Rebuild voice order of busy channels.
+    */
+    private void updateVoices() {
+        this.voices = new TreeSet(this);
+        this.reservedVoices = new TreeSet(this);
+        for (int i = 1; i < this.channelNum+1; i++) {
+            if (this.channelState[i] != IDLE)
+                addVoice(i);
+            }
+        }
+
+    /**
+    * Check if channel is playing or paused.
+    */
+    public synchronized boolean isBusy(int id) {
+        return this.channelState[id+1] != IDLE;
+        }
+
+    /**
+    * Check if channel is playing.
+    */
+    public synchronized boolean isPlaying(int id) {
+        return this.channelState[id+1] == PLAYING;
+        }
+
+    /**
+    * Check if any channel is playing or paused.
+    */
+    public synchronized boolean isBusy() {
+        for (int i = 1; i < this.channelNum+1; i++) {
+            if (this.channelState[i] != IDLE)
+                return true;
+            }
+        return false;
+        }
+
+    /**
+    * Set low latency mode, mixing in short periods paced by the line
+    * with the latency target adapted to underruns.
+    */
+    public synchronized void setLowLatency(boolean lowLatency) {
+        this.lowLatency = lowLatency;
+        setPeriod();
+        }
+
+    /**
+    * Check if mixer is in low latency mode.
+    */
+    public boolean isLowLatency() {
+        return this.lowLatency;
+        }
+
+    /**
+    * Set mixing period and latency target for the latency mode.
+    */
+    private void setPeriod() {
+        if (this.lowLatency) {
+            this.period = Math.min(LOW_LATENCY_FRAMES * this.frameSize, this.buffer);
+            this.latencyTarget = Math.min(this.period * 2, this.buffer);
+            this.latencyStable = 0;
+            }
+        else
+            this.period = this.buffer;
+        }
+
+    /**
+    * Return output latency in ms measured at the last line write.
+    */
+    public double getLatency() {
+        return this.latency;
+        }
+
+    /**
+    * Return latency target in ms of low latency mode, or the
+    * buffer time otherwise.
+    */
+    public double getLatencyTarget() {
+        if (this.lowLatency)
+            return this.latencyTarget / this.byteRate;
+        else
+            return this.buffer / this.byteRate;
+        }
+
+    /**
+    * Return number of line underruns, when the line buffer was drained
+    * before mixed data was written.
+    */
+    public int getUnderruns() {
+        return this.underruns;
+        }
+
+    /**
+    * Reset underrun count.
+    */
+    public void resetUnderruns() {
+        this.underruns = 0;
+        }
+
+    /**
+    * Mixer processing, run on mixer thread.
+    * Channels are mixed and written to the mixer line until quit.
+    */
+    public void run() {
+        this.running = true;
+        while (this.running && this.data != null) {
+            int dataLen;
+            if (this.lowLatency && this.writing)
+                waitLine();
+            synchronized (this) {
+                dataLen = mixChannels();
+                if (dataLen == 0 && this.channelEvents.isEmpty()) {
+                    this.writing = false;
+                    try {
+                        wait(10);
+                        }
+                    catch (InterruptedException e) {
+                        this.running = false;
+                        }
+                    continue;
+                    }
+                }
+            notifyEvents();
+            if (dataLen > 0)
+                writeLine(dataLen);
+            }
+        quit();
+        }
+
+    /**
+    * Wait until the line has room for the next period within the
+    * latency target, in low latency mode.
+    */
+    private void waitLine() {
+        SourceDataLine line = this.line;
+        if (line == null)
+            return;
+        while (this.running && this.lowLatency) {
+            int queued = line.getBufferSize() - line.available();
+            int excess = queued + this.period - this.latencyTarget;
+            if (excess <= 0)
+                return;
+            try {
+                Thread.sleep(Math.max(1, (long) (excess / this.byteRate)));
+                }
+            catch (InterruptedException e) {
+                return;
+                }
+            }
+        }
+
+    /**
+    * Mix active channels to the byte array.
+    * Return data length.
+    */
+    private int mixChannels() {
+        int active = 0;
+        this.sidechainPeak = 0;
+        for (int i = 0; i < this.channelNum+1; i++) {
+            if (this.channelState[i] != PLAYING) {
+                if (this.channelTail[i] > 0)
+                    active += mixTail(i);
+                continue;
+                }
+            int len = mixChannel(i);
+            if (len <= 0)
+                continue;
+            if (len > this.dataLen)
+                this.dataLen = len;
+            active++;
+            }
+        updateDucking();
+        if (active == 0) {
+            if (this.effectTail <= 0)
+                return 0;
+            this.effectTail -= this.period;
+            this.dataLen = this.period;
+            }
+        else if (this.reverb != null)
+            this.effectTail = (int) (this.byteRate * 3000.0);
+        return getAudioData(this.byteArray);
+        }
+
+    /**
+    * Mix channel data for the next buffer, continuing with the repeat
+    * or queued sound when the sound ends within the buffer.
+    * Return data length mixed.
+    */
+    private int mixChannel(int index) {
+        int pos = 0;
+        int empty = 0;
+        int[] mix = this.data;
+        boolean effect = this.channelEffect[index];
+        if (effect) {
+            if (this.effectData == null || this.effectData.length != mix.length)
+                this.effectData = new int[mix.length];
+            this.data = this.effectData;
+            }
+        while (pos < this.period && this.channelState[index] == PLAYING) {
+            int len = readChannel(index, this.period - pos);
+            if (len <= 0) {
+                if (++empty > 1)
+                    break;
+                continue;
+                }
+            empty = 0;
+            int lgain = getGain(this.mixLvolume);
+            int rgain = getGain(this.mixRvolume);
+            if (this.channels == 1)
+                rgain = lgain;
+            int lgainStart = this.channelLgain[index];
+            int rgainStart = this.channelRgain[index];
+            if (lgainStart < 0) {
+                lgainStart = lgain;
+                rgainStart = rgain;
+                }
+            if (lgainStart != lgain || rgainStart != rgain)
+                setByteData(this.mixSource, this.mixView, this.mixOffset, len, pos,
+                            lgainStart, rgainStart, lgain, rgain);
+            else if (lgain == 65536 && rgain == 65536)
+                setByteData(this.mixSource, this.mixView, this.mixOffset, len, pos);
+            else
+                setByteData(this.mixSource, this.mixView, this.mixOffset, len, pos, lgain, rgain);
+            setGain(index, lgain, rgain);
+            pos += len;
+            }
+        if (effect) {
+            this.data = mix;
+            processChannel(index, pos);
+            this.channelTail[index] = getDelayTail(index);
+            }
+        return pos;
+        }
+
+    /**
+    * Mix channel delay tail following channel end.
+    * Return 1 if mixed, else 0.
+    */
+    private int mixTail(int index) {
+        if (this.channelDelay[index] == null) {
+            this.channelTail[index] = 0;
+            return 0;
+            }
+        if (this.effectData == null || this.effectData.length != this.data.length)
+            this.effectData = new int[this.data.length];
+        processChannel(index, this.period);
+        this.channelTail[index] -= this.period;
+        if (this.period > this.dataLen)
+            this.dataLen = this.period;
+        return 1;
+        }
+
+    /**
+    * Return length of channel delay tail, the time for delay feedback
+    * to decay to silence.
+    */
+    private int getDelayTail(int index) {
+        double[] delay = this.channelDelay[index];
+        if (delay == null)
+            return 0;
+        int repeats = 1;
+        if (delay[1] > 0.0)
+            repeats = (int) Math.ceil(Math.log(0.001) / Math.log(delay[1]));
+        return (int) Math.min(delay[0] * this.frameSize * (repeats + 1), this.byteRate * 20000.0);
+        }
+
+    /**
+    * Set channel filter.
+    * Argument id is the channel, type is LOWPASS, HIGHPASS, BANDPASS,
+    * or 0 for no filter, frequency is the cutoff or center frequency
+    * and q is the filter resonance. Filter parameters are smoothed.
+    */
+    public synchronized void setFilter(int id, int type, float frequency, float q) {
+        int index = id + 1;
+        this.channelFilter[index] = getFilter(this.channelFilter[index], type, frequency, q);
+        updateEffect(index);
+        }
+
+    /**
+    * Set master filter, applied to the mixed audio.
+    */
+    public synchronized void setMasterFilter(int type, float frequency, float q) {
+        this.masterFilter = getFilter(this.masterFilter, type, frequency, q);
+        }
+
+    /**
+    * Set channel delay.
+    * Argument id is the channel, time is the delay in ms up to 2000,
+    * feedback is the delayed level fed back of 0.0 to less than 1.0,
+    * and mix is the delayed level added. Delay of time 0 is removed.
+    */
+    public synchronized void setDelay(int id, float time, float feedback, float mix) {
+        int index = id + 1;
+        if (time <= 0) {
+            this.channelDelay[index] = null;
+            this.channelDelayBuffer[index] = null;
+            updateEffect(index);
+            return;
+            }
+        double frames = Math.min(time, 2000.0f) * this.audioFormat.getSampleRate() / 1000.0;
+        double[] delay = this.channelDelay[index];
+        if (delay == null) {
+            delay = new double[6];
+            delay[3] = frames;
+            delay[4] = feedback;
+            delay[5] = mix;
+            this.channelDelay[index] = delay;
+            int length = (int) (this.audioFormat.getSampleRate() * 2.0) + 1;
+            this.channelDelayBuffer[index] = new float[length * this.channels];
+            this.channelDelayPosition[index] = 0;
+            }
+        delay[0] = frames;
+        delay[1] = Math.min(Math.max(feedback, 0.0f), 0.99f);
+        delay[2] = mix;
+        updateEffect(index);
+        }
+
+    /**
+    * Set channel as sidechain of ducking, its level ducks channels
+    * with ducking amount set.
+    */
+    public synchronized void setSidechain(int id, boolean sidechain) {
+        int index = id + 1;
+        this.channelSidechain[index] = sidechain;
+        updateEffect(index);
+        }
+
+    /**
+    * Set channel ducking amount of 0.0 to 1.0, the volume reduction when
+    * sidechain channels are above the ducking threshold.
+    */
+    public synchronized void setDucking(int id, float amount) {
+        int index = id + 1;
+        this.channelDuck[index] = Math.min(Math.max(amount, 0.0f), 1.0f);
+        this.channelDuckVolume[index] = (float) (1.0 - this.channelDuck[index] * this.duckLevel);
+        }
+
+    /**
+    * Set ducking response.
+    * Argument threshold is the sidechain level of 0.0 to 1.0 of full
+    * scale, attack and release are the ducking response times in ms.
+    */
+    public synchronized void setDuckingResponse(float threshold, float attack, float release) {
+        this.duckThreshold = threshold;
+        this.duckAttack = Math.max(attack, 0.0f);
+        this.duckRelease = Math.max(release, 0.0f);
+        }
+
+    /**
+    * Set master reverb.
+    * Argument room is the room size and damping the high frequency
+    * damping of 0.0 to 1.0, and mix is the reverb level added.
+    * Reverb of mix 0 is removed.
+    */
+    public synchronized void setReverb(float room, float damping, float mix) {
+        if (mix <= 0) {
+            this.reverb = null;
+            this.reverbBuffer = null;
+            this.effectTail = 0;
+            return;
+            }
+        if (this.reverb == null) {
+            this.reverb = new double[6];
+            this.reverb[3] = room;
+            this.reverb[4] = damping;
+            this.reverb[5] = mix;
+            double scale = this.audioFormat.getSampleRate() / 44100.0;
+            this.reverbBuffer = new float[12][];
+            for (int i = 0; i < 12; i++) {
+                int tuning = REVERB_TUNING[(i % 6)];
+                if (i >= 6)
+                    tuning += 23;
+                this.reverbBuffer[i] = new float[Math.max(1, (int) (tuning * scale))];
+                }
+            this.reverbPosition = new int[12];
+            this.reverbStore = new double[8];
+            }
+        this.reverb[0] = Math.min(Math.max(room, 0.0f), 1.0f);
+        this.reverb[1] = Math.min(Math.max(damping, 0.0f), 1.0f);
+        this.reverb[2] = mix;
+        }
+
+    /**
+    * Set master compressor, with limiting to full scale.
+    * Argument threshold is the level of 0.0 to 1.0 of full scale above
+    * which level is reduced by ratio, and release is the gain recovery
+    * time in ms. Gain reduction is applied without delay.
+    */
+    public synchronized void setCompressor(float threshold, float ratio, float release) {
+        this.compressorThreshold = Math.min(Math.max(threshold, 0.001f), 1.0f);
+        this.compressorRatio = Math.max(ratio, 1.0f);
+        this.compressorRelease = Math.max(release, 0.0f);
+        }
+
+    /**
+    * Update channel flag of effect processing.
+    */
+    private void updateEffect(int index) {
+        this.channelEffect[index] = this.channelFilter[index] != null
+            || this.channelDelay[index] != null || this.channelSidechain[index];
+        }
+
+    /**
+    * Return filter of type with target parameters, new filter if filter is
+    * null, or null for no filter.
+    * The filter array holds type, target frequency and q, current frequency
+    * and q, coefficients b0, b1, b2, a1, a2, and state x1, x2, y1, y2 for
+    * each of two channels.
+    */
+    private double[] getFilter(double[] filter, int type, float frequency, float q) {
+        if (type == 0)
+            return null;
+        double nyquist = this.audioFormat.getSampleRate() * 0.45;
+        double freq = Math.min(Math.max(frequency, 10.0), nyquist);
+        double resonance = Math.max(q, 0.1);
+        if (filter == null || filter[0] != type) {
+            filter = new double[18];
+            filter[3] = freq;
+            filter[4] = resonance;
+            }
+        filter[0] = type;
+        filter[1] = freq;
+        filter[2] = resonance;
+        setFilterCoefficients(filter);
+        return filter;
+        }
+
+    /**
+    * Set biquad filter coefficients from current frequency and q.
+    */
+    private void setFilterCoefficients(double[] filter) {
+        double w0 = 2.0 * Math.PI * filter[3] / this.audioFormat.getSampleRate();
+        double cos = Math.cos(w0);
+        double alpha = Math.sin(w0) / (2.0 * filter[4]);
+        double a0 = 1.0 + alpha;
+        double b0, b1, b2;
+        if (filter[0] == LOWPASS) {
+            b0 = (1.0 - cos) / 2.0;
+            b1 = 1.0 - cos;
+            b2 = b0;
+            }
+        else if (filter[0] == HIGHPASS) {
+            b0 = (1.0 + cos) / 2.0;
+            b1 = -(1.0 + cos);
+            b2 = b0;
+            }
+        else {
+            b0 = alpha;
+            b1 = 0.0;
+            b2 = -alpha;
+            }
+        filter[5] = b0 / a0;
+        filter[6] = b1 / a0;
+        filter[7] = b2 / a0;
+        filter[8] = -2.0 * cos / a0;
+        filter[9] = (1.0 - alpha) / a0;
+        }
+
+    /**
+    * Return smoothing factor of parameters for audio data of samples.
+    */
+    private double getSmoothing(int samples, double time) {
+        if (time <= 0)
+            return 1.0;
+        double ms = samples / this.channels / this.audioFormat.getSampleRate() * 1000.0;
+        return 1.0 - Math.exp(-ms / time);
+        }
+
+    /**
+    * Return parameter value moved toward target by smoothing factor.
+    */
+    private static double smooth(double value, double target, double smoothing) {
+        double change = (target - value) * smoothing;
+        if (Math.abs(target - value) < 1e-4 * Math.max(1.0, Math.abs(target)))
+            return target;
+        return value + change;
+        }
+
+    /**
+    * Process channel effects on channel audio mixed in effect data,
+    * and add to the mix.
+    */
+    private void processChannel(int index, int dataLen) {
+        int[] data = this.effectData;
+        int[] mix = this.data;
+        int samples = dataLen/this.sampleByte;
+        if (this.channelFilter[index] != null)
+            processFilter(this.channelFilter[index], data, samples);
+        if (this.channelDelay[index] != null)
+            processDelay(index, data, samples);
+        int peak = 0;
+        for (int i = 0; i < samples; i++) {
+            int value = data[i];
+            if (value > peak)
+                peak = value;
+            else if (-value > peak)
+                peak = -value;
+            mix[i] += value;
+            data[i] = 0;
+            }
+        if (this.channelSidechain[index] && peak > this.sidechainPeak)
+            this.sidechainPeak = peak;
+        }
+
+    /**
+    * Process biquad filter on audio data.
+    */
+    private void processFilter(double[] filter, int[] data, int samples) {
+        if (filter[3] != filter[1] || filter[4] != filter[2]) {
+            double smoothing = getSmoothing(samples, SMOOTH_TIME);
+            filter[3] = smooth(filter[3], filter[1], smoothing);
+            filter[4] = smooth(filter[4], filter[2], smoothing);
+            setFilterCoefficients(filter);
+            }
+        double b0 = filter[5];
+        double b1 = filter[6];
+        double b2 = filter[7];
+        double a1 = filter[8];
+        double a2 = filter[9];
+        int channels = this.channels;
+        for (int c = 0; c < channels; c++) {
+            int s = 10 + c*4;
+            double x1 = filter[s];
+            double x2 = filter[s+1];
+            double y1 = filter[s+2];
+            double y2 = filter[s+3];
+            for (int i = c; i < samples; i += channels) {
+                double x = data[i];
+                double y = b0*x + b1*x1 + b2*x2 - a1*y1 - a2*y2;
+                x2 = x1;
+                x1 = x;
+                y2 = y1;
+                y1 = y;
+                data[i] = (int) y;
+                }
+            filter[s] = x1;
+            filter[s+1] = x2;
+            filter[s+2] = y1;
+            filter[s+3] = y2;
+            }
+        }
+
+    /**
+    * Process channel delay on audio data.
+    * The delay array holds target time in frames, feedback and mix,
+    * and current time, feedback and mix.
+    */
+    private void processDelay(int index, int[] data, int samples) {
+        double[] delay = this.channelDelay[index];
+        float[] buffer = this.channelDelayBuffer[index];
+        double smoothing = getSmoothing(samples, SMOOTH_TIME);
+        delay[3] = smooth(delay[3], delay[0], smoothing);
+        delay[4] = smooth(delay[4], delay[1], smoothing);
+        delay[5] = smooth(delay[5], delay[2], smoothing);
+        int channels = this.channels;
+        int length = buffer.length / channels;
+        int time = Math.max(1, Math.min((int) delay[3], length - 1));
+        double feedback = delay[4];
+        double mix = delay[5];
+        int pos = this.channelDelayPosition[index];
+        for (int i = 0; i < samples - (samples % channels); i += channels) {
+            int read = pos - time;
+            if (read < 0)
+                read += length;
+            for (int c = 0; c < channels; c++) {
+                double x = data[i+c];
+                double delayed = buffer[read*channels + c];
+                buffer[pos*channels + c] = (float) (x + feedback * delayed);
+                data[i+c] = (int) (x + mix * delayed);
+                }
+            if (++pos == length)
+                pos = 0;
+            }
+        this.channelDelayPosition[index] = pos;
+        }
+
+    /**
+    * Process master reverb on audio data, with four parallel comb filters
+    * and two series allpass filters for each channel.
+    * The reverb array holds target room, damping and mix, and current
+    * room, damping and mix.
+    */
+    private void processReverb(int[] data, int samples) {
+        double[] reverb = this.reverb;
+        double smoothing = getSmoothing(samples, SMOOTH_TIME);
+        reverb[3] = smooth(reverb[3], reverb[0], smoothing);
+        reverb[4] = smooth(reverb[4], reverb[1], smoothing);
+        reverb[5] = smooth(reverb[5], reverb[2], smoothing);
+        double feedback = reverb[3] * 0.28 + 0.7;
+        double damp = reverb[4] * 0.4;
+        double mix = reverb[5] * 3.0;
+        float[][] buffer = this.reverbBuffer;
+        int[] position = this.reverbPosition;
+        double[] store = this.reverbStore;
+        int channels = this.channels;
+        for (int i = 0; i < samples - (samples % channels); i += channels) {
+            double input;
+            if (channels == 2)
+                input = (data[i] + data[i+1]) * 0.03;
+            else
+                input = data[i] * 0.06;
+            for (int c = 0; c < channels; c++) {
+                int base = c * 6;
+                double out = 0.0;
+                for (int k = 0; k < 4; k++) {
+                    int b = base + k;
+                    float[] comb = buffer[b];
+                    int p = position[b];
+                    double y = comb[p];
+                    store[c*4+k] = y * (1.0 - damp) + store[c*4+k] * damp;
+                    comb[p] = (float) (input + store[c*4+k] * feedback);
+                    if (++p == comb.length)
+                        p = 0;
+                    position[b] = p;
+                    out += y;
+                    }
+                for (int k = 4; k < 6; k++) {
+                    int b = base + k;
+                    float[] allpass = buffer[b];
+                    int p = position[b];
+                    double y = allpass[p];
+                    allpass[p] = (float) (out + y * 0.5);
+                    out = y - out;
+                    if (++p == allpass.length)
+                        p = 0;
+                    position[b] = p;
+                    }
+                data[i+c] += (int) (out * mix);
+                }
+            }
+        }
+
+    /**
+    * Process master compressor on audio data, reducing gain of level
+    * above threshold by ratio and limiting to full scale. Gain reduction
+    * is applied for the audio data and gain recovers with release time.
+    */
+    private void processCompressor(int[] data, int samples) {
+        int full = this.sampleMax << 8;
+        int peak = checkAudioLevel(data, samples);
+        double threshold = this.compressorThreshold * full;
+        double target = 1.0;
+        if (peak > threshold && this.compressorRatio > 1.0)
+            target = Math.pow(peak / threshold, 1.0 / this.compressorRatio - 1.0);
+        if (peak * target > full)
+            target = (double) full / peak;
+        double start = this.compressorGain;
+        double end;
+        if (target < start) {
+            start = target;
+            end = target;
+            }
+        else
+            end = smooth(start, target, getSmoothing(samples, this.compressorRelease));
+        this.compressorGain = end;
+        if (start == 1.0 && end == 1.0)
+            return;
+        double step = (end - start) / Math.max(samples, 1);
+        double gain = start;
+        for (int i = 0; i < samples; i++) {
+            data[i] = (int) (data[i] * gain);
+            gain += step;
+            }
+        }
+
+    /**
+    * Update ducking level from sidechain peak, and volume of ducked channels.
+    */
+    private void updateDucking() {
+        double key = 0.0;
+        if (this.sidechainPeak > this.duckThreshold * (this.sampleMax << 8))
+            key = 1.0;
+        if (key == this.duckLevel)
+            return;
+        double time;
+        if (key > this.duckLevel)
+            time = this.duckAttack;
+        else
+            time = this.duckRelease;
+        this.duckLevel = smooth(this.duckLevel, key, getSmoothing(this.period/this.sampleByte, time));
+        for (int i = 0; i < this.channelNum+1; i++) {
+            if (this.channelDuck[i] > 0)
+                this.channelDuckVolume[i] = (float) (1.0 - this.channelDuck[i] * this.duckLevel);
+            }
+        }
+
+    /**
+    * Set channel gain applied, reordering voice for quietest policy.
+    */
+    private void setGain(int index, int lgain, int rgain) {
+        if (this.channelLgain[index] == lgain && this.channelRgain[index] == rgain)
+            return;
+        boolean order = this.stealPolicy == QUIETEST && this.channelState[index] != IDLE;
+        if (order)
+            removeVoice(index);
+        this.channelLgain[index] = lgain;
+        this.channelRgain[index] = rgain;
+        if (order)
+            addVoice(index);
+        }
+
+    /**
+    * Read channel data and update channel state.
+    * Argument size is the maximum length to read.
+    * The data source, offset and volume to mix are placed in the mix
+    * fields, before the channel is ended.
+    * Return data length read.
+    */
+    private int readChannel(int index, int size) {
+        int len;
+        if (this.channelData[index] != null) {
+            byte[] data = this.channelData[index];
+            len = Math.min(size, data.length - this.channelPosition[index]);
+            len -= len % this.frameSize;
+            this.mixSource = data;
+            this.mixView = this.channelDataView[index];
+            this.mixOffset = this.channelPosition[index];
+            this.channelPosition[index] += len;
+            }
+        else if (this.channelStream[index] == null && this.channelMap[index] != null) {
+            ByteBuffer map = this.channelMap[index];
+            len = Math.min(size, map.limit() - this.channelPosition[index]);
+            len -= len % this.frameSize;
+            if (this.channelMapView[index] != null && this.signed) {
+                this.mixSource = null;
+                this.mixView = this.channelMapView[index];
+                this.mixOffset = this.channelPosition[index];
+                }
+            else {
+                if (this.channelBuffer[index] == null) {
+                    this.channelBuffer[index] = new byte[this.buffer];
+                    this.channelBufferView[index] = getView(this.channelBuffer[index]);
+                    }
+                ((Buffer) map).position(this.channelPosition[index]);
+                map.get(this.channelBuffer[index], 0, len);
+                this.mixSource = this.channelBuffer[index];
+                this.mixView = this.channelBufferView[index];
+                this.mixOffset = 0;
+                }
+            this.channelPosition[index] += len;
+            }
+        else {
+            if (this.channelBuffer[index] == null) {
+                this.channelBuffer[index] = new byte[this.buffer];
+                this.channelBufferView[index] = getView(this.channelBuffer[index]);
+                }
+            len = readStream(this.channelStream[index], this.channelBuffer[index], size);
+            this.mixSource = this.channelBuffer[index];
+            this.mixView = this.channelBufferView[index];
+            this.mixOffset = 0;
+            }
+        if (len <= 0) {
+            endChannel(index);
+            return 0;
+            }
+        boolean ended = false;
+        long excess = 0;
+        this.channelPlayed[index] += len;
+        long played = this.channelPlayed[index];
+        if (this.channelMaxtime[index] > 0 && played >= this.channelMaxtime[index]) {
+            excess = played - this.channelMaxtime[index];
+            this.channelMaxtime[index] = 0;
+            this.channelLoops[index] = 0;
+            this.channelQueue[index] = null;
+            ended = true;
+            }
+        if (this.channelFadein[index] > 0) {
+            if (played < this.channelFadein[index])
+                this.channelFade[index] = (float) played / this.channelFadein[index];
+            else {
+                this.channelFade[index] = 1.0f;
+                this.channelFadein[index] = 0;
+                }
+            }
+        if (this.channelFadeout[index] > 0) {
+            if (played < this.channelFadeout[index])
+                this.channelFade[index] = Math.min(this.channelFade[index],
+                    (float) (this.channelFadeout[index] - played) / this.channelFadeoutLength[index]);
+            else {
+                excess = Math.max(excess, played - this.channelFadeout[index]);
+                this.channelFade[index] = 0.0f;
+                this.channelFadeout[index] = 0;
+                this.channelLoops[index] = 0;
+                this.channelQueue[index] = null;
+                ended = true;
+                }
+            }
+        len -= (int) excess;
+        float volume = this.channelSoundVolume[index] * this.channelFade[index];
+        volume *= this.channelDuckVolume[index];
+        this.mixLvolume = this.channelLvolume[index] * this.channelPanLvolume[index] * volume;
+        this.mixRvolume = this.channelRvolume[index] * this.channelPanRvolume[index] * volume;
+        if (ended)
+            endChannel(index);
+        return len;
+        }
+
+    /**
+    * Read stream to buffer up to size with whole frames.
+    * Return data length read.
+    */
+    private int readStream(InputStream stream, byte[] buffer, int size) {
+        int len = 0;
+        if (stream == null)
+            return 0;
+        try {
+            while (len < size) {
+                int n = stream.read(buffer, len, size - len);
+                if (n <= 0)
+                    break;
+                len += n;
+                }
+            }
+        catch (IOException e) {}
+        return len - (len % this.frameSize);
+        }
+
+    /**
+    * Channel sound ended, repeat the sound if loops remain, otherwise
+    * start queued sound or stop the channel.
+    */
+    private void endChannel(int index) {
+        if (this.channelLoops[index] != 0) {
+            closeStream(index);
+            this.channelLoops[index]--;
+            if (openChannel(index))
+                return;
+            }
+        else if (this.channelQueue[index] != null) {
+            closeStream(index);
+            this.channelSource[index] = this.channelQueue[index];
+            this.channelQueue[index] = null;
+            this.channelMaxtime[index] = 0;
+            this.channelFadein[index] = 0;
+            this.channelFadeout[index] = 0;
+            this.channelFade[index] = 1.0f;
+            this.channelPlayed[index] = 0;
+            if (openChannel(index)) {
+                this.channelEvents.add(new PropertyChangeEvent(this, "queue",
+                    new Integer(this.channelCount[index]), new Integer(index-1)));
+                return;
+                }
+            }
+        this.channelEvents.add(new PropertyChangeEvent(this, "end",
+            new Integer(this.channelCount[index]), new Integer(index-1)));
+        resetChannel(index);
+        }
+
+    /**
+    * Notify listener of channel events, called without mixer lock.
+    */
+    private void notifyEvents() {
+        Object[] events;
+        synchronized (this) {
+            if (this.channelEvents.isEmpty())
+                return;
+            events = this.channelEvents.toArray();
+            this.channelEvents.clear();
+            }
+        if (this.listener == null)
+            return;
+        for (int i = 0; i < events.length; i++) {
+            try {
+                this.listener.propertyChange((PropertyChangeEvent) events[i]);
+                }
+            catch (RuntimeException e) {}
+            }
+        }
+
+    /**
+    * Open channel source for reading from start.
+    * Return false if source cannot be opened.
+    */
+    private boolean openChannel(int index) {
+        Object source = this.channelSource[index];
+        this.channelPosition[index] = 0;
+        this.channelData[index] = null;
+        this.channelStream[index] = null;
+        if (source instanceof byte[]) {
+            this.channelData[index] = (byte[]) source;
+            this.channelDataView[index] = getView((byte[]) source);
+            return true;
+            }
+        if (source instanceof File || source instanceof ByteBuffer) {
+            if (source != this.channelMapSource[index]) {
+                this.channelMapSource[index] = source;
+                if (source instanceof File)
+                    this.channelMap[index] = mapAudio((File) source);
+                else
+                    this.channelMap[index] = (ByteBuffer) ((ByteBuffer) source).duplicate().slice();
+                this.channelMapView[index] = null;
+                if (this.channelMap[index] != null && this.sampleByte == 2) {
+                    ByteOrder order = this.bigEndian ? ByteOrder.BIG_ENDIAN : ByteOrder.LITTLE_ENDIAN;
+                    this.channelMapView[index] = this.channelMap[index].order(order).asShortBuffer();
+                    }
+                }
+            if (this.channelMap[index] != null)
+                return true;
+            }
+        this.channelStream[index] = openStream(source);
+        return this.channelStream[index] != null;
+        }
+
+    /**
+    * Open stream of channel source File, URL or InputStream.
+    * Return null if source cannot be opened.
+    */
+    private static InputStream openStream(Object source) {
+        try {
+            if (source instanceof File)
+                return AudioSystem.getAudioInputStream((File) source);
+            else if (source instanceof URL)
+                return AudioSystem.getAudioInputStream((URL) source);
+            else if (source instanceof InputStream)
+                return (InputStream) source;
+            }
+        catch (UnsupportedAudioFileException e) {}
+        catch (IOException e) {}
+        return null;
+        }
+
+    /**
+    * Close channel stream.
+    */
+    private void closeStream(int index) {
+        if (this.channelStream[index] != null)
+            closeStream(this.channelStream[index]);
+        this.channelStream[index] = null;
+        this.channelData[index] = null;
+        this.channelDataView[index] = null;
+        }
+
+    /**
+    * Close stream.
+    */
+    private static void closeStream(InputStream stream) {
+        try {
+            stream.close();
+            }
+        catch (IOException e) {}
+        }
+
+    /**
+    * Close channel source without reset of channel settings.
+    */
+    private void closeChannel(int index) {
+        closeStream(index);
+        this.channelSource[index] = null;
+        this.channelMap[index] = null;
+        this.channelMapView[index] = null;
+        this.channelMapSource[index] = null;
+        if (this.channelState[index] != IDLE)
+            removeVoice(index);
+        this.channelState[index] = IDLE;
+        }
+
+    /**
+    * Stop channel and reset channel settings.
+    */
+    private void resetChannel(int index) {
+        closeChannel(index);
+        this.channelQueue[index] = null;
+        this.channelLoops[index] = 0;
+        this.channelPlayed[index] = 0;
+        this.channelMaxtime[index] = 0;
+        this.channelFadein[index] = 0;
+        this.channelFadeout[index] = 0;
+        this.channelFade[index] = 1.0f;
+        this.channelLvolume[index] = 1.0f;
+        this.channelRvolume[index] = 1.0f;
+        this.channelSoundVolume[index] = 1.0f;
+        this.channelPositional[index] = false;
+        this.channelPanLvolume[index] = 1.0f;
+        this.channelPanRvolume[index] = 1.0f;
+        this.channelLgain[index] = -1;
+        this.channelRgain[index] = -1;
+        }
+
+    /**
+    * Write mixed data to mixer line, counting underrun if line buffer
+    * drained since last write.
+    */
+    private void writeLine(int dataLen) {
+        SourceDataLine line = this.line;
+        if (line == null) {
+            if (this.offline)
+                writeOutput(dataLen);
+            return;
+            }
+        int available = line.available();
+        if (this.writing && available >= line.getBufferSize()) {
+            this.underruns++;
+            if (this.lowLatency) {
+                this.latencyTarget = Math.min(this.latencyTarget + this.period, this.buffer);
+                this.latencyStable = 0;
+                }
+            }
+        else if (this.lowLatency && ++this.latencyStable >= LOW_LATENCY_STABLE) {
+            this.latencyTarget = Math.max(this.latencyTarget - this.period, this.period * 2);
+            this.latencyStable = 0;
+            }
+        this.writing = true;
+        dataLen -= dataLen % this.frameSize;
+        this.latency = (line.getBufferSize() - available + dataLen) / this.byteRate;
+        try {
+            line.write(this.byteArray, 0, dataLen);
+            }
+        catch (IllegalArgumentException e) {}
+        }
+
+    /**
+    * Write mixed data to offline output, paced to the audio rate
+    * if realtime.
+    */
+    private void writeOutput(int dataLen) {
+        dataLen -= dataLen % this.frameSize;
+        try {
+            if (this.outputFile != null) {
+                byte[] data = this.byteArray;
+                if (!this.outputFormat.matches(this.audioFormat)) {
+                    data = new byte[dataLen];
+                    System.arraycopy(this.byteArray, 0, data, 0, dataLen);
+                    data = convertAudio(data, this.audioFormat, this.outputFormat);
+                    }
+                this.outputFile.write(data, 0, dataLen);
+                }
+            else if (this.outputStream != null)
+                this.outputStream.write(this.byteArray, 0, dataLen);
+            }
+        catch (IOException e) {}
+        this.outputLen += dataLen;
+        if (!this.realtime)
+            return;
+        long now = System.nanoTime();
+        long time = this.outputStart + (long) (dataLen / this.byteRate * 1000000.0);
+        if (time < now)
+            time = now;
+        this.outputStart = time;
+        long wait = (time - now) / 1000000;
+        if (wait > 0) {
+            try {
+                Thread.sleep(wait);
+                }
+            catch (InterruptedException e) {}
+            }
+        }
+
+    private static int[] resize(int[] array, int size) {
+        int[] resized = new int[size];
+        if (array != null)
+            System.arraycopy(array, 0, resized, 0, Math.min(array.length, size));
+        return resized;
+        }
+
+    private static long[] resize(long[] array, int size) {
+        long[] resized = new long[size];
+        if (array != null)
+            System.arraycopy(array, 0, resized, 0, Math.min(array.length, size));
+        return resized;
+        }
+
+    private static boolean[] resize(boolean[] array, int size) {
+        boolean[] resized = new boolean[size];
+        if (array != null)
+            System.arraycopy(array, 0, resized, 0, Math.min(array.length, size));
+        return resized;
+        }
+
+    private static float[] resize(float[] array, int size) {
+        float[] resized = new float[size];
+        if (array != null)
+            System.arraycopy(array, 0, resized, 0, Math.min(array.length, size));
+        return resized;
+        }
+
+    private static Object[] resize(Object[] array, int size) {
+        return resize(array, new Object[size]);
+        }
+
+    private static Object[] resize(Object[] array, Object[] resized) {
+        if (array != null)
+            System.arraycopy(array, 0, resized, 0, Math.min(array.length, resized.length));
+        return resized;
+        }
+
+    /**
+    * Map audio data of uncompressed WAV or AIFF file in the mixer audio
+    * format, to read without loading the file to memory.
+    * Return buffer of the audio data region, or null if file is not
+    * mappable.
+    */
+    private ByteBuffer mapAudio(File file) {
+        try {
+            if (!this.audioFormat.matches(AudioSystem.getAudioFileFormat(file).getFormat()))
+                return null;
+            RandomAccessFile access = new RandomAccessFile(file, "r");
+            ByteBuffer map;
+            try {
+                FileChannel channel = access.getChannel();
+                if (channel.size() > Integer.MAX_VALUE)
+                    return null;
+                map = channel.map(FileChannel.MapMode.READ_ONLY, 0, channel.size());
+                }
+            finally {
+                access.close();
+                }
+            return getAudioRegion(map);
+            }
+        catch (UnsupportedAudioFileException e) {}
+        catch (IOException e) {}
+        return null;
+        }
+
+    /**
+    * Return buffer of the audio data chunk of a mapped WAV or AIFF file,
+    * or null if not found.
+    */
+    private static ByteBuffer getAudioRegion(ByteBuffer map) {
+        int limit = map.limit();
+        if (limit < 12)
+            return null;
+        byte[] id = new byte[4];
+        map.get(id);
+        String form = new String(id);
+        boolean aiff;
+        if (form.equals("RIFF")) {
+            aiff = false;
+            map.order(ByteOrder.LITTLE_ENDIAN);
+            }
+        else if (form.equals("FORM")) {
+            aiff = true;
+            map.order(ByteOrder.BIG_ENDIAN);
+            }
+        else
+            return null;
+        int pos = 12;
+        while (pos + 8 <= limit) {
+            ((Buffer) map).position(pos);
+            map.get(id);
+            String chunk = new String(id);
+            long size = map.getInt(pos + 4) & 0xffffffffL;
+            int start = pos + 8;
+            if (!aiff && chunk.equals("data")) {
+                return slice(map, start, (int) Math.min(size, limit - start));
+                }
+            else if (aiff && chunk.equals("SSND") && start + 8 <= limit) {
+                int offset = map.getInt(start);
+                start += 8 + offset;
+                if (start > limit)
+                    return null;
+                return slice(map, start, (int) Math.min(size - 8 - offset, limit - start));
+                }
+            pos = (int) Math.min(start + size + (size & 1), limit);
+            }
+        return null;
+        }
+
+    /**
+    * Return buffer of region at start of length.
+    */
+    private static ByteBuffer slice(ByteBuffer buffer, int start, int length) {
+        ((Buffer) buffer).limit(start + length);
+        ((Buffer) buffer).position(start);
+        ByteBuffer region = (ByteBuffer) buffer.slice();
+        ((Buffer) buffer).clear();
+        return region;
+        }
+
+    /**
+    * Load sound file to PCM audio data converted to audio format.
+    * Argument source is a File or URL, and format is the AudioFormat of
+    * the mixer, or null to load without conversion. Audio data is kept
+    * in a process-wide cache keyed by source and format, shared between
+    * sounds and not to be modified, with least recently used data
+    * evicted when the cache exceeds the cache limit.
+    */
+    public static byte[] loadSound(Object source, AudioFormat format)
+            throws IOException, UnsupportedAudioFileException {
+        String key;
+        if (source instanceof File)
+            key = ((File) source).getAbsolutePath();
+        else if (source instanceof URL)
+            key = ((URL) source).toExternalForm();
+        else
+            throw new IllegalArgumentException("source must be File or URL");
+        key += "|" + format;
+        synchronized (soundCache) {
+            byte[] data = (byte[]) soundCache.get(key);
+            if (data != null)
+                return data;
+            }
+        AudioInputStream stream;
+        if (source instanceof File)
+            stream = AudioSystem.getAudioInputStream((File) source);
+        else
+            stream = AudioSystem.getAudioInputStream((URL) source);
+        byte[] data;
+        try {
+            AudioFormat sourceFormat = stream.getFormat();
+            if (!AudioFormat.Encoding.PCM_SIGNED.equals(sourceFormat.getEncoding())
+                    && !AudioFormat.Encoding.PCM_UNSIGNED.equals(sourceFormat.getEncoding())) {
+                sourceFormat = new AudioFormat(sourceFormat.getSampleRate(), 16,
+                    sourceFormat.getChannels(), true, false);
+                stream = AudioSystem.getAudioInputStream(sourceFormat, stream);
+                }
+            data = readAudio(stream);
+            if (format != null)
+                data = convertAudio(data, sourceFormat, format);
+            }
+        finally {
+            stream.close();
+            }
+        synchronized (soundCache) {
+            if (!soundCache.containsKey(key)) {
+                soundCache.put(key, data);
+                soundCacheSize += data.length;
+                trimSoundCache();
+                }
+            }
+        return data;
+        }
+
+    /**
+    * Set sound cache limit in bytes, evicting data above the limit.
+    */
+    public static void setSoundCacheLimit(long limit) {
+        synchronized (soundCache) {
+            soundCacheLimit = limit;
+            trimSoundCache();
+            }
+        }
+
+    /**
+    * Return sound cache limit in bytes.
+    */
+    public static long getSoundCacheLimit() {
+        return soundCacheLimit;
+        }
+
+    /**
+    * Return size in bytes of audio data in the sound cache.
+    */
+    public static long getSoundCacheSize() {
+        synchronized (soundCache) {
+            return soundCacheSize;
+            }
+        }
+
+    /**
+    * Clear sound cache.
+    */
+    public static void clearSoundCache() {
+        synchronized (soundCache) {
+            soundCache.clear();
+            soundCacheSize = 0;
+            }
+        }
+
+    /**
+    * Evict least recently used audio data above the cache limit,
+    * called with sound cache lock.
+    */
+    private static void trimSoundCache() {
+        Iterator iterator = soundCache.values().iterator();
+        while (soundCacheSize > soundCacheLimit && iterator.hasNext()) {
+            soundCacheSize -= ((byte[]) iterator.next()).length;
+            iterator.remove();
+            }
+        }
+
+    /**
+    * Read audio stream to whole frames of audio data.
+    */
+    private static byte[] readAudio(AudioInputStream stream) throws IOException {
+        int frameSize = stream.getFormat().getFrameSize();
+        long frames = stream.getFrameLength();
+        byte[] data;
+        if (frames != AudioSystem.NOT_SPECIFIED && frames * frameSize <= Integer.MAX_VALUE) {
+            data = new byte[(int) (frames * frameSize)];
+            int len = 0;
+            while (len < data.length) {
+                int n = stream.read(data, len, data.length - len);
+                if (n <= 0)
+                    break;
+                len += n;
+                }
+            if (len == data.length)
+                return data;
+            byte[] read = new byte[len - (len % frameSize)];
+            System.arraycopy(data, 0, read, 0, read.length);
+            return read;
+            }
+        ByteArrayOutputStream output = new ByteArrayOutputStream();
+        byte[] buffer = new byte[8192];
+        int n;
+        while ((n = stream.read(buffer, 0, buffer.length)) > 0)
+            output.write(buffer, 0, n);
+        data = output.toByteArray();
+        if (data.length % frameSize == 0)
+            return data;
+        byte[] read = new byte[data.length - (data.length % frameSize)];
+        System.arraycopy(data, 0, read, 0, read.length);
+        return read;
+        }
+
+    /**
+    * Convert PCM audio data to audio format.
+    * Sample rate is converted with linear interpolation, mono is
+    * duplicated to each channel and channels are averaged to mono.
+    * Return data unchanged if already in the audio format.
+    */
+    public static byte[] convertAudio(byte[] data, AudioFormat source, AudioFormat target) {
+        int sourceByte = (source.getSampleSizeInBits() + 7) / 8;
+        int sourceChannels = source.getChannels();
+        boolean sourceSigned = !AudioFormat.Encoding.PCM_UNSIGNED.equals(source.getEncoding());
+        boolean sourceBigEndian = source.isBigEndian();
+        int targetByte = target.getSampleSizeInBits() == 16 ? 2 : 1;
+        int targetChannels = target.getChannels();
+        boolean targetSigned = !AudioFormat.Encoding.PCM_UNSIGNED.equals(target.getEncoding());
+        boolean targetBigEndian = target.isBigEndian();
+        float sourceRate = source.getSampleRate();
+        float targetRate = target.getSampleRate();
+        if (sourceByte == targetByte && sourceChannels == targetChannels
+                && sourceSigned == targetSigned && sourceRate == targetRate
+                && (sourceByte == 1 || sourceBigEndian == targetBigEndian))
+            return data;
+        int sourceFrame = sourceByte * sourceChannels;
+        int frames = data.length / sourceFrame;
+        int[] samples = new int[frames * targetChannels];
+        for (int f = 0; f < frames; f++) {
+            int pos = f * sourceFrame;
+            if (targetChannels == 1 && sourceChannels > 1) {
+                int sum = 0;
+                for (int c = 0; c < sourceChannels; c++)
+                    sum += decodeSample(data, pos + c*sourceByte, sourceByte, sourceSigned, sourceBigEndian);
+                samples[f] = sum / sourceChannels;
+                }
+            else {
+                for (int c = 0; c < targetChannels; c++)
+                    samples[f*targetChannels + c] = decodeSample(data,
+                        pos + (c % sourceChannels)*sourceByte, sourceByte, sourceSigned, sourceBigEndian);
+                }
+            }
+        if (sourceRate != targetRate && frames > 0) {
+            int targetFrames = (int) ((long) frames * (long) targetRate / (long) sourceRate);
+            int[] resampled = new int[targetFrames * targetChannels];
+            long step = (long) (sourceRate * 65536.0 / targetRate);
+            long position = 0;
+            for (int f = 0; f < targetFrames; f++) {
+                int index = (int) (position >> 16);
+                int fraction = (int) (position & 0xffff);
+                int next = index + 1 < frames ? index + 1 : index;
+                for (int c = 0; c < targetChannels; c++) {
+                    int a = samples[index*targetChannels + c];
+                    int b = samples[next*targetChannels + c];
+                    resampled[f*targetChannels + c] = a + (int) (((long) (b - a) * fraction) >> 16);
+                    }
+                position += step;
+                }
+            samples = resampled;
+            }
+        byte[] converted = new byte[samples.length * targetByte];
+        for (int i = 0; i < samples.length; i++)
+            encodeSample(converted, i*targetByte, samples[i], targetByte, targetSigned, targetBigEndian);
+        return converted;
+        }
+
+    /**
+    * Decode sample at index of audio data to 16-bit sample value.
+    */
+    private static int decodeSample(byte[] data, int index, int sampleByte, boolean signed, boolean bigEndian) {
+        int value;
+        if (sampleByte == 1) {
+            if (signed)
+                value = data[index];
+            else
+                value = (data[index] & 0xff) - 128;
+            return value << 8;
+            }
+        int msb = bigEndian ? index : index + sampleByte - 1;
+        int lsb = bigEndian ? msb + 1 : msb - 1;
+        value = (data[msb] << 8) | (data[lsb] & 0xff);
+        if (!signed)
+            value = (value & 0xffff) - 32768;
+        return value;
+        }
+
+    /**
+    * Encode 16-bit sample value at index of audio data.
+    */
+    private static void encodeSample(byte[] data, int index, int value, int sampleByte, boolean signed, boolean bigEndian) {
+        if (sampleByte == 1) {
+            value = (value + 128) >> 8;
+            if (value > 127)
+                value = 127;
+            if (!signed)
+                value += 128;
+            data[index] = (byte) value;
+            return;
+            }
+        if (!signed)
+            value += 32768;
+        if (bigEndian) {
+            data[index] = (byte) (value >> 8);
+            data[index+1] = (byte) value;
+            }
+        else {
+            data[index] = (byte) value;
+            data[index+1] = (byte) (value >> 8);
+            }
+        }
+
     /**
     * Write audio data to mixer line.
     * Argument data is audio data, offset and length is array data to write.
@@ -0,0 +1,338 @@
+//PyJ2D - Copyright (C) 2011 James Garnon <https://gatc.ca/>
+//Released under the MIT License <https://opensource.org/licenses/MIT>
+
+package pyj2d;
+
+
+public class Ndarray {
+
+    /**
+    * Ndarray provides elementwise operations of int and double arrays,
+    * used by the ndarray module for array arithmetic and bit operations
+    * with results of Python semantics, int results wrapped to 32-bit,
+    * and gather and scatter of elements of strided array views.
+    * Operations return OK, or ZERO_DIVISION or NEGATIVE_SHIFT if the
+    * operation is not defined for the values, with result incomplete.
+    */
+    public static final int ADD = 0;
+    public static final int SUB = 1;
+    public static final int MUL = 2;
+    public static final int FLOORDIV = 3;
+    public static final int MOD = 4;
+    public static final int TRUEDIV = 5;
+    public static final int AND = 6;
+    public static final int OR = 7;
+    public static final int XOR = 8;
+    public static final int LSHIFT = 9;
+    public static final int RSHIFT = 10;
+    public static final int NEG = 11;
+    public static final int ABS = 12;
+    public static final int INVERT = 13;
+    public static final int OK = 0;
+    public static final int ZERO_DIVISION = 1;
+    public static final int NEGATIVE_SHIFT = 2;
+
+    private Ndarray() {
+        }
+
+    /**
+    * Operate on elements of int arrays a and b, or a and scalar b if
+    * array b is null, placing results in result. With reverse true, the
+    * scalar is the left operand.
+    */
+    public static int operate(int op, int[] a, int[] b, int scalar, boolean reverse, int[] result) {
+        int size = result.length;
+        for (int i = 0; i < size; i++) {
+            int x = a[i];
+            int y;
+            if (b != null)
+                y = b[i];
+            else
+                y = scalar;
+            if (reverse) {
+                int t = x;
+                x = y;
+                y = t;
+                }
+            switch (op) {
+                case ADD:
+                    result[i] = x + y;
+                    break;
+                case SUB:
+                    result[i] = x - y;
+                    break;
+                case MUL:
+                    result[i] = x * y;
+                    break;
+                case FLOORDIV:
+                    if (y == 0)
+                        return ZERO_DIVISION;
+                    result[i] = floorDiv(x, y);
+                    break;
+                case MOD:
+                    if (y == 0)
+                        return ZERO_DIVISION;
+                    result[i] = floorMod(x, y);
+                    break;
+                case AND:
+                    result[i] = x & y;
+                    break;
+                case OR:
+                    result[i] = x | y;
+                    break;
+                case XOR:
+                    result[i] = x ^ y;
+                    break;
+                case LSHIFT:
+                    if (y < 0)
+                        return NEGATIVE_SHIFT;
+                    if (y > 31)
+                        result[i] = 0;
+                    else
+                        result[i] = x << y;
+                    break;
+                case RSHIFT:
+                    if (y < 0)
+                        return NEGATIVE_SHIFT;
+                    result[i] = x >> Math.min(y, 31);
+                    break;
+                default:
+                    throw new IllegalArgumentException("unsupported operation");
+                }
+            }
+        return OK;
+        }
+
+    /**
+    * Operate on elements of double arrays a and b, or a and scalar b if
+    * array b is null, placing results in result. With reverse true, the
+    * scalar is the left operand.
+    */
+    public static int operate(int op, double[] a, double[] b, double scalar, boolean reverse, double[] result) {
+        int size = result.length;
+        for (int i = 0; i < size; i++) {
+            double x = a[i];
+            double y;
+            if (b != null)
+                y = b[i];
+            else
+                y = scalar;
+            if (reverse) {
+                double t = x;
+                x = y;
+                y = t;
+                }
+            switch (op) {
+                case ADD:
+                    result[i] = x + y;
+                    break;
+                case SUB:
+                    result[i] = x - y;
+                    break;
+                case MUL:
+                    result[i] = x * y;
+                    break;
+                case TRUEDIV:
+                    if (y == 0.0)
+                        return ZERO_DIVISION;
+                    result[i] = x / y;
+                    break;
+                case FLOORDIV:
+                    if (y == 0.0)
+                        return ZERO_DIVISION;
+                    result[i] = Math.floor(x / y);
+                    break;
+                case MOD:
+                    if (y == 0.0)
+                        return ZERO_DIVISION;
+                    double r = x % y;
+                    if (r != 0.0 && ((r < 0.0) != (y < 0.0)))
+                        r += y;
+                    result[i] = r;
+                    break;
+                default:
+                    throw new IllegalArgumentException("unsupported operation");
+                }
+            }
+        return OK;
+        }
+
+    /**
+    * Operate on elements of int array a, placing results in result.
+    */
+    public static void operate(int op, int[] a, int[] result) {
+        int size = result.length;
+        for (int i = 0; i < size; i++) {
+            switch (op) {
+                case NEG:
+                    result[i] = -a[i];
+                    break;
+                case ABS:
+                    result[i] = Math.abs(a[i]);
+                    break;
+                case INVERT:
+                    result[i] = ~a[i];
+                    break;
+                default:
+                    result[i] = a[i];
+                }
+            }
+        }
+
+    /**
+    * Operate on elements of double array a, placing results in result.
+    */
+    public static void operate(int op, double[] a, double[] result) {
+        int size = result.length;
+        for (int i = 0; i < size; i++) {
+            switch (op) {
+                case NEG:
+                    result[i] = -a[i];
+                    break;
+                case ABS:
+                    result[i] = Math.abs(a[i]);
+                    break;
+                default:
+                    result[i] = a[i];
+                }
+            }
+        }
+
+    /**
+    * Gather elements of int array data located by offset and strides of
+    * each dimension of shape, placing values in result in C order. With
+    * shifts not null, elements are 8-bit values packed in the ints of
+    * data, with shift the bit position of the first element and shifts
+    * the bit stride of each dimension.
+    */
+    public static void gather(int[] data, int offset, int[] shape, int[] strides, int shift, int[] shifts, int[] result) {
+        int size = result.length;
+        int ndim = shape.length;
+        int[] counter = new int[ndim];
+        int index = offset;
+        int bits = shift;
+        for (int i = 0; i < size; i++) {
+            if (shifts != null)
+                result[i] = (data[index] >> bits) & 0xff;
+            else
+                result[i] = data[index];
+            for (int axis = ndim - 1; axis >= 0; axis--) {
+                index += strides[axis];
+                if (shifts != null)
+                    bits += shifts[axis];
+                if (++counter[axis] < shape[axis])
+                    break;
+                index -= strides[axis] * shape[axis];
+                if (shifts != null)
+                    bits -= shifts[axis] * shape[axis];
+                counter[axis] = 0;
+                }
+            }
+        }
+
+    /**
+    * Gather elements of double array data located by offset and strides
+    * of each dimension of shape, placing values in result in C order.
+    */
+    public static void gather(double[] data, int offset, int[] shape, int[] strides, double[] result) {
+        int size = result.length;
+        int ndim = shape.length;
+        int[] counter = new int[ndim];
+        int index = offset;
+        for (int i = 0; i < size; i++) {
+            result[i] = data[index];
+            for (int axis = ndim - 1; axis >= 0; axis--) {
+                index += strides[axis];
+                if (++counter[axis] < shape[axis])
+                    break;
+                index -= strides[axis] * shape[axis];
+                counter[axis] = 0;
+                }
+            }
+        }
+
+    /**
+    * Scatter values in C order to elements of int array data located as
+    * in gather, or scalar to all elements if array values is null. With
+    * shifts not null, the low 8 bits of each value are placed in the
+    * packed element.
+    */
+    public static void scatter(int[] data, int offset, int[] shape, int[] strides, int shift, int[] shifts, int[] values, int scalar) {
+        int size = 1;
+        for (int axis = 0; axis < shape.length; axis++)
+            size *= shape[axis];
+        int ndim = shape.length;
+        int[] counter = new int[ndim];
+        int index = offset;
+        int bits = shift;
+        for (int i = 0; i < size; i++) {
+            int value;
+            if (values != null)
+                value = values[i];
+            else
+                value = scalar;
+            if (shifts != null)
+                data[index] = (data[index] & ~(0xff << bits)) | ((value & 0xff) << bits);
+            else
+                data[index] = value;
+            for (int axis = ndim - 1; axis >= 0; axis--) {
+                index += strides[axis];
+                if (shifts != null)
+                    bits += shifts[axis];
+                if (++counter[axis] < shape[axis])
+                    break;
+                index -= strides[axis] * shape[axis];
+                if (shifts != null)
+                    bits -= shifts[axis] * shape[axis];
+                counter[axis] = 0;
+                }
+            }
+        }
+
+    /**
+    * Scatter values in C order to elements of double array data located
+    * as in gather, or scalar to all elements if array values is null.
+    */
+    public static void scatter(double[] data, int offset, int[] shape, int[] strides, double[] values, double scalar) {
+        int size = 1;
+        for (int axis = 0; axis < shape.length; axis++)
+            size *= shape[axis];
+        int ndim = shape.length;
+        int[] counter = new int[ndim];
+        int index = offset;
+        for (int i = 0; i < size; i++) {
+            if (values != null)
+                data[index] = values[i];
+            else
+                data[index] = scalar;
+            for (int axis = ndim - 1; axis >= 0; axis--) {
+                index += strides[axis];
+                if (++counter[axis] < shape[axis])
+                    break;
+                index -= strides[axis] * shape[axis];
+                counter[axis] = 0;
+                }
+            }
+        }
+
+    /**
+    * Return quotient of int values rounded toward negative infinity.
+    */
+    private static int floorDiv(int x, int y) {
+        int q = x / y;
+        if ((x % y != 0) && ((x ^ y) < 0))
+            q--;
+        return q;
+        }
+
+    /**
+    * Return remainder of int values with sign of divisor.
+    */
+    private static int floorMod(int x, int y) {
+        int r = x % y;
+        if (r != 0 && ((r ^ y) < 0))
+            r += y;
+        return r;
+        }
+
+}
@@ -0,0 +1,118 @@
+//PyJ2D - Copyright (C) 2011 James Garnon <https://gatc.ca/>
+//Released under the MIT License <https://opensource.org/licenses/MIT>
+
+package pyj2d;
+
+import java.awt.image.DataBufferInt;
+import java.awt.image.Raster;
+import java.awt.image.SinglePixelPackedSampleModel;
+import java.awt.image.WritableRaster;
+
+
+public class Transform {
+
+    /**
+    * Transform provides pixel transformations of int ARGB pixel arrays,
+    * used by the transform module for operations that are exact pixel
+    * rules rather than interpolated drawing.
+    */
+    private Transform() {
+        }
+
+    /**
+    * Scale pixels to twice the size with the Scale2x (EPX) rule.
+    * Argument src is the pixel array of size width by height, and dst
+    * is the pixel array of size width*2 by height*2 to place the result.
+    * Edge pixels use their own value for neighbours outside the array.
+    */
+    public static void scale2x(int[] src, int width, int height, int[] dst) {
+        int dstWidth = width * 2;
+        for (int y = 0; y < height; y++) {
+            int row = y * width;
+            int rowUp = y > 0 ? row - width : row;
+            int rowDown = y < height-1 ? row + width : row;
+            int pos = y * 2 * dstWidth;
+            for (int x = 0; x < width; x++) {
+                int p = src[row+x];
+                int a = src[rowUp+x];
+                int d = src[rowDown+x];
+                int c = x > 0 ? src[row+x-1] : p;
+                int b = x < width-1 ? src[row+x+1] : p;
+                if (a != d && c != b) {
+                    dst[pos] = c == a ? a : p;
+                    dst[pos+1] = a == b ? b : p;
+                    dst[pos+dstWidth] = c == d ? c : p;
+                    dst[pos+dstWidth+1] = b == d ? d : p;
+                    }
+                else {
+                    dst[pos] = p;
+                    dst[pos+1] = p;
+                    dst[pos+dstWidth] = p;
+                    dst[pos+dstWidth+1] = p;
+                    }
+                pos += 2;
+                }
+            }
+        }
+
+    /**
+    * Flip pixels horizontally, vertically, or both.
+    * Argument src is the pixel array of size width by height, and dst
+    * is the pixel array of the same size to place the result, which
+    * can be src to flip in place.
+    */
+    public static void flip(int[] src, int width, int height, boolean xflip, boolean yflip, int[] dst) {
+        int rows = yflip ? (height+1)/2 : height;
+        for (int y = 0; y < rows; y++) {
+            int pos1 = y * width;
+            int pos2 = (yflip ? height-y-1 : y) * width;
+            int cols = (xflip && pos1 == pos2) ? (width+1)/2 : width;
+            for (int x = 0; x < cols; x++) {
+                int x2 = xflip ? width-x-1 : x;
+                int p1 = src[pos1+x];
+                int p2 = src[pos2+x2];
+                dst[pos1+x] = p2;
+                dst[pos2+x2] = p1;
+                }
+            }
+        }
+
+    /**
+    * Flip pixels horizontally, vertically, or both, from raster src to
+    * raster dst of the same size, both of int pixels in a single pixel
+    * packed sample model and not sharing data.
+    */
+    public static void flip(Raster src, WritableRaster dst, boolean xflip, boolean yflip) {
+        int width = src.getWidth();
+        int height = src.getHeight();
+        DataBufferInt srcData = (DataBufferInt) src.getDataBuffer();
+        DataBufferInt dstData = (DataBufferInt) dst.getDataBuffer();
+        int srcScan = ((SinglePixelPackedSampleModel) src.getSampleModel()).getScanlineStride();
+        int dstScan = ((SinglePixelPackedSampleModel) dst.getSampleModel()).getScanlineStride();
+        int srcPos = getOffset(src, srcScan);
+        int dstPos = getOffset(dst, dstScan);
+        for (int y = 0; y < height; y++) {
+            int pos1 = srcPos + (yflip ? height-y-1 : y) * srcScan;
+            int pos2 = dstPos + y * dstScan;
+            if (xflip) {
+                pos1 += width - 1;
+                for (int x = 0; x < width; x++)
+                    dstData.setElem(pos2+x, srcData.getElem(pos1-x));
+                }
+            else {
+                for (int x = 0; x < width; x++)
+                    dstData.setElem(pos2+x, srcData.getElem(pos1+x));
+                }
+            }
+        }
+
+    /**
+    * Return data position of the first pixel of raster.
+    */
+    private static int getOffset(Raster raster, int scanline) {
+        int x = raster.getMinX() - raster.getSampleModelTranslateX();
+        int y = raster.getMinY() - raster.getSampleModelTranslateY();
+        return raster.getDataBuffer().getOffset() + y * scanline + x;
+        }
+
+}
@@ -12,12 +12,32 @@ from java.awt import BasicStroke, RenderingHints
 from java.awt.geom import Ellipse2D
 from pyj2d.rect import Rect
 from pyj2d.color import Color
+from pyj2d.quality import set_quality, get_quality, _set_hints
 
 
 _rad_deg = 180.0/_pi
 _return_rect = True
 
 
+def _get_hints():
+    hints = {}
+    hints['fast'] = RenderingHints(RenderingHints.KEY_ANTIALIASING,
+                                   RenderingHints.VALUE_ANTIALIAS_OFF)
+    hints['fast'].put(RenderingHints.KEY_RENDERING,
+                      RenderingHints.VALUE_RENDER_SPEED)
+    hints['balanced'] = RenderingHints(RenderingHints.KEY_ANTIALIASING,
+                                       RenderingHints.VALUE_ANTIALIAS_ON)
+    hints['quality'] = RenderingHints(RenderingHints.KEY_ANTIALIASING,
+                                      RenderingHints.VALUE_ANTIALIAS_ON)
+    hints['quality'].put(RenderingHints.KEY_RENDERING,
+                         RenderingHints.VALUE_RENDER_QUALITY)
+    hints['quality'].put(RenderingHints.KEY_STROKE_CONTROL,
+                         RenderingHints.VALUE_STROKE_PURE)
+    return hints
+
+_hints = _get_hints()
+
+
 def rect(surface, color, rect, width=0):
     """
     Draw rectangle shape.
@@ -44,12 +64,13 @@ def rect(surface, color, rect, width=0):
     return surface.get_rect().clip(rect)
 
 
-def circle(surface, color, position, radius, width=0):
+def circle(surface, color, position, radius, width=0, quality=None):
     """
     Draw circular shape.
 
     Arguments include surface to draw, color, position and radius.
     Optional width argument of outline, which defaults to 0 for filled shape.
+    Optional quality argument of profile, which defaults to module setting.
     Return bounding Rect.
     """
     rect = Rect(position[0]-radius, position[1]-radius, 2*radius, 2*radius)
@@ -58,8 +79,7 @@ def circle(surface, color, position, radius, width=0):
         g.setColor(color)
     else:
         g.setColor(Color(color))
-    g.setRenderingHint(RenderingHints.KEY_ANTIALIASING,
-                       RenderingHints.VALUE_ANTIALIAS_ON)
+    _set_hints(g, _hints, quality)
     if width:
         g.setStroke(BasicStroke(width))
         g.drawOval(rect.x, rect.y, rect.width, rect.height)
@@ -71,12 +91,13 @@ def circle(surface, color, position, radius, width=0):
     return surface.get_rect().clip(rect)
 
 
-def ellipse(surface, color, rect, width=0):
+def ellipse(surface, color, rect, width=0, quality=None):
     """
     Draw ellipse shape.
 
     Arguments include surface to draw, color, and rect.
     Optional width argument of outline, which defaults to 0 for filled shape.
+    Optional quality argument of profile, which defaults to module setting.
     Return bounding Rect.
     """
     if not hasattr(rect, 'width'):
@@ -86,8 +107,7 @@ def ellipse(surface, color, rect, width=0):
         g.setColor(color)
     else:
         g.setColor(Color(color))
-    g.setRenderingHint(RenderingHints.KEY_ANTIALIASING,
-                       RenderingHints.VALUE_ANTIALIAS_ON)
+    _set_hints(g, _hints, quality)
     ellipse = Ellipse2D.Double(rect.x, rect.y, rect.width, rect.height)
     if width:
         g.draw(ellipse)
@@ -99,12 +119,13 @@ def ellipse(surface, color, rect, width=0):
     return surface.get_rect().clip(rect)
 
 
-def arc(surface, color, rect, start_angle, stop_angle, width=1):
+def arc(surface, color, rect, start_angle, stop_angle, width=1, quality=None):
     """
     Draw arc shape.
 
     Arguments include surface to draw, color, rect, start_angle, stop_angle.
     Optional width argument of outline.
+    Optional quality argument of profile, which defaults to module setting.
     Return bounding Rect.
     """
     if not hasattr(rect, 'width'):
@@ -116,8 +137,7 @@ def arc(surface, color, rect, start_angle, stop_angle, width=1):
         g.setColor(color)
     else:
         g.setColor(Color(color))
-    g.setRenderingHint(RenderingHints.KEY_ANTIALIASING,
-                       RenderingHints.VALUE_ANTIALIAS_ON)
+    _set_hints(g, _hints, quality)
     if width:
         g.setStroke(BasicStroke(width))
         g.drawArc(rect.x, rect.y, rect.width-1, rect.height-1,
@@ -131,12 +151,13 @@ def arc(surface, color, rect, start_angle, stop_angle, width=1):
     return surface.get_rect().clip(rect)
 
 
-def polygon(surface, color, pointlist, width=0):
+def polygon(surface, color, pointlist, width=0, quality=None):
     """
     Draw polygon shape.
 
     Arguments include surface to draw, color, and pointlist.
     Optional width argument of outline, which defaults to 0 for filled shape.
+    Optional quality argument of profile, which defaults to module setting.
     Return bounding Rect.
     """
     g = surface.createGraphics()
@@ -144,8 +165,7 @@ def polygon(surface, color, pointlist, width=0):
         g.setColor(color)
     else:
         g.setColor(Color(color))
-    g.setRenderingHint(RenderingHints.KEY_ANTIALIASING,
-                       RenderingHints.VALUE_ANTIALIAS_ON)
+    _set_hints(g, _hints, quality)
     xpts = [int(pt[0]) for pt in pointlist]
     ypts = [int(pt[1]) for pt in pointlist]
     npts = len(pointlist)
@@ -165,12 +185,13 @@ def polygon(surface, color, pointlist, width=0):
     return surface.get_rect().clip(rect)
 
 
-def line(surface, color, point1, point2, width=1):
+def line(surface, color, point1, point2, width=1, quality=None):
     """
     Draw line.
 
     Arguments include surface to draw, color, point1, point2.
     Optional width argument of line.
+    Optional quality argument of profile, which defaults to module setting.
     Return bounding Rect.
     """
     g = surface.createGraphics()
@@ -178,8 +199,7 @@ def line(surface, color, point1, point2, width=1):
         g.setColor(color)
     else:
         g.setColor(Color(color))
-    g.setRenderingHint(RenderingHints.KEY_ANTIALIASING,
-                       RenderingHints.VALUE_ANTIALIAS_ON)
+    _set_hints(g, _hints, quality)
     g.setStroke(BasicStroke(width))
     g.drawLine(int(point1[0]), int(point1[1]),
                int(point2[0]), int(point2[1]))
@@ -196,12 +216,13 @@ def line(surface, color, point1, point2, width=1):
     return surface.get_rect().clip(rect)
 
 
-def lines(surface, color, closed, pointlist, width=1):
+def lines(surface, color, closed, pointlist, width=1, quality=None):
     """
     Draw interconnected lines.
 
     Arguments include surface to draw, color, closed, and pointlist.
     Optional width argument of line.
+    Optional quality argument of profile, which defaults to module setting.
     Return bounding Rect.
     """
     xpoints = [int(p[0]) for p in pointlist]
@@ -216,8 +237,7 @@ def lines(surface, color, closed, pointlist, width=1):
         g.setColor(color)
     else:
         g.setColor(Color(color))
-    g.setRenderingHint(RenderingHints.KEY_ANTIALIASING,
-                       RenderingHints.VALUE_ANTIALIAS_ON)
+    _set_hints(g, _hints, quality)
     g.setStroke(BasicStroke(width))
     g.drawPolyline(xpoints, ypoints, npoints)
     g.dispose()
@@ -236,9 +256,10 @@ def aaline(surface, color, point1, point2, blend=1):
     Draw line.
 
     Arguments include surface to draw, color, point1, point2.
+    Line is antialiased with any quality profile.
     Return bounding Rect.
     """
-    rect = line(surface, color, point1, point2)
+    rect = line(surface, color, point1, point2, quality=_get_aa_quality())
     return rect
 
 
@@ -247,12 +268,21 @@ def aalines(surface, color, closed, pointlist, blend=1):
     Draw interconnected lines.
 
     Arguments include surface to draw, color, closed, and pointlist.
+    Lines are antialiased with any quality profile.
     Return bounding Rect.
     """
-    rect = lines(surface, color, closed, pointlist)
+    rect = lines(surface, color, closed, pointlist,
+                 quality=_get_aa_quality())
     return rect
 
 
+def _get_aa_quality():
+    quality = get_quality()
+    if quality == 'fast':
+        return 'balanced'
+    return quality
+
+
 def bounding_rect_return(setting):
     """
     Bounding rect return.
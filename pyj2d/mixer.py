@@ -8,14 +8,13 @@ The module provides function to load sounds and mixer to play sounds.
 """
 
 from javax.sound.sampled import AudioSystem, AudioFormat
-from javax.sound.sampled import LineUnavailableException
-from java.io import ByteArrayInputStream
-from java.io import File, IOException
-from java.lang import Thread, Runnable
-from java.lang import InterruptedException, IllegalArgumentException
+from java.beans import PropertyChangeListener
+from java.io import File
+from java.lang import Thread, String, System, Integer
+from java.nio import ByteBuffer
 from java.util.concurrent import ConcurrentLinkedDeque
+from java.util.concurrent.locks import ReentrantLock
 from java.util import NoSuchElementException
-from java.util.concurrent.atomic import AtomicBoolean
 import jarray
 from pyj2d import env
 from pyj2d import constants as Const
@@ -25,7 +24,7 @@ except ImportError:
     AudioMixer = None
 
 
-class Mixer(Runnable):
+class Mixer(object):
     """
     Mixer object.
     """
@@ -44,9 +43,19 @@ class Mixer(Runnable):
         self._channel_active = ConcurrentLinkedDeque()
         self._channel_reserved = ConcurrentLinkedDeque()
         self._channel_reserved_num = 0
+        self._lock = ReentrantLock()
         self._thread = None
-        self.run = self._process
-        self._active = AtomicBoolean(False)
+        self._output = None
+        self._low_latency = False
+        self._listener = (0.0, 0.0)
+        self._attenuation = ('inverse', 1.0, 1000.0, 1.0)
+        self._steal_policy = None
+        self._filter = (None, 1000.0, 0.707)
+        self._reverb = (0.5, 0.5, 0.0)
+        self._compressor = (1.0, 1.0, 100.0)
+        self._ducking = (0.05, 10.0, 300.0)
+        self._voices_stolen = 0
+        self._plays_rejected = 0
         self._initialized = False
 
     def init(self, frequency=22050, size=-16, channels=2, buffer=4096):
@@ -54,10 +63,12 @@ class Mixer(Runnable):
         Mixer initialization.
 
         Argument sampled frequency, bit size, channels, and buffer.
-        Currently implements PCM 16-bit audio.
+        Implements PCM 8-bit and 16-bit audio.
         Plays WAV, AIFF, and AU sampled audio.
         To specify BigEndian format of AIFF and AU, use size of float type.
-        The mixing is done by Mixer.class, compiled with 'javac Mixer.java'.
+        The mixing and channel processing is done by Mixer.class on the
+        mixer thread, compiled with 'javac Mixer.java'.
+        Output is to the audio device, or as set with set_output.
         For JAR creation include with 'jar uvf App.jar pyj2d/Mixer.class'.
         """
         if not self._initialized:
@@ -79,18 +90,28 @@ class Mixer(Runnable):
             except TypeError:
                 self._mixer = None
                 return None
+            if self._output:
+                self._mixer.setOutput(self._output[0], self._output[1])
+            self._mixer.setLowLatency(self._low_latency)
+            self._mixer.setListenerPosition(self._listener[0],
+                                            self._listener[1])
+            self._set_attenuation()
+            self._set_steal_policy()
+            self._set_effects()
+            self._mixer.setReserved(self._channel_reserved_num)
             if not self._mixer.isInitialized():
                 return None
             self._byteRate = ( self._audio_format.getSampleRate()
                               * self._audio_format.getChannels()
                               * (self._audio_format.getSampleSizeInBits()/8) )
             self._bufferSize = self._mixer.getBufferSize()
-            self._byteArray = jarray.zeros(self._bufferSize, 'b')
+            self._mixer.setNumChannels(self._channel_max)
+            self._mixer.setListener(_ChannelListener(self))
             for id in range(self._channel_max):
                 self._get_channel(id)
             self.music = Music()
             self._initialized = True
-            self._thread = Thread(self)
+            self._thread = Thread(self._mixer)
             self._thread.start()
         return None
 
@@ -104,18 +125,18 @@ class Mixer(Runnable):
     def quit(self):
         """
         Stop mixer processing and release resources.
-        """
-        self._initialized = False
-        return None
 
-    def _quit(self):
-        self.stop()
-        self.music._channel.stop()
-        try:
+        The mixer thread is joined, so offline output is complete.
+        """
+        if self._initialized:
+            self._initialized = False
+            self.stop()
+            self.music._channel.stop()
             self._mixer.quit()
-        except AttributeError:
-            pass
-        self._mixer = None
+            if self._thread != Thread.currentThread():
+                self._thread.join()
+        self._output = None
+        return None
 
     def get_init(self):
         """
@@ -175,6 +196,8 @@ class Mixer(Runnable):
         if count >= self._channel_max:
             current = self._channel_max
             self._channel_max = count
+            if self._initialized:
+                self._mixer.setNumChannels(count)
             for id in range(current, count):
                 self._get_channel(id)
                 self._channel_available.add(id)
@@ -187,6 +210,8 @@ class Mixer(Runnable):
                         self._channels[id].stop()
                     del self._channels[id]
                 self._channel_available.remove(id)
+            if self._initialized:
+                self._mixer.setNumChannels(count)
         return None
 
     def get_num_channels(self):
@@ -210,13 +235,20 @@ class Mixer(Runnable):
         for id in range(self._channel_reserved_num):
             self._channel_reserved.add(id)
             self._channel_available.remove(id)
+        if self._initialized:
+            self._mixer.setReserved(self._channel_reserved_num)
         return None
 
-    def find_channel(self, force=False):
+    def find_channel(self, force=False, priority=None):
         """
         Get an inactive mixer channel.
 
-        Optional force attribute return longest running channel if all active.
+        Optional force attribute return a channel to steal if all active,
+        by the steal policy or the longest running channel by default.
+        Optional priority is the priority of the sound to play, with
+        'priority' policy a channel is stolen only of equal or lower
+        priority, otherwise None is returned. The voice is counted as
+        stolen when a sound is played on the channel.
         """
         try:
             id = self._channel_available.pop()
@@ -231,25 +263,56 @@ class Mixer(Runnable):
                 return self._channels[id]
         except NoSuchElementException:
             pass
-        if not force:
+        if not force or not self._initialized:
             return None
-        longest = None
-        longest_reserved = None
-        for id in self._channel_active.iterator():
-            if id > self._channel_reserved_num-1:
-                longest = id
-                break
-            elif id > -1:
-                if longest_reserved is None:
-                    longest_reserved = id
-        if longest is not None:
-            channel = longest
-        else:
-            if longest_reserved is not None:
-                channel = longest_reserved
-            else:
-                channel = 0
-        return self._channels[channel]
+        if priority is None:
+            priority = Integer.MAX_VALUE
+        id = self._mixer.findVoice(priority)
+        if id < 0:
+            if self._mixer.findVoice(Integer.MAX_VALUE) > -1:
+                return None
+            #no channel busy, as channel ends are pending
+            return self._channels[0]
+        channel = self._channels[id]
+        channel._stolen = channel._count
+        return channel
+
+    def set_steal_policy(self, policy=None):
+        """
+        Set policy of channel stealing when all channels are active.
+
+        Argument policy is 'oldest', 'priority' or 'quietest' to steal
+        the longest running, lowest priority or quietest channel. Sound
+        play steals a channel with a policy set, and find_channel with
+        force uses 'oldest' when policy is None.
+        """
+        if policy not in (None, 'oldest', 'priority', 'quietest'):
+            raise ValueError('unknown steal policy')
+        self._steal_policy = policy
+        if self._initialized:
+            self._set_steal_policy()
+        return None
+
+    def get_steal_policy(self):
+        """
+        Get policy of channel stealing.
+        """
+        return self._steal_policy
+
+    def _set_steal_policy(self):
+        policy = {None: AudioMixer.OLDEST,
+                  'oldest': AudioMixer.OLDEST,
+                  'priority': AudioMixer.PRIORITY,
+                  'quietest': AudioMixer.QUIETEST}[self._steal_policy]
+        self._mixer.setStealPolicy(policy)
+
+    def get_voice_stats(self):
+        """
+        Get channel stealing statistics.
+
+        Return tuple of voices stolen and plays rejected without a channel.
+        """
+        return (self._voices_stolen, self._plays_rejected)
 
     def get_busy(self):
         """
@@ -257,89 +320,197 @@ class Mixer(Runnable):
         """
         for id in self._channel_active.iterator():
             if id > -1:
-                if self._channels[id]._active:
+                if self._mixer.isPlaying(id):
                     return True
         return False
 
-    def _process(self):
-        while self._initialized:
-            if not self._active.get():
-                self._idle()
-                continue
-            if self._channel_active.size() > 1:
-                data, data_len = self._mix(self._channel_active)
-                if data_len > 0:
-                    self._write(data, data_len)
-            else:
-                try:
-                    channel = self._channel_active.getFirst()
-                    data, data_len = self._read(channel)
-                except NoSuchElementException:
-                    data_len = 0
-                if data_len > 0:
-                    self._write(data, data_len)
-        self._quit()
-
-    def _idle(self):
-        try:
-            self._thread.sleep(10)
-        except InterruptedException:
-            Thread.currentThread().interrupt()
-            self.quit()
-
-    def _mix(self, channels):
-        for id in channels.iterator():
-            channel = self._channels[id]
-            if not channel._active.get():
-                continue
-            try:
-                data, data_len, lvol, rvol = channel._get()
-            except AttributeError:
-                continue
-            self._mixer.setAudioData(data, data_len, lvol, rvol)
-        data_len = self._mixer.getAudioData(self._byteArray)
-        return self._byteArray, data_len
-
-    def _read(self, channel):
-        channel = self._channels[channel]
-        if not channel._active.get():
-            data, data_len = None, 0
+    def set_output(self, output=None, realtime=True):
+        """
+        Set mixer output to render audio without an audio device.
+
+        Argument output is a WAV file name, a Java OutputStream such as
+        a ByteArrayOutputStream for audio data in the mixer format,
+        or None to discard audio. Argument realtime paces output to
+        the audio rate, otherwise audio is mixed as fast as possible.
+        Call before init, the output is used until quit.
+        """
+        if isinstance(output, str):
+            output = File(output)
+        self._output = (output, realtime)
+        return None
+
+    def set_low_latency(self, enable=True):
+        """
+        Set low latency mode.
+
+        In low latency mode, audio is mixed in short periods written as
+        the line plays, with latency adapted within the buffer size,
+        increased after underruns and reduced when stable.
+        """
+        self._low_latency = bool(enable)
+        if self._initialized:
+            self._mixer.setLowLatency(self._low_latency)
+        return None
+
+    def get_latency(self):
+        """
+        Get output latency in milliseconds.
+
+        Return tuple of latency measured at the last line write and
+        the latency target.
+        """
+        if self._initialized:
+            return (self._mixer.getLatency(), self._mixer.getLatencyTarget())
         else:
-            try:
-                data, data_len, lvol, rvol = channel._get()
-            except AttributeError:
-                data, data_len = None, 0
-        if data_len:
-            if lvol < 1.0 or rvol < 1.0:
-                data = self._mixer.processVolume(data, data_len, lvol, rvol)
-        return data, data_len
-
-    def _write(self, data, data_len):
-        try:
-            self._mixer.write(data, 0, data_len)
-        except IllegalArgumentException:
-            nonIntegralByte = data_len % self._audio_format.getFrameSize()
-            if nonIntegralByte:
-                data_len -= nonIntegralByte
-                try:
-                    self._mixer.write(data, 0, data_len)
-                except (IllegalArgumentException, LineUnavailableException):
-                    pass
-        except LineUnavailableException:
-            pass
+            return (0.0, 0.0)
+
+    def set_listener(self, position):
+        """
+        Set listener position for positional audio.
+
+        Argument position is (x,y) of the listener, to which positions
+        of channels set with Channel.set_position are relative.
+        """
+        self._listener = (float(position[0]), float(position[1]))
+        if self._initialized:
+            self._mixer.setListenerPosition(self._listener[0],
+                                            self._listener[1])
+        return None
+
+    def get_listener(self):
+        """
+        Get listener position.
+        """
+        return self._listener
+
+    def set_attenuation(self, model='inverse', min_distance=1.0,
+                        max_distance=1000.0, rolloff=1.0):
+        """
+        Set distance attenuation of positional audio.
+
+        Argument model is 'linear', 'inverse' or 'exponential',
+        min_distance is the distance within which volume is full,
+        max_distance is the distance beyond which volume is not reduced
+        further, and rolloff is the rate of attenuation.
+        """
+        if model not in ('linear', 'inverse', 'exponential'):
+            raise ValueError('unknown attenuation model')
+        self._attenuation = (model, float(min_distance),
+                             float(max_distance), float(rolloff))
+        if self._initialized:
+            self._set_attenuation()
+        return None
+
+    def _set_attenuation(self):
+        model, min_distance, max_distance, rolloff = self._attenuation
+        model = {'linear': AudioMixer.LINEAR,
+                 'inverse': AudioMixer.INVERSE,
+                 'exponential': AudioMixer.EXPONENTIAL}[model]
+        self._mixer.setAttenuation(model, min_distance,
+                                   max_distance, rolloff)
+
+    def set_filter(self, type=None, frequency=1000.0, q=0.707):
+        """
+        Set master filter of the mixed audio.
+
+        Argument type is 'lowpass', 'highpass', 'bandpass' or None for
+        no filter, frequency is the cutoff or center frequency in Hz,
+        and q is the filter resonance. Changes are smoothed in the mixer.
+        """
+        self._get_filter_type(type)
+        self._filter = (type, float(frequency), float(q))
+        if self._initialized:
+            self._mixer.setMasterFilter(self._get_filter_type(type),
+                                        self._filter[1], self._filter[2])
+        return None
+
+    def set_reverb(self, room=0.5, damping=0.5, mix=0.0):
+        """
+        Set master reverb of the mixed audio.
+
+        Argument room is the room size and damping the high frequency
+        damping of value 0.0 to 1.0, and mix is the reverb level added,
+        with mix of 0.0 for no reverb.
+        """
+        self._reverb = (float(room), float(damping), float(mix))
+        if self._initialized:
+            self._mixer.setReverb(self._reverb[0], self._reverb[1],
+                                  self._reverb[2])
+        return None
+
+    def set_compressor(self, threshold=1.0, ratio=1.0, release=100):
+        """
+        Set master compressor of the mixed audio.
+
+        Argument threshold is the level of value 0.0 to 1.0 above which
+        level is reduced by ratio, and release is the time in ms of gain
+        recovery. The mixed audio is limited to full scale, which
+        replaces clipping with gain reduction.
+        """
+        self._compressor = (float(threshold), float(ratio), float(release))
+        if self._initialized:
+            self._mixer.setCompressor(self._compressor[0],
+                                      self._compressor[1],
+                                      self._compressor[2])
+        return None
+
+    def set_ducking(self, threshold=0.05, attack=10, release=300):
+        """
+        Set ducking response.
+
+        Argument threshold is the level of value 0.0 to 1.0 of sidechain
+        channels above which channels with ducking set are reduced in
+        volume, and attack and release are the response times in ms.
+        Set channels with Channel.set_sidechain and Channel.set_ducking.
+        """
+        self._ducking = (float(threshold), float(attack), float(release))
+        if self._initialized:
+            self._mixer.setDuckingResponse(self._ducking[0],
+                                           self._ducking[1],
+                                           self._ducking[2])
+        return None
+
+    def _set_effects(self):
+        self._mixer.setMasterFilter(self._get_filter_type(self._filter[0]),
+                                    self._filter[1], self._filter[2])
+        self._mixer.setReverb(self._reverb[0], self._reverb[1],
+                              self._reverb[2])
+        self._mixer.setCompressor(self._compressor[0], self._compressor[1],
+                                  self._compressor[2])
+        self._mixer.setDuckingResponse(self._ducking[0], self._ducking[1],
+                                       self._ducking[2])
+
+    def _get_filter_type(self, type):
+        if type not in (None, 'lowpass', 'highpass', 'bandpass'):
+            raise ValueError('unknown filter type')
+        if type is None:
+            return 0
+        return {'lowpass': AudioMixer.LOWPASS,
+                'highpass': AudioMixer.HIGHPASS,
+                'bandpass': AudioMixer.BANDPASS}[type]
+
+    def get_underruns(self):
+        """
+        Get count of audio line underruns.
+
+        An underrun is counted when the line has played all audio data
+        before the next mixed data is written.
+        """
+        if self._initialized:
+            return self._mixer.getUnderruns()
+        else:
+            return 0
 
     def _activate_channel(self, id):
         if id > self._channel_reserved_num-1:
             self._channel_available.remove(id)
         else:
             self._channel_reserved.remove(id)
+        self._channel_active.remove(id)
         self._channel_active.add(id)
-        self._active.set(True)
 
     def _deactivate_channel(self, id):
         self._channel_active.remove(id)
-        if self._channel_active.isEmpty():
-            self._active.set(False)
 
     def _restore_channel(self, id):
         if id > self._channel_reserved_num-1:
@@ -351,7 +522,6 @@ class Mixer(Runnable):
         try:
             id = self._channel_available.pop()
             self._channel_active.add(id)
-            self._active.set(True)
             return self._channels[id]
         except NoSuchElementException:
             return None
@@ -370,6 +540,20 @@ class Mixer(Runnable):
             raise IndexError('invalid channel index')
 
 
+class _ChannelListener(PropertyChangeListener):
+
+    def __init__(self, mixer):
+        self._mixer = mixer
+
+    def propertyChange(self, event):
+        try:
+            channel = self._mixer._channels[event.getNewValue()]
+        except KeyError:
+            return None
+        channel._notify(event.getPropertyName(), event.getOldValue())
+        return None
+
+
 class Sound(object):
     """
     Sound object
@@ -378,11 +562,16 @@ class Sound(object):
     _id = 0
     _mixer = None
 
-    def __init__(self, sound_file):
+    def __init__(self, sound_file=None, buffer=None):
         """
         Initialize sound object.
 
-        Argument sound_file is sound file.
+        Argument sound_file is sound file, or buffer is audio data in the
+        mixer audio format.
+        Sound file is decoded and converted to the mixer audio format,
+        and the audio data is cached to share with sounds of the file.
+        Buffer of byte array, such as jarray or array of typecode 'b',
+        or java.nio.ByteBuffer is used without copy, other buffer is copied.
         """
         self._id = Sound._id
         Sound._id += 1
@@ -390,9 +579,12 @@ class Sound(object):
             _sound_file = self._get_sound_file(sound_file)
             self._sound_object = self._get_sound_object(_sound_file)
         else:
-            self._sound_object = sound_file
+            if buffer is None:
+                buffer = sound_file
+            self._sound_object = self._get_sound_buffer(buffer)
         self._channel = None
         self._volume = 1.0
+        self._priority = 0
 
     def _get_sound_file(self, sound_file):
         try:
@@ -405,29 +597,74 @@ class Sound(object):
         return _sound_file
 
     def _get_sound_object(self, sound_file):
-        stream = AudioSystem.getAudioInputStream(sound_file)
-        sound_object = jarray.zeros(stream.available(), 'b')
-        stream.read(sound_object)
-        stream.close()
-        return sound_object
+        if AudioMixer is None:
+            stream = AudioSystem.getAudioInputStream(sound_file)
+            sound_object = jarray.zeros(stream.available(), 'b')
+            stream.read(sound_object)
+            stream.close()
+            return sound_object
+        if self._mixer._initialized:
+            audio_format = self._mixer._audio_format
+        else:
+            audio_format = None
+        return AudioMixer.loadSound(sound_file, audio_format)
 
-    def _get_stream(self):
-        return ByteArrayInputStream(self._sound_object)
+    def _get_sound_buffer(self, buffer):
+        if isinstance(buffer, ByteBuffer):
+            return buffer
+        if getattr(buffer, 'typecode', None) == 'b':
+            return buffer
+        if isinstance(buffer, str):
+            return String(buffer).getBytes('ISO-8859-1')
+        return jarray.array(buffer, 'b')
 
-    def play(self, loops=0, maxtime=0, fade_ms=0):
+    def _get_source(self):
+        return self._sound_object
+
+    def _get_data_length(self):
+        if isinstance(self._sound_object, ByteBuffer):
+            return self._sound_object.remaining()
+        return len(self._sound_object)
+
+    def play(self, loops=0, maxtime=0, fade_ms=0, priority=None):
         """
         Play sound on mixer channel.
 
         Argument loops is repeat number or -1 for continuous,
         maxtime is maximum play time, and fade_ms is fade-in time.
+        Optional priority for channel stealing, default is sound priority.
         """
-        self._channel = self._mixer._retrieve_channel()
+        if priority is None:
+            priority = self._priority
+        self._mixer._lock.lock()
         try:
-            self._channel._play(self, loops, maxtime, fade_ms)
-        except AttributeError:
-            pass
+            channel = self._mixer._retrieve_channel()
+            if channel is not None:
+                channel._play(self, loops, maxtime, fade_ms, priority)
+        finally:
+            self._mixer._lock.unlock()
+        if channel is None and self._mixer._steal_policy is not None:
+            channel = self._mixer.find_channel(True, priority)
+            if channel is not None:
+                channel.play(self, loops, maxtime, fade_ms, priority)
+        if channel is None:
+            self._mixer._plays_rejected += 1
+        self._channel = channel
         return self._channel
 
+    def set_priority(self, priority):
+        """
+        Set sound priority for channel stealing, higher value is kept.
+        """
+        self._priority = int(priority)
+        return None
+
+    def get_priority(self):
+        """
+        Get sound priority.
+        """
+        return self._priority
+
     def stop(self):
         """
         Stop sound on active channels.
@@ -467,6 +704,14 @@ class Sound(object):
         elif volume > 1.0:
             volume = 1.0
         self._volume = volume
+        channels = self._mixer._channels
+        for id in self._mixer._channel_active.iterator():
+            if id > -1:
+                try:
+                    if channels[id]._sound._id == self._id:
+                        self._mixer._mixer.setSoundVolume(id, volume)
+                except AttributeError:
+                    continue
         return None
 
     def get_volume(self):
@@ -494,12 +739,16 @@ class Sound(object):
         """
         Get length of sound sample.
         """
-        return len(self._sound_object) / self._mixer._byteRate
+        return self._get_data_length() / self._mixer._byteRate
 
     def get_raw(self):
+        """
+        Get copy of sound data, or read-only view of sound ByteBuffer.
+        """
+        if isinstance(self._sound_object, ByteBuffer):
+            return self._sound_object.asReadOnlyBuffer()
         data = jarray.zeros(len(self._sound_object), 'b')
-        for i in range(len(self._sound_object)):
-            data[i] = self._sound_object[i]
+        System.arraycopy(self._sound_object, 0, data, 0, len(data))
         return data
 
 
@@ -508,17 +757,11 @@ class _SoundStream(Sound):
     def _get_sound_object(self, sound_file):
         return sound_file
 
-    def _get_stream(self):
-        if isinstance(self._sound_object, File):
-            return AudioSystem.getAudioInputStream(self._sound_object)
-        else:
-            return ByteArrayInputStream(self._sound_object)
-
     def get_length(self):
         if not isinstance(self._sound_object, File):
             return Sound.get_length(self)
         else:
-            stream = self._get_stream()
+            stream = AudioSystem.getAudioInputStream(self._sound_object)
             length = ( stream.getFrameLength()
                       / stream.getFormat().getFrameRate() )
             stream.close()
@@ -528,7 +771,7 @@ class _SoundStream(Sound):
         if not isinstance(self._sound_object, File):
             return Sound.get_raw(self)
         else:
-            return Sound._get_sound_object(self, self._sound_object)
+            return Sound._get_sound_object(self, self._sound_object)[:]
 
 
 class Channel(object):
@@ -546,157 +789,116 @@ class Channel(object):
         """
         self._id = id
         self._sound = None
-        self._stream = None
-        self._len = self._mixer._bufferSize
-        self._data = jarray.zeros(self._len, 'b')
-        self._data_len = 0
-        self._data_sum = 0
-        self._data_rate = self._mixer._byteRate / 1000
-        self._active = AtomicBoolean(False)
+        self._count = 0
         self._pause = False
-        self._loops = 0
         self._volume = 1.0
         self._lvolume = 1.0
         self._rvolume = 1.0
+        self._position = None
         self._queue = None
         self._endevent = None
-        self._maxtime = 0
-        self._fadein = 0
-        self._fadeout = 0
-        self._dvol = 1.0
-        self._process = False
+        self._stolen = None
         self._mixer._register_channel(self)
 
-    def _set_sound(self, sound):
+    def _play(self, sound, loops, maxtime, fade_ms, priority=None):
         self._sound = sound
-        self._stream = sound._get_stream()
-
-    def _get(self):
-        try:
-            self._data_len = self._stream.read(self._data, 0, self._len)
-        except IOException:
-            self._data_len = 0
-        if self._data_len > 0:
-            self._data_sum += self._data_len
-            if not self._process:
-                return (self._data,
-                        self._data_len,
-                        self._lvolume*self._sound._volume,
-                        self._rvolume*self._sound._volume)
-            if self._maxtime:
-                self._dvol = 1.0
-                if self._data_sum > self._maxtime:
-                    self._data_len -= (self._data_sum-self._maxtime)
-                    self._maxtime = 0
-                    self._loops = 0
-                    self._onended()
-            if self._fadein:
-                if self._data_sum < self._fadein:
-                    self._dvol = self._data_sum / self._fadein
-                else:
-                    self._dvol = 1.0
-                    self._fadein = 0
-                    if not (self._maxtime or self._fadeout):
-                        self._process = False
-            elif self._fadeout:
-                if self._data_sum < self._fadeout:
-                    self._dvol = 1.0 - (self._data_sum / self._fadeout)
-                else:
-                    self._dvol = 0.01
-                    self._fadeout = 0
-                    self._loops = 0
-                    self._onended()
-            return (self._data,
-                    self._data_len,
-                    self._lvolume*self._sound._volume*self._dvol,
-                    self._rvolume*self._sound._volume*self._dvol)
-        else:
-            self._data_sum = 0
-            self._onended()
-            return (self._data, self._data_len, 1.0, 1.0)
-
-    def _play(self, sound, loops, maxtime, fade_ms):
-        self._set_sound(sound)
-        self._loops = loops
-        if maxtime:
-            self._maxtime = int(maxtime * self._data_rate)
-            self._process = True
-        if fade_ms:
-            self._fadein = fade_ms * self._data_rate
-            self._process = True
-        self._data_sum = 0
-        self._active.set(True)
-
-    def play(self, sound, loops=0, maxtime=0, fade_ms=0):
+        self._queue = None
+        self._pause = False
+        if priority is None:
+            priority = sound._priority
+        self._mixer._mixer.setPriority(self._id, priority)
+        #count set before play as channel events may precede return
+        self._count = self._mixer._mixer.getCount(self._id) + 1
+        self._mixer._mixer.play(self._id,
+                                sound._get_source(),
+                                loops,
+                                int(maxtime),
+                                int(fade_ms),
+                                sound._volume)
+
+    def play(self, sound, loops=0, maxtime=0, fade_ms=0, priority=None):
         """
         Play sound on channel.
 
         Argument sound to play, loops is repeat number or -1 for continuous,
         maxtime is maximum play time, and fade_ms is fade-in time.
+        Optional priority for channel stealing, default is sound priority.
+        Volume and position of a playing channel are kept for the sound,
+        except on a channel stolen with find_channel.
         """
-        if self._sound:
-            lv, rv = self._lvolume, self._rvolume
-            self.stop()
-            self.set_volume(lv, rv)
-        self._set_sound(sound)
-        self._loops = loops
-        if maxtime:
-            self._maxtime = int(maxtime * self._data_rate)
-            self._process = True
-        if fade_ms:
-            self._fadein = fade_ms * self._data_rate
-            self._process = True
-        self._data_sum = 0
-        self._active.set(True)
-        self._mixer._activate_channel(self._id)
-        return None
-
-    def _onended(self):
-        if not self._loops:
-            if not self._queue:
-                self.stop()
+        #channel activated before play as end event may precede return
+        self._mixer._lock.lock()
+        try:
+            if self._sound:
+                if self._stolen == self._count:
+                    #stolen channel settings not kept for new sound
+                    if self._mixer._mixer.isBusy(self._id):
+                        self._mixer._voices_stolen += 1
+                    self.stop()
+                    self.set_volume(1.0)
+                    self.set_position(None)
+                else:
+                    lv, rv = self._lvolume, self._rvolume
+                    position = self._position
+                    self.stop()
+                    self.set_volume(lv, rv)
+                    self.set_position(position)
+            self._stolen = None
+            self._mixer._activate_channel(self._id)
+            self._play(sound, loops, maxtime, fade_ms, priority)
+        finally:
+            self._mixer._lock.unlock()
+        return None
+
+    def _notify(self, event, count):
+        #channel event from mixer thread
+        self._mixer._lock.lock()
+        try:
+            if count != self._count:
+                return None
+            if event == 'queue':
+                self._sound = self._queue
+                self._queue = None
             else:
-                self.play(self._queue)
-        else:
-            self._stream.close()
-            self._set_sound(self._sound)
-            self._loops -= 1
+                self._end()
+        finally:
+            self._mixer._lock.unlock()
+        return None
 
-    def stop(self):
-        """
-        Stop sound on channel.
-        """
-        if not self._active.get() and not self._pause:
-            return None
-        self._active.set(False)
+    def _end(self):
         self._mixer._deactivate_channel(self._id)
-        try:
-            self._stream.close()
-            self._stream = None
-        except AttributeError:
-            pass
         self._sound = None
         self._queue = None
         self._pause = False
-        self._loops = 0
-        self._maxtime = 0
-        self._fadein = 0
-        self._fadeout = 0
         self._volume = 1.0
         self._lvolume = 1.0
         self._rvolume = 1.0
-        self._process = False
+        self._position = None
         self._mixer._restore_channel(self._id)
         if self._endevent is not None:
             env.event.post(self._endevent)
         return None
 
+    def stop(self):
+        """
+        Stop sound on channel.
+        """
+        self._mixer._lock.lock()
+        try:
+            if not self._mixer._mixer.isBusy(self._id):
+                return None
+            self._mixer._mixer.stop(self._id)
+            self._end()
+        finally:
+            self._mixer._lock.unlock()
+        return None
+
     def pause(self):
         """
         Pause sound on channel.
         """
-        if self._active.get():
-            self._active.set(False)
+        if self._mixer._mixer.isPlaying(self._id):
+            self._mixer._mixer.pause(self._id)
             self._pause = True
         return None
 
@@ -705,7 +907,7 @@ class Channel(object):
         Unpause sound on channel.
         """
         if self._pause:
-            self._active.set(True)
+            self._mixer._mixer.unpause(self._id)
             self._pause = False
         return None
 
@@ -713,9 +915,7 @@ class Channel(object):
         """
         Stop sound after fade out time.
         """
-        if self._active.get() or self._pause:
-            self._fadeout = self._data_sum + (time * self._data_rate)
-            self._process = True
+        self._mixer._mixer.fadeout(self._id, int(time))
         return None
 
     def set_volume(self, volume, volume2=None):
@@ -738,6 +938,7 @@ class Channel(object):
         else:
             self._rvolume = self._lvolume
             self._volume = volume
+        self._mixer._mixer.setVolume(self._id, self._lvolume, self._rvolume)
         return None
 
     def get_volume(self):
@@ -746,11 +947,79 @@ class Channel(object):
         """
         return self._volume
 
+    def set_position(self, position):
+        """
+        Set channel position for positional audio.
+
+        Argument position is (x,y) of the sound, attenuated by distance
+        and panned by direction from the listener position, or None
+        for no positional audio. Volume changes are ramped in the mixer.
+        Position is reset when the sound ends, set before play to
+        position the sound from start.
+        """
+        if position is None:
+            self._position = None
+            self._mixer._mixer.clearEmitter(self._id)
+        else:
+            self._position = (float(position[0]), float(position[1]))
+            self._mixer._mixer.setEmitter(self._id, self._position[0],
+                                          self._position[1])
+        return None
+
+    def get_position(self):
+        """
+        Get channel position, or None if not positional.
+        """
+        return self._position
+
+    def set_filter(self, type=None, frequency=1000.0, q=0.707):
+        """
+        Set channel filter.
+
+        Argument type is 'lowpass', 'highpass', 'bandpass' or None for
+        no filter, frequency is the cutoff or center frequency in Hz,
+        and q is the filter resonance. Changes are smoothed in the mixer.
+        Channel effects remain set for sounds played on the channel.
+        """
+        self._mixer._mixer.setFilter(self._id,
+                                     self._mixer._get_filter_type(type),
+                                     float(frequency), float(q))
+        return None
+
+    def set_delay(self, time=0, feedback=0.0, mix=0.0):
+        """
+        Set channel delay.
+
+        Argument time is the delay in ms up to 2000 or 0 for no delay,
+        feedback is the repeated level of value 0.0 to 0.99, and mix is
+        the delayed level added.
+        """
+        self._mixer._mixer.setDelay(self._id, float(time),
+                                    float(feedback), float(mix))
+        return None
+
+    def set_sidechain(self, enable=True):
+        """
+        Set channel as sidechain, its level ducks channels with ducking set.
+        """
+        self._mixer._mixer.setSidechain(self._id, bool(enable))
+        return None
+
+    def set_ducking(self, amount=0.0):
+        """
+        Set channel ducking.
+
+        Argument amount of value 0.0 to 1.0 is the volume reduction when
+        sidechain channels are above the mixer ducking threshold.
+        """
+        self._mixer._mixer.setDucking(self._id, float(amount))
+        return None
+
     def get_busy(self):
         """
         Check if channel is processing sound.
         """
-        return self._active.get() or self._pause
+        return self._mixer._mixer.isBusy(self._id)
 
     def get_sound(self):
         """
@@ -766,6 +1035,7 @@ class Channel(object):
             self.play(sound)
         else:
             self._queue = sound
+            self._mixer._mixer.queue(self._id, sound._get_source())
 
     def get_queue(self):
         """
@@ -814,6 +1084,9 @@ class Music(object):
     def load(self, sound_file):
         """
         Load music file.
+
+        Music is streamed from file, and uncompressed WAV and AIFF files
+        in the mixer audio format are memory-mapped.
         """
         if self._channel.get_busy():
             self._channel.stop()
@@ -849,15 +1122,19 @@ class Music(object):
         """
         if not self._channel._sound or not self._channel.get_busy():
             return None
-        self._channel._active.set(False)
-        restart = not self._channel._pause
-        try:
-            self._channel._stream.close()
-            self._channel._set_sound(self._channel._sound)
-        except AttributeError:
-            restart = False
-        if restart:
-            self._channel._active.set(True)
+        self._channel._mixer._mixer.rewind(self._channel._id)
+        return None
+
+    def set_pos(self, pos):
+        """
+        Set music position.
+
+        Argument pos is the position in seconds from start of music.
+        """
+        if not self._channel._sound or not self._channel.get_busy():
+            return None
+        self._channel._mixer._mixer.setPosition(self._channel._id,
+                                                int(pos*1000))
         return None
 
     def stop(self):
@@ -909,6 +1186,20 @@ class Music(object):
         """
         return self._volume
 
+    def set_filter(self, type=None, frequency=1000.0, q=0.707):
+        """
+        Set music filter, see Channel.set_filter.
+        """
+        self._channel.set_filter(type, frequency, q)
+        return None
+
+    def set_ducking(self, amount=0.0):
+        """
+        Set music ducking, see Channel.set_ducking.
+        """
+        self._channel.set_ducking(amount)
+        return None
+
     def get_busy(self):
         """
         Check if music playing.
@@ -0,0 +1,761 @@
+#PyJ2D - Copyright (C) 2011 James Garnon <https://gatc.ca/>
+#Released under the MIT License <https://opensource.org/licenses/MIT>
+
+"""
+**Ndarray module**
+
+The module provides a lightweight array object over a Java int or double array, with shape, slicing, elementwise arithmetic and bit operations, and transpose. The module serves as the numeric module when JNumeric is not present.
+"""
+
+from __future__ import generators
+import jarray
+import operator
+try:
+    from pyj2d import Ndarray as _Ndarray
+except ImportError:
+    _Ndarray = None
+
+
+Int = Int32 = Int16 = Int8 = 'i'
+Float = Float64 = Float32 = 'd'
+
+
+class ndarray(object):
+    """
+    ndarray object.
+    """
+
+    def __init__(self, shape, data=None, offset=0, strides=None,
+                 shift=None, shifts=None, typecode='i'):
+        """
+        Initialize ndarray object.
+
+        Argument shape is a tuple of the array dimensions.
+        Optional data argument is a Java array referenced by the array,
+        otherwise a zeroed array is created.
+        Optional offset and strides arguments locate elements in data,
+        strides default to C order.
+        Optional shift and shifts arguments define an array of 8-bit
+        values packed in the ints of data, with shift the bit position of
+        the first element and shifts the bit stride of each dimension.
+        Optional typecode argument is 'i' for int or 'd' for double data.
+        """
+        self.shape = tuple(shape)
+        size = 1
+        for dim in self.shape:
+            size *= dim
+        if typecode not in ('i', 'd'):
+            raise ValueError('unsupported typecode')
+        self._typecode = typecode
+        if data is None:
+            data = jarray.zeros(size, typecode)
+        self._data = data
+        self._offset = offset
+        if strides is None:
+            strides = []
+            stride = 1
+            for dim in self.shape[::-1]:
+                strides.insert(0, stride)
+                stride *= dim
+        self._strides = tuple(strides)
+        self._shift = shift
+        if shift is not None and shifts is None:
+            shifts = (0,) * len(self.shape)
+        self._shifts = shifts
+
+    def __str__(self):
+        return str(self.tolist())
+
+    def __repr__(self):
+        return 'ndarray(%s)' % str(self.tolist())
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for i in range(self.shape[0]):
+            yield self[i]
+
+    def _get_ndim(self):
+        return len(self.shape)
+
+    ndim = property(_get_ndim)
+
+    def _get_size(self):
+        size = 1
+        for dim in self.shape:
+            size *= dim
+        return size
+
+    size = property(_get_size)
+
+    def _get_transpose(self):
+        return self.transpose()
+
+    T = property(_get_transpose)
+
+    def __getitem__(self, key):
+        view = self._get_view(key)
+        if view.shape:
+            return view
+        return view._get(view._offset, view._shift)
+
+    def __setitem__(self, key, value):
+        self._get_view(key)._assign(value)
+
+    def _get_view(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > len(self.shape):
+            raise IndexError('too many indices')
+        offset = self._offset
+        shift = self._shift
+        shape = []
+        strides = []
+        shifts = []
+        for axis in range(len(self.shape)):
+            dim = self.shape[axis]
+            stride = self._strides[axis]
+            if shift is not None:
+                bits = self._shifts[axis]
+            else:
+                bits = 0
+            if axis < len(key):
+                index = key[axis]
+            else:
+                index = slice(None)
+            if isinstance(index, slice):
+                start, stop, step = _get_slice(index, dim)
+                offset += start * stride
+                if shift is not None:
+                    shift += start * bits
+                if step > 0:
+                    length = max(0, (stop - start + step - 1) // step)
+                else:
+                    length = max(0, (start - stop - step - 1) // -step)
+                shape.append(length)
+                strides.append(stride * step)
+                shifts.append(bits * step)
+            else:
+                index = int(index)
+                if index < 0:
+                    index += dim
+                if index < 0 or index >= dim:
+                    raise IndexError('index out of range')
+                offset += index * stride
+                if shift is not None:
+                    shift += index * bits
+        if shift is None:
+            shifts = None
+        return self._new_view(shape, offset, strides, shift, shifts)
+
+    def _new_view(self, shape, offset, strides, shift, shifts):
+        return ndarray(shape, self._data, offset, strides, shift, shifts,
+                       self._typecode)
+
+    def _get(self, index, shift):
+        if shift is None:
+            return self._data[index]
+        else:
+            return (self._data[index] >> shift) & 0xff
+
+    def _set(self, index, shift, value):
+        if self._typecode == 'd':
+            self._data[index] = float(value)
+            return None
+        if shift is None:
+            value = int(value) & 0xffffffff
+        else:
+            value = ((self._data[index] & ~(0xff << shift)) |
+                     ((int(value) & 0xff) << shift)) & 0xffffffff
+        if value > 0x7fffffff:
+            value -= 0x100000000
+        self._data[index] = value
+        return None
+
+    def _assign(self, value):
+        if not self.shape:
+            self._set(self._offset, self._shift, value)
+            return None
+        if not isinstance(value, ndarray) and _get_depth(value):
+            value = array(value, self._typecode)
+        if _Ndarray:
+            if isinstance(value, ndarray):
+                if value._typecode == self._typecode:
+                    values = value._broadcast(self.shape)._get_values()
+                    self._scatter(values, 0)
+                    return None
+            elif _is_scalar(value, self._typecode):
+                self._scatter(None, value)
+                return None
+        indices = self._get_indices()
+        if self._shift is not None:
+            shifts = self._get_indices(self._shift, self._shifts)
+        else:
+            shifts = [None] * len(indices)
+        if isinstance(value, ndarray):
+            values = value._broadcast(self.shape)._get_values()
+            for i in range(len(indices)):
+                self._set(indices[i], shifts[i], values[i])
+        else:
+            for i in range(len(indices)):
+                self._set(indices[i], shifts[i], value)
+        return None
+
+    def _is_contiguous(self):
+        if self._shift is not None:
+            return False
+        stride = 1
+        for axis in range(len(self.shape)-1, -1, -1):
+            if self.shape[axis] != 1 and self._strides[axis] != stride:
+                return False
+            stride *= self.shape[axis]
+        return True
+
+    def _get_indices(self, start=None, strides=None):
+        #element positions in C order
+        if start is None:
+            start, strides = self._offset, self._strides
+        indices = [start]
+        for axis in range(len(self.shape)):
+            stride = strides[axis]
+            steps = [i*stride for i in range(self.shape[axis])]
+            indices = [index+step for index in indices for step in steps]
+        return indices
+
+    def _get_layout(self):
+        #view layout as Java arrays for Ndarray gather and scatter
+        shape = jarray.array(list(self.shape), 'i')
+        strides = jarray.array(list(self._strides), 'i')
+        if self._shift is None:
+            return shape, strides, 0, None
+        shifts = jarray.array(list(self._shifts), 'i')
+        return shape, strides, self._shift, shifts
+
+    def _scatter(self, values, scalar):
+        shape, strides, shift, shifts = self._get_layout()
+        if values is not None and not hasattr(values, 'typecode'):
+            values = jarray.array(values, self._typecode)
+        if self._typecode == 'd':
+            _Ndarray.scatter(self._data, self._offset, shape, strides,
+                             values, float(scalar))
+        else:
+            _Ndarray.scatter(self._data, self._offset, shape, strides,
+                             shift, shifts, values, scalar)
+        return None
+
+    def _get_values(self):
+        #element values in C order
+        if self._is_contiguous():
+            return self._data[self._offset:self._offset+self.size]
+        if _Ndarray:
+            shape, strides, shift, shifts = self._get_layout()
+            values = jarray.zeros(self.size, self._typecode)
+            if self._typecode == 'd':
+                _Ndarray.gather(self._data, self._offset, shape, strides,
+                                values)
+            else:
+                _Ndarray.gather(self._data, self._offset, shape, strides,
+                                shift, shifts, values)
+            return values
+        indices = self._get_indices()
+        data = self._data
+        if self._shift is None:
+            return [data[index] for index in indices]
+        shifts = self._get_indices(self._shift, self._shifts)
+        return [(data[indices[i]] >> shifts[i]) & 0xff
+                for i in range(len(indices))]
+
+    def _broadcast(self, shape):
+        if self.shape == tuple(shape):
+            return self
+        if len(self.shape) > len(shape):
+            raise ValueError('array shapes do not match')
+        lead = len(shape) - len(self.shape)
+        strides = [0] * lead
+        shifts = [0] * lead
+        for axis in range(len(self.shape)):
+            dim = self.shape[axis]
+            if dim == shape[lead+axis]:
+                strides.append(self._strides[axis])
+                if self._shift is not None:
+                    shifts.append(self._shifts[axis])
+                else:
+                    shifts.append(0)
+            elif dim == 1:
+                strides.append(0)
+                shifts.append(0)
+            else:
+                raise ValueError('array shapes do not match')
+        if self._shift is None:
+            shifts = None
+        return self._new_view(shape, self._offset, strides,
+                              self._shift, shifts)
+
+    def _operate(self, other, op, typecode=None, reverse=False):
+        values = self._get_values()
+        shape = self.shape
+        if isinstance(other, ndarray) or _get_depth(other):
+            if not isinstance(other, ndarray):
+                other = array(other)
+            shape = _get_broadcast_shape(self.shape, other.shape)
+            values = self._broadcast(shape)._get_values()
+            others = other._broadcast(shape)._get_values()
+            if 'd' in (self._typecode, other._typecode):
+                _typecode = 'd'
+            else:
+                _typecode = 'i'
+            if typecode is None:
+                typecode = _typecode
+            if (_typecode == typecode and
+                    self._typecode == other._typecode):
+                result = _operate(op, values, others, 0, reverse, shape,
+                                  typecode)
+                if result is not None:
+                    return result
+            if reverse:
+                values = map(op, others, values)
+            else:
+                values = map(op, values, others)
+        else:
+            if self._typecode == 'd' or isinstance(other, float):
+                _typecode = 'd'
+            else:
+                _typecode = 'i'
+            if typecode is None:
+                typecode = _typecode
+            if (_typecode == typecode and
+                    _is_scalar(other, self._typecode)):
+                result = _operate(op, values, None, other, reverse, shape,
+                                  typecode)
+                if result is not None:
+                    return result
+            if reverse:
+                values = [op(other, value) for value in values]
+            else:
+                values = [op(value, other) for value in values]
+        return _get_array(shape, values, typecode)
+
+    def _operate_inplace(self, other, op):
+        self._assign(self._operate(other, op, self._typecode))
+        return self
+
+    def _operate_unary(self, op):
+        values = self._get_values()
+        result = _operate(op, values, None, None, False, self.shape,
+                          self._typecode)
+        if result is not None:
+            return result
+        values = [op(value) for value in values]
+        return _get_array(self.shape, values, self._typecode)
+
+    def __add__(self, other):
+        return self._operate(other, operator.add)
+
+    def __radd__(self, other):
+        return self._operate(other, operator.add, reverse=True)
+
+    def __iadd__(self, other):
+        return self._operate_inplace(other, operator.add)
+
+    def __sub__(self, other):
+        return self._operate(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self._operate(other, operator.sub, reverse=True)
+
+    def __isub__(self, other):
+        return self._operate_inplace(other, operator.sub)
+
+    def __mul__(self, other):
+        return self._operate(other, operator.mul)
+
+    def __rmul__(self, other):
+        return self._operate(other, operator.mul, reverse=True)
+
+    def __imul__(self, other):
+        return self._operate_inplace(other, operator.mul)
+
+    def __floordiv__(self, other):
+        return self._operate(other, operator.floordiv)
+
+    def __rfloordiv__(self, other):
+        return self._operate(other, operator.floordiv, reverse=True)
+
+    def __ifloordiv__(self, other):
+        return self._operate_inplace(other, operator.floordiv)
+
+    def __div__(self, other):
+        return self._operate(other, _divide)
+
+    def __rdiv__(self, other):
+        return self._operate(other, _divide, reverse=True)
+
+    def __idiv__(self, other):
+        return self._operate_inplace(other, _divide)
+
+    def __truediv__(self, other):
+        return self._operate(other, operator.truediv, 'd')
+
+    def __rtruediv__(self, other):
+        return self._operate(other, operator.truediv, 'd', True)
+
+    def __itruediv__(self, other):
+        return self._operate_inplace(other, operator.truediv)
+
+    def __mod__(self, other):
+        return self._operate(other, operator.mod)
+
+    def __rmod__(self, other):
+        return self._operate(other, operator.mod, reverse=True)
+
+    def __imod__(self, other):
+        return self._operate_inplace(other, operator.mod)
+
+    def __and__(self, other):
+        return self._operate(other, operator.and_, 'i')
+
+    def __rand__(self, other):
+        return self._operate(other, operator.and_, 'i', True)
+
+    def __iand__(self, other):
+        return self._operate_inplace(other, operator.and_)
+
+    def __or__(self, other):
+        return self._operate(other, operator.or_, 'i')
+
+    def __ror__(self, other):
+        return self._operate(other, operator.or_, 'i', True)
+
+    def __ior__(self, other):
+        return self._operate_inplace(other, operator.or_)
+
+    def __xor__(self, other):
+        return self._operate(other, operator.xor, 'i')
+
+    def __rxor__(self, other):
+        return self._operate(other, operator.xor, 'i', True)
+
+    def __ixor__(self, other):
+        return self._operate_inplace(other, operator.xor)
+
+    def __lshift__(self, other):
+        return self._operate(other, operator.lshift, 'i')
+
+    def __rlshift__(self, other):
+        return self._operate(other, operator.lshift, 'i', True)
+
+    def __ilshift__(self, other):
+        return self._operate_inplace(other, operator.lshift)
+
+    def __rshift__(self, other):
+        return self._operate(other, operator.rshift, 'i')
+
+    def __rrshift__(self, other):
+        return self._operate(other, operator.rshift, 'i', True)
+
+    def __irshift__(self, other):
+        return self._operate_inplace(other, operator.rshift)
+
+    def __neg__(self):
+        return self._operate_unary(operator.neg)
+
+    def __pos__(self):
+        return self._operate_unary(operator.pos)
+
+    def __abs__(self):
+        return self._operate_unary(abs)
+
+    def __invert__(self):
+        return self._operate_unary(operator.invert)
+
+    def transpose(self, axes=None):
+        """
+        Return transposed view of array.
+
+        Optional axes argument is the order of the axes, reversed if
+        not specified.
+        """
+        if axes is None:
+            axes = range(len(self.shape)-1, -1, -1)
+        if len(axes) != len(self.shape):
+            raise ValueError('axes do not match array')
+        shape = [self.shape[axis] for axis in axes]
+        strides = [self._strides[axis] for axis in axes]
+        if self._shift is not None:
+            shifts = [self._shifts[axis] for axis in axes]
+        else:
+            shifts = None
+        return self._new_view(shape, self._offset, strides,
+                              self._shift, shifts)
+
+    def reshape(self, shape):
+        """
+        Return array of shape, a view if array is contiguous.
+        """
+        return reshape(self, shape)
+
+    def ravel(self):
+        """
+        Return one dimensional array, a view if array is contiguous.
+        """
+        return ravel(self)
+
+    def astype(self, typecode):
+        """
+        Return copy of array of typecode.
+        """
+        return array(self, typecode)
+
+    def typecode(self):
+        """
+        Return array typecode.
+        """
+        return self._typecode
+
+    def tojarray(self):
+        """
+        Return array data as a Java array in C order.
+
+        The data referenced by the array is returned if it is the
+        contiguous array data, otherwise a copy.
+        """
+        if (self._is_contiguous() and self._offset == 0 and
+                len(self._data) == self.size):
+            return self._data
+        return _get_array(self.shape, self._get_values(),
+                          self._typecode)._data
+
+    def tolist(self):
+        """
+        Return array as nested lists.
+        """
+        if len(self.shape) == 1:
+            return [self[i] for i in range(self.shape[0])]
+        return [self[i].tolist() for i in range(self.shape[0])]
+
+    def copy(self):
+        """
+        Return copy of array.
+        """
+        return array(self)
+
+
+def array(obj, typecode=None):
+    """
+    Return array of the argument.
+
+    Argument is an ndarray, a Java array, or a nested sequence.
+    Optional typecode argument is 'i' or 'd', otherwise determined
+    from the values.
+    """
+    if isinstance(obj, ndarray):
+        if typecode is None:
+            typecode = obj._typecode
+        return _get_array(obj.shape, obj._get_values(), typecode)
+    if hasattr(obj, 'typecode') and obj.typecode in ('i', 'd'):
+        if typecode is None or typecode == obj.typecode:
+            return ndarray((len(obj),), obj[:], typecode=obj.typecode)
+    shape = []
+    values = [obj]
+    for depth in range(_get_depth(obj)):
+        shape.append(len(values[0]))
+        items = []
+        for value in values:
+            if len(value) != shape[-1]:
+                raise ValueError('sequence shape is not regular')
+            items.extend(list(value))
+        values = items
+    if typecode is None:
+        typecode = 'i'
+        for value in values:
+            if isinstance(value, float):
+                typecode = 'd'
+                break
+    return _get_array(shape, values, typecode)
+
+
+def zeros(shape, typecode='i'):
+    """
+    Return array of shape with values zero.
+    """
+    if not isinstance(shape, (tuple, list)):
+        shape = (shape,)
+    return ndarray(shape, typecode=typecode)
+
+
+def reshape(obj, shape):
+    """
+    Return array of shape.
+
+    Argument is an ndarray, a Java array, or a nested sequence. The
+    array references the data of a contiguous ndarray or Java array.
+    """
+    if not isinstance(shape, (tuple, list)):
+        shape = (shape,)
+    if isinstance(obj, ndarray):
+        if not obj._is_contiguous():
+            obj = array(obj)
+        data, offset, typecode = obj._data, obj._offset, obj._typecode
+        size = obj.size
+    elif hasattr(obj, 'typecode') and obj.typecode in ('i', 'd'):
+        data, offset, typecode = obj, 0, obj.typecode
+        size = len(obj)
+    else:
+        obj = array(obj)
+        data, offset, typecode = obj._data, 0, obj._typecode
+        size = obj.size
+    shape = list(shape)
+    if -1 in shape:
+        dims = 1
+        for dim in shape:
+            if dim != -1:
+                dims *= dim
+        if dims:
+            shape[shape.index(-1)] = size // dims
+    dims = 1
+    for dim in shape:
+        dims *= dim
+    if dims != size:
+        raise ValueError('total size of new array must be unchanged')
+    return ndarray(shape, data, offset, typecode=typecode)
+
+
+def ravel(obj):
+    """
+    Return one dimensional array of the argument.
+    """
+    return reshape(obj, (-1,))
+
+
+def transpose(obj, axes=None):
+    """
+    Return transposed array of the argument.
+    """
+    if not isinstance(obj, ndarray):
+        obj = array(obj)
+    return obj.transpose(axes)
+
+
+def _get_array(shape, values, typecode):
+    if typecode == 'i':
+        values = [((int(value) + 0x80000000) & 0xffffffff) - 0x80000000
+                  for value in values]
+    else:
+        values = [float(value) for value in values]
+    return ndarray(shape, jarray.array(values, typecode), typecode=typecode)
+
+
+def _get_broadcast_shape(shape1, shape2):
+    ndim = max(len(shape1), len(shape2))
+    shape1 = (1,) * (ndim-len(shape1)) + tuple(shape1)
+    shape2 = (1,) * (ndim-len(shape2)) + tuple(shape2)
+    shape = []
+    for i in range(ndim):
+        if shape1[i] == shape2[i] or shape2[i] == 1:
+            shape.append(shape1[i])
+        elif shape1[i] == 1:
+            shape.append(shape2[i])
+        else:
+            raise ValueError('array shapes do not match')
+    return tuple(shape)
+
+
+def _divide(value1, value2):
+    if isinstance(value1, float) or isinstance(value2, float):
+        return value1 / value2
+    return value1 // value2
+
+
+if _Ndarray:
+    _ops = {'i': {operator.add: _Ndarray.ADD,
+                  operator.sub: _Ndarray.SUB,
+                  operator.mul: _Ndarray.MUL,
+                  operator.floordiv: _Ndarray.FLOORDIV,
+                  operator.mod: _Ndarray.MOD,
+                  operator.and_: _Ndarray.AND,
+                  operator.or_: _Ndarray.OR,
+                  operator.xor: _Ndarray.XOR,
+                  operator.lshift: _Ndarray.LSHIFT,
+                  operator.rshift: _Ndarray.RSHIFT,
+                  operator.neg: _Ndarray.NEG,
+                  abs: _Ndarray.ABS,
+                  operator.invert: _Ndarray.INVERT},
+            'd': {operator.add: _Ndarray.ADD,
+                  operator.sub: _Ndarray.SUB,
+                  operator.mul: _Ndarray.MUL,
+                  operator.floordiv: _Ndarray.FLOORDIV,
+                  operator.mod: _Ndarray.MOD,
+                  operator.truediv: _Ndarray.TRUEDIV,
+                  operator.neg: _Ndarray.NEG,
+                  abs: _Ndarray.ABS}}
+    _ops['i'][_divide] = _Ndarray.FLOORDIV
+    _ops['d'][_divide] = _Ndarray.TRUEDIV
+else:
+    _ops = {'i': {}, 'd': {}}
+
+
+def _operate(op, values, others, other, reverse, shape, typecode):
+    #bulk operation on Java arrays, None if op is not supported
+    if op not in _ops[typecode]:
+        return None
+    if not hasattr(values, 'typecode'):
+        values = jarray.array(values, typecode)
+    data = jarray.zeros(len(values), typecode)
+    if other is None:
+        _Ndarray.operate(_ops[typecode][op], values, data)
+        return ndarray(shape, data, typecode=typecode)
+    if others is not None and not hasattr(others, 'typecode'):
+        others = jarray.array(others, typecode)
+    if typecode == 'd':
+        other = float(other)
+    status = _Ndarray.operate(_ops[typecode][op], values, others, other,
+                              reverse, data)
+    if status == _Ndarray.ZERO_DIVISION:
+        raise ZeroDivisionError('division by zero')
+    elif status == _Ndarray.NEGATIVE_SHIFT:
+        raise ValueError('negative shift count')
+    return ndarray(shape, data, typecode=typecode)
+
+
+def _is_scalar(value, typecode):
+    if typecode == 'd':
+        return isinstance(value, (int, float))
+    return (isinstance(value, int) and
+            -0x80000000 <= value <= 0x7fffffff)
+
+
+def _get_slice(index, dim):
+    step = index.step
+    if step is None:
+        step = 1
+    elif step == 0:
+        raise ValueError('slice step cannot be zero')
+    if step > 0:
+        lower, upper = 0, dim
+    else:
+        lower, upper = -1, dim-1
+    bounds = []
+    for value, default in ((index.start, (lower, upper)[step < 0]),
+                           (index.stop, (upper, lower)[step < 0])):
+        if value is None:
+            value = default
+        else:
+            if value < 0:
+                value = max(value + dim, lower)
+            else:
+                value = min(value, upper)
+        bounds.append(value)
+    return bounds[0], bounds[1], step
+
+
+def _get_depth(value):
+    if isinstance(value, ndarray):
+        return len(value.shape)
+    depth = 0
+    while hasattr(value, '__len__') and hasattr(value, '__getitem__'):
+        depth += 1
+        if not len(value):
+            break
+        value = value[0]
+    return depth
@@ -4,7 +4,7 @@
 """
 **Numeric module**
 
-JNumeric module is required for Numeric functionality.
+The numeric module used for array functionality is JNumeric if present, otherwise the builtin ndarray module, which provides arrays over Java arrays with shape, slicing, elementwise arithmetic and bit operations, and transpose. Another array module can be set with set_numeric_module.
 Obtain JNumeric:
 https://central.sonatype.com/artifact/com.github.tbekolay.jnumeric/jnumeric
 JNumeric from this repository works with Jython 2.5.3.
@@ -44,6 +44,10 @@ if not numeric:
         pass
 
 
+if not numeric:
+    from pyj2d import ndarray as numeric
+
+
 def set_numeric_module(module):
     """
     Set numeric module.
@@ -65,7 +69,8 @@ def get_numeric_module():
     """
     Get numeric module.
 
-    Return None if module not present.
+    Return JNumeric if present, otherwise the builtin ndarray module,
+    unless set with set_numeric_module.
     """
     return numeric
 
@@ -0,0 +1,45 @@
+#PyJ2D - Copyright (C) 2011 James Garnon <https://gatc.ca/>
+#Released under the MIT License <https://opensource.org/licenses/MIT>
+
+"""
+**Quality module**
+
+The module provides the quality profile used by draw and transform.
+"""
+
+
+_profiles = ('fast', 'balanced', 'quality')
+_quality = 'balanced'
+
+
+def set_quality(quality):
+    """
+    Set quality profile.
+
+    Profile 'fast' draws without antialiasing and transforms with
+    nearest neighbor interpolation, 'balanced' draws with antialiasing
+    and transforms with bilinear interpolation, and 'quality' also uses
+    quality rendering and pure stroke hints and transforms with bicubic
+    interpolation. The profile is shared by draw and transform, and
+    defaults to 'balanced' on module initialization.
+    """
+    global _quality
+    if quality not in _profiles:
+        raise ValueError('unknown quality profile: %s' % quality)
+    _quality = quality
+
+
+def get_quality():
+    """
+    Get quality profile.
+    """
+    return _quality
+
+
+def _set_hints(g2d, hints, quality):
+    if quality is None:
+        quality = _quality
+    try:
+        g2d.addRenderingHints(hints[quality])
+    except KeyError:
+        raise ValueError('unknown quality profile: %s' % quality)
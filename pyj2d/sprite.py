@@ -7,8 +7,14 @@
 The module provides sprite object functionality.
 """
 
-from pyj2d.rect import rectPool
+from __future__ import generators
+from java.lang import System, Runtime
+from java.util import ArrayList
+from java.util.concurrent import Callable
+from bisect import insort, bisect_left
+from pyj2d.rect import Rect, rectPool
 from pyj2d import mask
+from pyj2d.util import _get_executor
 import sys
 
 if sys.version_info < (3,):
@@ -16,8 +22,69 @@ if sys.version_info < (3,):
     from pyj2d.util import _dict as dict
     if sys.version_info < (2,7):
         from pyj2d.util import _next as next
-    if sys.version_info < (2,5):
-        from java.util import HashSet as set
+
+
+class _SpriteList(object):
+    """
+    Ordered sprite list with constant time removal.
+
+    A removed sprite leaves an empty slot that is skipped in iteration,
+    and slots are compacted when iteration starts or when they exceed
+    half the list length on append. Sprites removed during iteration
+    are not returned, also after the list is compacted or cleared
+    during iteration.
+    """
+
+    __slots__ = ['_list', '_index', '_removed']
+
+    def __init__(self):
+        self._list = []
+        self._index = dict()
+        self._removed = 0
+
+    def __len__(self):
+        return len(self._list) - self._removed
+
+    def __iter__(self):
+        if self._removed:
+            self._compact()
+        sprites = self._list
+        for sprite in sprites:
+            if sprite is not None:
+                if sprites is self._list or id(sprite) in self._index:
+                    yield sprite
+
+    def __contains__(self, sprite):
+        return id(sprite) in self._index
+
+    def append(self, sprite):
+        if self._removed > 64 and self._removed*2 > len(self._list):
+            self._compact()
+        self._index[id(sprite)] = len(self._list)
+        self._list.append(sprite)
+
+    def remove(self, sprite):
+        i = self._index[id(sprite)]
+        del self._index[id(sprite)]
+        self._list[i] = None
+        self._removed += 1
+
+    def clear(self):
+        self._list = []
+        self._index.clear()
+        self._removed = 0
+
+    def copy(self):
+        sprites = _SpriteList()
+        for sprite in self:
+            sprites.append(sprite)
+        return sprites
+
+    def _compact(self):
+        self._list = [sprite for sprite in self._list if sprite is not None]
+        for i, sprite in enumerate(self._list):
+            self._index[id(sprite)] = i
+        self._removed = 0
 
 
 class Sprite(object):
@@ -104,12 +171,48 @@ class DirtySprite(Sprite):
 
     def __init__(self, *groups):
         """
-        Initialize Sprite object.
+        Initialize DirtySprite object.
 
-        Subclass not implemented.
+        Sprite subclass with attributes used by LayeredDirty:
+        dirty 0 not redrawn, 1 redrawn and reset to 0, 2 always redrawn;
+        visible 0 not drawn; blendmode not implemented;
+        source_rect area of image to draw or None for entire image.
+        Optional argument inludes group(s) to place sprite.
         """
+        self.dirty = 1
+        self.blendmode = 0
+        self._visible = 1
+        if not hasattr(self, '_layer'):
+            self._layer = 0
+        self.source_rect = None
         Sprite.__init__(self, *groups)
 
+    def __str__(self):
+        s = '<%s DirtySprite(in %d groups)>'
+        return s % (self.__class__.__name__, len(self._groups))
+
+    def _get_visible(self):
+        return self._visible
+
+    def _set_visible(self, value):
+        self._visible = value
+        if self.dirty < 2:
+            self.dirty = 1
+
+    visible = property(_get_visible, _set_visible)
+
+    def _get_layer(self):
+        return self._layer
+
+    def _set_layer(self, value):
+        if not self.alive():
+            self._layer = value
+        else:
+            raise AttributeError('Cannot set layer of sprite in group, '
+                                 'use group change_layer method')
+
+    layer = property(_get_layer, _set_layer)
+
 
 class Group(object):
     """
@@ -127,6 +230,7 @@ class Group(object):
             self.add(*sprites)
         self._clear_active = False
         self._sprites_drawn = dict()
+        self._sweep = None
 
     def __str__(self):
         s = '<%s(%d sprites)>'
@@ -199,19 +303,43 @@ class Group(object):
                     return False
         return True
 
-    def draw(self, surface):
+    def draw(self, surface, camera=None):
         """
         Draw sprite on surface.
-        """
-        surface._blits([(sprite.image,sprite.rect) for sprite in self])
-        if self._clear_active:
-            rectPool.extend(list(self._sprites_drawn.values()))
-            self._sprites_drawn.clear()
-            for sprite in self._sprites:
-                self._sprites_drawn[sprite] = rectPool.copy(
+
+        Optional camera argument is a Rect of the surface view in world
+        coordinates, sprites are drawn offset by the camera position and
+        sprites outside the view are not drawn.
+        """
+        if camera is None:
+            surface._blits([(sprite.image,sprite.rect) for sprite in self])
+            if self._clear_active:
+                rectPool.extend(list(self._sprites_drawn.values()))
+                self._sprites_drawn.clear()
+                for sprite in self._sprites:
+                    self._sprites_drawn[sprite] = rectPool.copy(
                                                 self._sprites[sprite].rect)
+        else:
+            if not hasattr(camera, 'intersects'):
+                camera = Rect(camera)
+            sprites = self._get_sprites_in(camera)
+            surface._blits([(sprite.image,sprite.rect) for sprite in sprites],
+                           -camera.x, -camera.y)
+            if self._clear_active:
+                rectPool.extend(list(self._sprites_drawn.values()))
+                self._sprites_drawn.clear()
+                for sprite in sprites:
+                    self._sprites_drawn[id(sprite)] = self._get_view_rect(
+                                                sprite.rect, camera)
         return None
 
+    def _get_sprites_in(self, rect):
+        return [sprite for sprite in self if rect.intersects(sprite.rect)]
+
+    def _get_view_rect(self, rect, camera):
+        return rectPool.get(rect.x-camera.x, rect.y-camera.y,
+                            rect.width, rect.height)
+
     def clear(self, surface, background):
         """
         Clear previous sprite drawn to surface
@@ -264,6 +392,100 @@ class RenderClear(Group):
     pass
 
 
+class ParallelGroup(Group):
+    """
+    ParallelGroup object.
+    """
+
+    def __init__(self, *sprites, **kwargs):
+        """
+        Initialize ParallelGroup object.
+
+        Group subclass that updates sprites concurrently on a thread pool.
+        Optional keyword argument workers is the number of partitions of
+        sprites updated concurrently, defaults to number of processors.
+        Optional keyword argument threshold is the sprite count below
+        which update is serial, defaults to 256.
+        Can optionally be called with sprite(s) to add.
+        """
+        if 'workers' in kwargs:
+            self._workers = max(1, kwargs['workers'])
+        else:
+            self._workers = Runtime.getRuntime().availableProcessors()
+        if 'threshold' in kwargs:
+            self._threshold = kwargs['threshold']
+        else:
+            self._threshold = 256
+        self._update_times = []
+        Group.__init__(self, *sprites)
+
+    def copy(self):
+        """
+        Return copy of group.
+        """
+        newgroup = Group.copy(self)
+        newgroup._workers = self._workers
+        newgroup._threshold = self._threshold
+        return newgroup
+
+    def update(self, *args):
+        """
+        Group update.
+
+        Update sprites in group by calling sprite.update. Sprites are
+        partitioned in group order and partitions are updated concurrently,
+        with sprites of a partition updated in order. Sprite update should
+        not depend on update of sprites in other partitions, and changes
+        to shared data should be thread-safe. An exception in a sprite
+        update stops update of the remaining sprites of its partition,
+        and after all partitions complete the exception of the first
+        partition in group order is raised.
+        """
+        sprites = list(self._sprites.values())
+        if len(sprites) < self._threshold or self._workers < 2:
+            time_i = System.nanoTime()
+            for sprite in sprites:
+                sprite.update(*args)
+            self._update_times = [(System.nanoTime()-time_i)/1000000.0]
+            return None
+        executor = _get_executor(Runtime.getRuntime().availableProcessors())
+        size = (len(sprites) + self._workers - 1) // self._workers
+        tasks = ArrayList()
+        for i in range(0, len(sprites), size):
+            tasks.add(_SpriteUpdate(sprites[i:i+size], args))
+        executor.invokeAll(tasks)
+        self._update_times = [task._time for task in tasks]
+        for task in tasks:
+            if task._exception is not None:
+                raise task._exception
+        return None
+
+    def get_update_times(self):
+        """
+        Return list of time (in ms) of each partition in last update.
+        """
+        return self._update_times[:]
+
+
+class _SpriteUpdate(Callable):
+
+    def __init__(self, sprites, args):
+        self._sprites = sprites
+        self._args = args
+        self._time = 0.0
+        self._exception = None
+
+    def call(self):
+        time_i = System.nanoTime()
+        try:
+            for sprite in self._sprites:
+                sprite.update(*self._args)
+        except Exception:
+            self._exception = sys.exc_info()[1]
+        self._time = (System.nanoTime()-time_i)/1000000.0
+        return None
+
+
 class GroupSingle(Group):
     """
     GroupSingle object.
@@ -322,39 +544,55 @@ class RenderUpdates(Group):
         Group.__init__(self, *sprites)
         self.changed_areas = []
 
-    def draw(self, surface):
+    def draw(self, surface, camera=None):
         """
         Draw sprite on surface.
 
+        Optional camera argument is a Rect of the surface view in world
+        coordinates, sprites are drawn offset by the camera position and
+        sprites outside the view are not drawn.
         Returns list of Rect of sprites updated, which can be passed to display.update.
         """
-        surface._blits([(sprite.image,sprite.rect) for sprite in self])
-        if self._clear_active:
-            rectPool.extend(self.changed_areas)
-            self.changed_areas[:] = []
+        if camera is None:
+            surface._blits([(sprite.image,sprite.rect) for sprite in self])
+            rects = dict()
             for sprite in self._sprites:
+                rects[sprite] = self._sprites[sprite].rect
+            self._set_changed_areas(rects)
+        else:
+            if not hasattr(camera, 'intersects'):
+                camera = Rect(camera)
+            sprites = self._get_sprites_in(camera)
+            surface._blits([(sprite.image,sprite.rect) for sprite in sprites],
+                           -camera.x, -camera.y)
+            rects = dict()
+            for sprite in sprites:
+                rects[id(sprite)] = self._get_view_rect(sprite.rect, camera)
+            self._set_changed_areas(rects)
+            rectPool.extend(list(rects.values()))
+        return self.changed_areas
+
+    def _set_changed_areas(self, rects):
+        rectPool.extend(self.changed_areas)
+        self.changed_areas[:] = []
+        if self._clear_active:
+            for sprite in rects:
                 if sprite in self._sprites_drawn:
-                    if self._sprites_drawn[sprite].intersects(
-                                   self._sprites[sprite].rect):
-                        self._sprites_drawn[sprite].union_ip(
-                                  self._sprites[sprite].rect)
+                    if self._sprites_drawn[sprite].intersects(rects[sprite]):
+                        self._sprites_drawn[sprite].union_ip(rects[sprite])
                     else:
                         self.changed_areas.append(
-                            rectPool.copy(self._sprites[sprite].rect))
+                            rectPool.copy(rects[sprite]))
                 else:
                     self.changed_areas.append(
-                            rectPool.copy(self._sprites[sprite].rect))
+                            rectPool.copy(rects[sprite]))
             self.changed_areas.extend(list(self._sprites_drawn.values()))
             self._sprites_drawn.clear()
-            for sprite in self._sprites:
-                self._sprites_drawn[sprite] = rectPool.copy(
-                                 self._sprites[sprite].rect)
+            for sprite in rects:
+                self._sprites_drawn[sprite] = rectPool.copy(rects[sprite])
         else:
-            rectPool.extend(self.changed_areas)
-            self.changed_areas[:] = []
-            self.changed_areas.extend([rectPool.copy(sprite.rect)
-                                       for sprite in self._sprites.values()])
-        return self.changed_areas
+            self.changed_areas.extend([rectPool.copy(rects[sprite])
+                                       for sprite in rects])
 
 
 class OrderedUpdates(RenderUpdates):
@@ -369,7 +607,7 @@ class OrderedUpdates(RenderUpdates):
         RenderUpdates subclass that maintains order of sprites.
         Can optionally be called with sprite(s) to add.
         """
-        self._orderedsprites = []
+        self._orderedsprites = _SpriteList()
         RenderUpdates.__init__(self, *sprites)
 
     def __iter__(self):
@@ -379,14 +617,14 @@ class OrderedUpdates(RenderUpdates):
         """
         Return ordered list of sprites in the group.
         """
-        return self._orderedsprites[:]
+        return list(self._orderedsprites)
 
     def copy(self):
         """
         Return copy of group.
         """
         newgroup = RenderUpdates.copy(self)
-        newgroup._orderedsprites = self._orderedsprites[:]
+        newgroup._orderedsprites = self._orderedsprites.copy()
         return newgroup
 
     def add(self, *sprites):
@@ -425,7 +663,7 @@ class OrderedUpdates(RenderUpdates):
         """
         Empty group.
         """
-        self._orderedsprites[:] = []
+        self._orderedsprites.clear()
         RenderUpdates.empty(self)
 
 
@@ -449,6 +687,11 @@ class LayeredUpdates(OrderedUpdates):
         """
         self._layer = {}
         self._layers = []
+        self._spritelayer = dict()
+        self._orderedsprites = []
+        self._ordered = True
+        self._spriteorder = None
+        self._index = None
         if 'default_layer' not in kwargs:
             self._default_layer = 0
         else:
@@ -457,22 +700,40 @@ class LayeredUpdates(OrderedUpdates):
             self._override_layer = None
         else:
             self._override_layer = kwargs['layer']
-        OrderedUpdates.__init__(self, *sprites)
+        RenderUpdates.__init__(self, *sprites)
+
+    def __iter__(self):
+        return iter(self._get_orderedsprites())
+
+    def sprites(self):
+        """
+        Return ordered list of sprites in the group.
+        """
+        return self._get_orderedsprites()[:]
+
+    def _get_orderedsprites(self):
+        if not self._ordered:
+            sprites = []
+            for layer in self._layers:
+                sprites.extend(self._layer[layer])
+            self._orderedsprites = sprites
+            self._ordered = True
+            self._spriteorder = None
+        return self._orderedsprites
 
     def copy(self):
         """
         Return copy of group.
         """
-        newgroup = OrderedUpdates.copy(self)
-        for layer in self._layer:
-            layer_data = {}
-            layer_data['sprite'] = set()
-            for spriteID in self._layer[layer]['sprite']:
-                layer_data['sprite'].add(spriteID)
-            layer_data['index'] = self._layer[layer]['index'][:]
-            newgroup._layer[layer] = layer_data
+        newgroup = RenderUpdates.copy(self)
+        for layer in self._layers:
+            newgroup._layer[layer] = self._layer[layer].copy()
         newgroup._layers = self._layers[:]
+        newgroup._spritelayer = self._spritelayer.copy()
+        newgroup._ordered = False
         newgroup._default_layer = self._default_layer
+        if self._index is not None:
+            newgroup.set_index(True, self._index._cell_size)
         return newgroup
 
     def add(self, *sprites, **kwargs):
@@ -497,18 +758,7 @@ class LayeredUpdates(OrderedUpdates):
                         layer = sprite._layer
                     else:
                         layer = self._default_layer
-                    if layer not in self._layer:
-                        self._add_layer(layer)
-                    self._layer[layer]['sprite'].add(spriteID)
-                    i = self._layer[layer]['index'][1]
-                    self._orderedsprites.insert(i, sprite)
-                    self._layer[layer]['index'][1] += 1
-                    index = self._layers.index(layer)
-                    while index < len(self._layers) - 1:
-                        index += 1
-                        _layer = self._layers[index]
-                        self._layer[_layer]['index'][0] += 1
-                        self._layer[_layer]['index'][1] += 1
+                    self._add_sprite(sprite, layer)
             else:
                 if self._override_layer is not None:
                     kwargs['layer'] = self._override_layer
@@ -516,16 +766,27 @@ class LayeredUpdates(OrderedUpdates):
         self._override_layer = None
         return None
 
-    def _add_layer(self, layer):
-        self._layers.append(layer)
-        self._layers.sort()
-        index = self._layers.index(layer)
-        if index > 0:
-            _layer = self._layers[index-1]
-            i = self._layer[_layer]['index'][1]
-        else:
-            i = 0
-        self._layer[layer] = {'sprite':set(), 'index':[i,i]}
+    def _add_sprite(self, sprite, layer):
+        if layer not in self._layer:
+            insort(self._layers, layer)
+            self._layer[layer] = _SpriteList()
+        self._layer[layer].append(sprite)
+        self._spritelayer[id(sprite)] = layer
+        self._ordered = False
+        if self._index is not None:
+            self._index.add(sprite)
+
+    def _remove_sprite(self, sprite):
+        layer = self._spritelayer[id(sprite)]
+        del self._spritelayer[id(sprite)]
+        sprites = self._layer[layer]
+        sprites.remove(sprite)
+        if not sprites:
+            del self._layer[layer]
+            del self._layers[bisect_left(self._layers, layer)]
+        self._ordered = False
+        if self._index is not None:
+            self._index.remove(sprite)
 
     def remove(self, *sprites):
         """
@@ -537,22 +798,7 @@ class LayeredUpdates(OrderedUpdates):
                 if spriteID in self._sprites:
                     del self._sprites[spriteID]
                     del sprite._groups[id(self)]
-                    for layer in self._layers:
-                        if spriteID in self._layer[layer]['sprite']:
-                            break
-                    self._layer[layer]['sprite'].remove(spriteID)
-                    self._layer[layer]['index'][1] -= 1
-                    index = self._layers.index(layer)
-                    while index < len(self._layers) - 1:
-                        index += 1
-                        _layer = self._layers[index]
-                        self._layer[_layer]['index'][0] -= 1
-                        self._layer[_layer]['index'][1] -= 1
-                    if (self._layer[layer]['index'][0]
-                            == self._layer[layer]['index'][1]):
-                        del self._layer[layer]
-                        self._layers.remove(layer)
-                    self._orderedsprites.remove(sprite)
+                    self._remove_sprite(sprite)
             else:
                 self.remove(*sprite)
         return None
@@ -563,30 +809,139 @@ class LayeredUpdates(OrderedUpdates):
         """
         self._layers[:] = []
         self._layer.clear()
-        OrderedUpdates.empty(self)
+        self._spritelayer.clear()
+        self._orderedsprites = []
+        self._ordered = True
+        if self._index is not None:
+            self._index.clear()
+        RenderUpdates.empty(self)
+
+    def update(self, *args):
+        """
+        Group update.
+
+        Update sprites in group by calling sprite.update.
+        If region index is active, sprites moved are updated in index.
+        """
+        RenderUpdates.update(self, *args)
+        if self._index is not None:
+            self.update_index()
+        return None
+
+    def set_index(self, active=True, cell_size=32):
+        """
+        Set region index of sprite rects.
+
+        Region index provides sprite queries by get_sprites_at,
+        get_sprites_in and get_sprites_within that check only sprites
+        in the query area. Sprites moved are updated in index by group
+        update, and sprites moved otherwise require update_index call.
+        Argument active set or unset index, and optional cell_size is
+        the smallest grid cell of the index.
+        """
+        if active:
+            self._index = _RegionIndex(cell_size)
+            for sprite in self._get_orderedsprites():
+                self._index.add(sprite)
+        else:
+            self._index = None
+        return None
+
+    def update_index(self, *sprites):
+        """
+        Update sprites moved in region index.
+
+        Optional sprites argument, otherwise all sprites are updated.
+        """
+        if self._index is None:
+            return None
+        if not sprites:
+            sprites = self._get_orderedsprites()
+        for sprite in sprites:
+            if id(sprite) in self._sprites:
+                self._index.update(sprite)
+        return None
 
     def get_sprites_at(self, position):
         """
         Return sprites at position.
         """
         colliding_sprites = []
-        for sprite in self._orderedsprites:
+        if self._index is None:
+            sprites = self._get_orderedsprites()
+        else:
+            sprites = self._index.query(position[0], position[1], 1, 1)
+        for sprite in sprites:
             if sprite.rect.collidepoint(position):
                 colliding_sprites.append(sprite)
+        if self._index is not None:
+            colliding_sprites = self._sort_sprites(colliding_sprites)
         return colliding_sprites
 
+    def get_sprites_in(self, rect):
+        """
+        Return sprites that intersect rect.
+        """
+        if not hasattr(rect, 'intersects'):
+            rect = Rect(rect)
+        if self._index is None:
+            return Group._get_sprites_in(self, rect)
+        sprites = self._index.query(rect.x, rect.y, rect.width, rect.height)
+        colliding_sprites = []
+        for sprite in sprites:
+            if rect.intersects(sprite.rect):
+                colliding_sprites.append(sprite)
+        return self._sort_sprites(colliding_sprites)
+
+    def get_sprites_within(self, position, radius):
+        """
+        Return sprites that intersect circle of radius at position.
+        """
+        x, y = position[0], position[1]
+        if self._index is None:
+            sprites = self._get_orderedsprites()
+        else:
+            size = int(radius) + 1
+            sprites = self._index.query(x-size, y-size, size*2, size*2)
+        colliding_sprites = []
+        radius_sq = radius * radius
+        for sprite in sprites:
+            rect = sprite.rect
+            dx = x - max(rect.x, min(x, rect.x+rect.width))
+            dy = y - max(rect.y, min(y, rect.y+rect.height))
+            if dx*dx + dy*dy <= radius_sq:
+                colliding_sprites.append(sprite)
+        if self._index is not None:
+            colliding_sprites = self._sort_sprites(colliding_sprites)
+        return colliding_sprites
+
+    def _get_sprites_in(self, rect):
+        return self.get_sprites_in(rect)
+
+    def _sort_sprites(self, sprites):
+        if len(sprites) < 2:
+            return sprites
+        orderedsprites = self._get_orderedsprites()
+        if self._spriteorder is None:
+            self._spriteorder = dict()
+            for i, sprite in enumerate(orderedsprites):
+                self._spriteorder[id(sprite)] = i
+        order = self._spriteorder
+        sprite_order = [(order[id(sprite)], sprite) for sprite in sprites]
+        sprite_order.sort()
+        return [sprite for i, sprite in sprite_order]
+
     def get_sprite(self, index):
         """
         Return sprite at sprites index.
         """
-        return self._orderedsprites[index]
+        return self._get_orderedsprites()[index]
 
     def remove_sprites_of_layer(self, layer):
         """
         Return sprites removed from layer.
         """
-        i,j = self._layer[layer]['index']
-        sprites = self._orderedsprites[i:j]
+        sprites = list(self._layer[layer])
         for sprite in sprites:
             self.remove(sprite)
         return sprites
@@ -601,17 +956,18 @@ class LayeredUpdates(OrderedUpdates):
         """
         Move sprite to new layer.
         """
-        self.remove(sprite)
-        self.add(sprite, layer=new_layer)
+        if id(sprite) in self._sprites:
+            self._remove_sprite(sprite)
+            self._add_sprite(sprite, new_layer)
+        else:
+            self.add(sprite, layer=new_layer)
         return None
 
     def get_layer_of_sprite(self, sprite):
         """
         Return layer of sprite.
         """
-        for layer in self._layers:
-            if id(sprite) in self._layer[layer]['sprite']:
-                return layer
+        return self._spritelayer.get(id(sprite))
 
     def get_top_layer(self):
         """
@@ -629,40 +985,118 @@ class LayeredUpdates(OrderedUpdates):
         """
         Move sprite to top layer.
         """
-        self.remove(sprite)
-        self.add(sprite, layer=self._layers[-1])
+        self.change_layer(sprite, self._layers[-1])
         return None
 
     def move_to_back(self, sprite):
         """
         Move sprite to layer under bottom layer.
         """
-        new_layer = self._layers[0]-1
-        self.remove(sprite)
-        self.add(sprite, layer=new_layer)
+        self.change_layer(sprite, self._layers[0]-1)
         return None
 
     def get_top_sprite(self):
         """
         Return sprite at top.
         """
-        return self._orderedsprites[-1]
+        return self._get_orderedsprites()[-1]
 
     def get_sprites_from_layer(self, layer):
         """
         Return sprites on layer.
         """
-        i,j = self._layer[layer]['index']
-        return self._orderedsprites[i:j]
+        return list(self._layer[layer])
 
     def switch_layer(self, layer1, layer2):
         """
         Move sprites to new layer.
         """
-        sprites1 = self.remove_sprites_of_layer(layer1)
-        sprites2 = self.remove_sprites_of_layer(layer2)
-        self.add(sprites1, layer=layer2)
-        self.add(sprites2, layer=layer1)
+        sprites1 = self._layer[layer1]
+        sprites2 = self._layer[layer2]
+        self._layer[layer1] = sprites2
+        self._layer[layer2] = sprites1
+        for sprite in sprites1:
+            self._spritelayer[id(sprite)] = layer2
+        for sprite in sprites2:
+            self._spritelayer[id(sprite)] = layer1
+        self._ordered = False
+
+
+class _RegionIndex(object):
+    """
+    Hierarchical grid index of sprite rects.
+
+    A sprite is placed in the grid level with cell size not less than
+    the sprite size, in the cell at the rect position. A query checks
+    the cells that overlap the query area extended by one cell.
+    """
+
+    __slots__ = ['_cell_size', '_levels', '_entries']
+
+    def __init__(self, cell_size=32):
+        self._cell_size = cell_size
+        self._levels = {}
+        self._entries = dict()
+
+    def add(self, sprite):
+        rect = sprite.rect
+        x, y, width, height = rect.x, rect.y, rect.width, rect.height
+        level = 0
+        size = self._cell_size
+        while size < width or size < height:
+            size *= 2
+            level += 1
+        key = (x//size, y//size)
+        if level not in self._levels:
+            self._levels[level] = {}
+        cells = self._levels[level]
+        if key not in cells:
+            cells[key] = {}
+        cells[key][id(sprite)] = sprite
+        self._entries[id(sprite)] = (level, key, x, y, width, height)
+
+    def remove(self, sprite):
+        level, key = self._entries[id(sprite)][:2]
+        del self._entries[id(sprite)]
+        cells = self._levels[level]
+        del cells[key][id(sprite)]
+        if not cells[key]:
+            del cells[key]
+            if not cells:
+                del self._levels[level]
+
+    def update(self, sprite):
+        rect = sprite.rect
+        entry = self._entries[id(sprite)]
+        if (entry[2] == rect.x and entry[3] == rect.y and
+            entry[4] == rect.width and entry[5] == rect.height):
+            return None
+        self.remove(sprite)
+        self.add(sprite)
+
+    def clear(self):
+        self._levels.clear()
+        self._entries.clear()
+
+    def query(self, x, y, width, height):
+        sprites = []
+        for level in self._levels:
+            cells = self._levels[level]
+            size = self._cell_size * (2**level)
+            cx0 = (x//size) - 1
+            cy0 = (y//size) - 1
+            cx1 = (x+width)//size
+            cy1 = (y+height)//size
+            if (cx1-cx0+1) * (cy1-cy0+1) > len(cells):
+                for key in cells:
+                    if cx0 <= key[0] <= cx1 and cy0 <= key[1] <= cy1:
+                        sprites.extend(list(cells[key].values()))
+            else:
+                for cx in range(cx0, cx1+1):
+                    for cy in range(cy0, cy1+1):
+                        if (cx, cy) in cells:
+                            sprites.extend(list(cells[(cx, cy)].values()))
+        return sprites
 
 
 class LayeredDirty(LayeredUpdates):
@@ -670,11 +1104,289 @@ class LayeredDirty(LayeredUpdates):
     LayeredDirty object.
     """
 
-    def __init__(self, *sprites):
+    def __init__(self, *sprites, **kwargs):
+        """
+        Initialize LayeredDirty object.
+
+        LayeredUpdates subclass that draws DirtySprite objects.
+        Only sprites with dirty attribute set are redrawn, and the
+        areas updated are returned by draw. If drawing time exceeds
+        the timing threshold, draw changes to full screen update.
+        Optional argument sprites to add to group.
+        Optional keyword arguments default_layer, _use_update and
+        _time_threshold.
+        """
+        self._clip = None
+        self._use_update = False
+        self._time_threshold = 1000.0/80.0
+        self._bgd = None
+        self._spriterect = {}
+        self._lostsprites = []
+        self._view = (0, 0)
+        if '_default_layer' in kwargs:
+            kwargs['default_layer'] = kwargs['_default_layer']
+        for key in ('_use_update', '_time_threshold'):
+            if key in kwargs:
+                setattr(self, key, kwargs[key])
+        LayeredUpdates.__init__(self, *sprites, **kwargs)
+
+    def copy(self):
+        """
+        Return copy of group.
+        """
+        newgroup = LayeredUpdates.copy(self)
+        newgroup._clip = self._clip
+        newgroup._use_update = self._use_update
+        newgroup._time_threshold = self._time_threshold
+        newgroup._bgd = self._bgd
+        return newgroup
+
+    def add(self, *sprites, **kwargs):
+        """
+        Add sprite(s) to group.
+
+        Sprites require DirtySprite attributes dirty, visible, and
+        blendmode. A sprite added is set dirty.
+        """
+        for sprite in sprites:
+            if hasattr(sprite, '_groups'):
+                if id(sprite) not in self._sprites:
+                    if not (hasattr(sprite, 'dirty') and
+                            hasattr(sprite, 'visible') and
+                            hasattr(sprite, 'blendmode')):
+                        raise AttributeError(
+                            'LayeredDirty requires DirtySprite attributes')
+                    if sprite.dirty == 0:
+                        sprite.dirty = 1
+        LayeredUpdates.add(self, *sprites, **kwargs)
+        return None
+
+    def remove(self, *sprites):
+        """
+        Remove sprite(s) from group.
+
+        The area of a removed sprite is updated on next draw.
+        """
+        for sprite in sprites:
+            if hasattr(sprite, '_groups'):
+                spriteID = id(sprite)
+                if spriteID in self._spriterect:
+                    self._lostsprites.append(self._spriterect[spriteID])
+                    del self._spriterect[spriteID]
+        LayeredUpdates.remove(self, *sprites)
+        return None
+
+    def empty(self):
+        """
+        Empty group.
+        """
+        self._lostsprites.extend(list(self._spriterect.values()))
+        self._spriterect.clear()
+        LayeredUpdates.empty(self)
+
+    def draw(self, surface, bgd=None, camera=None):
+        """
+        Draw sprites on surface.
+
+        Optional bgd argument is background surface to clear sprites.
+        Optional camera argument is a Rect of the surface view in world
+        coordinates, sprites are drawn offset by the camera position and
+        sprites outside the view are not drawn. A change of the camera
+        position updates the full surface.
+        Returns list of Rect of areas updated, which can be passed to display.update.
+        """
+        if bgd is not None:
+            self._bgd = bgd
+        if self._clip is not None:
+            clip = self._clip
+        else:
+            clip = surface.get_rect()
+        time_start = System.nanoTime()
+        if camera is None:
+            x, y = 0, 0
+            sprites = self._get_orderedsprites()
+        else:
+            if not hasattr(camera, 'intersects'):
+                camera = Rect(camera)
+            x, y = camera.x, camera.y
+            sprites = self._get_sprites_in(camera)
+            self._set_lostsprites(sprites)
+        if self._use_update and x == self._view[0] and y == self._view[1]:
+            update = self._find_dirty_area(sprites, clip, x, y)
+            if self._bgd is not None:
+                surface._blit_clear(self._bgd, update)
+            self._draw_dirty(surface, sprites, update, clip, x, y)
+            changed = update
+        else:
+            if self._bgd is not None:
+                surface._blit_clear(self._bgd, [clip])
+            blits = []
+            self._spriterect.clear()
+            for sprite in sprites:
+                if sprite.visible:
+                    blits.append((sprite.image,
+                                  sprite.rect,
+                                  sprite.source_rect))
+                    self._spriterect[id(sprite)] = self._get_rect(sprite,
+                                                                  clip, x, y)
+                if sprite.dirty == 1:
+                    sprite.dirty = 0
+            surface._blits_clip(blits, clip, -x, -y)
+            self._lostsprites[:] = []
+            changed = [Rect(clip)]
+        self._view = (x, y)
+        time_lapse = (System.nanoTime() - time_start) / 1000000.0
+        if time_lapse > self._time_threshold:
+            self._use_update = False
+        else:
+            self._use_update = True
+        return changed
+
+    def _set_lostsprites(self, sprites):
+        #areas of sprites drawn that are now outside the camera view
+        spriteIDs = dict([(id(sprite), True) for sprite in sprites])
+        for spriteID in list(self._spriterect.keys()):
+            if spriteID not in spriteIDs:
+                self._lostsprites.append(self._spriterect[spriteID])
+                del self._spriterect[spriteID]
+        return None
+
+    def _get_rect(self, sprite, clip, x=0, y=0):
+        if sprite.source_rect is not None:
+            rect = Rect(sprite.rect.x-x, sprite.rect.y-y,
+                        sprite.source_rect[2], sprite.source_rect[3])
+        else:
+            rect = Rect(sprite.rect.x-x, sprite.rect.y-y,
+                        sprite.rect.width, sprite.rect.height)
+        return rect.clip(clip)
+
+    def _find_dirty_area(self, sprites, clip, x=0, y=0):
+        rects = self._lostsprites
+        self._lostsprites = []
+        for sprite in sprites:
+            if sprite.dirty > 0:
+                rects.append(self._get_rect(sprite, clip, x, y))
+                if id(sprite) in self._spriterect:
+                    rects.append(Rect(self._spriterect[id(sprite)]))
+        update = []
+        for rect in rects:
+            if not rect:
+                continue
+            i = rect.collidelist(update)
+            while i > -1:
+                rect.union_ip(update[i])
+                del update[i]
+                i = rect.collidelist(update)
+            update.append(rect.clip(clip))
+        return update
+
+    def _draw_dirty(self, surface, sprites, update, clip, x=0, y=0):
+        if x or y:
+            areas = [rect.move(x, y) for rect in update]
+        else:
+            areas = update
+        blits = []
+        for sprite in sprites:
+            if sprite.dirty < 1:
+                if not sprite.visible:
+                    continue
+                if sprite.source_rect is not None:
+                    rect = Rect(sprite.rect.x, sprite.rect.y,
+                                sprite.source_rect[2], sprite.source_rect[3])
+                    offset_x = sprite.source_rect[0] - rect.x
+                    offset_y = sprite.source_rect[1] - rect.y
+                else:
+                    rect = sprite.rect
+                    offset_x = -rect.x
+                    offset_y = -rect.y
+                for i in rect.collidelistall(areas):
+                    area = rect.clip(areas[i])
+                    blits.append((sprite.image, area,
+                                  (area.x+offset_x, area.y+offset_y,
+                                   area.width, area.height)))
+            else:
+                if sprite.visible:
+                    blits.append((sprite.image,
+                                  sprite.rect,
+                                  sprite.source_rect))
+                    self._spriterect[id(sprite)] = self._get_rect(sprite,
+                                                                  clip, x, y)
+                elif id(sprite) in self._spriterect:
+                    del self._spriterect[id(sprite)]
+                if sprite.dirty == 1:
+                    sprite.dirty = 0
+        surface._blits_clip(blits, clip, -x, -y)
+
+    def clear(self, surface, bgd):
+        """
+        Set background used to clear sprites.
+        """
+        self._bgd = bgd
+        return None
+
+    def repaint_rect(self, screen_rect):
+        """
+        Set area to be updated on next draw.
+        """
+        if self._clip is not None:
+            self._lostsprites.append(Rect(screen_rect).clip(self._clip))
+        else:
+            self._lostsprites.append(Rect(screen_rect))
+        return None
+
+    def set_clip(self, screen_rect=None):
+        """
+        Set area of surface for group draw.
+
+        Without an argument the entire surface is used.
+        """
+        if screen_rect is None:
+            self._clip = None
+        else:
+            self._clip = Rect(screen_rect)
+        self._use_update = False
+        return None
+
+    def get_clip(self):
+        """
+        Return area of surface for group draw.
+        """
+        return self._clip
+
+    def change_layer(self, sprite, new_layer):
+        """
+        Move sprite to new layer.
+        """
+        LayeredUpdates.change_layer(self, sprite, new_layer)
+        if sprite.dirty == 0:
+            sprite.dirty = 1
+        return None
+
+    def switch_layer(self, layer1, layer2):
+        """
+        Move sprites to new layer.
+        """
+        LayeredUpdates.switch_layer(self, layer1, layer2)
+        for layer in (layer1, layer2):
+            for sprite in self._layer[layer]:
+                if sprite.dirty == 0:
+                    sprite.dirty = 1
+        return None
+
+    def set_timing_threshold(self, time_ms):
+        """
+        Set time threshold in ms to change to full screen update.
+        """
+        self._time_threshold = time_ms
+        return None
+
+    set_timing_treshold = set_timing_threshold
+
+    def get_timing_threshold(self):
         """
-        Return LayeredUpdates - subclass not implemented.
+        Return time threshold in ms to change to full screen update.
         """
-        LayeredUpdates(self, *sprites)
+        return self._time_threshold
 
 
 def spritecollide(sprite, group, dokill, collided=None):
@@ -822,23 +1534,24 @@ def collide_mask(sprite1, sprite2):
         return False
 
 
-def groupcollide(group1, group2, dokill1, dokill2):
+def groupcollide(group1, group2, dokill1, dokill2, collided=None):
     """
     Sprite collision function.
 
     Return dictionary of sprites in group1 with list of sprites in group2 that intersect.
     The dokill argument is a bool, True removes sprites that collide from all groups.
+    An optional collided is a callback function taking two sprites and return bool collision,
+    which is called for sprite pairs with intersecting rects, or for all sprite pairs with
+    collide_circle, collide_circle_ratio, or collide_rect_ratio of ratio over 1.
+    Large groups are checked by sweep and prune of sprites ordered by rect x position,
+    with the order retained by the group to sort efficiently in subsequent calls.
     """
-    collide = {}
-    collision = False
-    for sprite1 in group1:
-        for sprite2 in group2:
-            if sprite1.rect.intersects(sprite2.rect):
-                if sprite1 not in collide:
-                    collide[sprite1] = []
-                collide[sprite1].append(sprite2)
-                collision = True
-    if collision:
+    if (len(group1) * len(group2) >= _sweep_threshold and
+            _is_rect_bound(collided)):
+        collide = _sweepcollide(group1, group2, collided)
+    else:
+        collide = _groupcollide(group1, group2, collided)
+    if collide:
         if dokill1:
             for sprite1 in collide:
                 sprite1.kill()
@@ -849,6 +1562,160 @@ def groupcollide(group1, group2, dokill1, dokill2):
     return collide
 
 
+_sweep_threshold = 256
+
+
+def _is_rect_bound(collided):
+    #collided that can hit sprites with rects apart requires all pairs
+    if collided is None:
+        return True
+    if (collided is collide_circle or
+            isinstance(collided, collide_circle_ratio)):
+        return False
+    if isinstance(collided, collide_rect_ratio) and collided.ratio > 1:
+        return False
+    return True
+
+
+def _groupcollide(group1, group2, collided):
+    collide = {}
+    bound = _is_rect_bound(collided)
+    for sprite1 in group1:
+        for sprite2 in group2:
+            if bound and not sprite1.rect.intersects(sprite2.rect):
+                continue
+            if collided:
+                if not collided(sprite1,sprite2):
+                    continue
+            if sprite1 not in collide:
+                collide[sprite1] = []
+            collide[sprite1].append(sprite2)
+    return collide
+
+
+def _sweepcollide(group1, group2, collided=None):
+    sprites1, xs1 = _get_sweep(group1)
+    if group2 is group1:
+        sprites2, xs2 = sprites1, xs1
+    else:
+        sprites2, xs2 = _get_sweep(group2)
+    collide = {}
+    active1 = []
+    active2 = []
+    i, j = 0, 0
+    n1, n2 = len(sprites1), len(sprites2)
+    while i < n1 or j < n2:
+        if j >= n2 or (i < n1 and xs1[i] <= xs2[j]):
+            if j >= n2 and not active2:
+                break
+            sprite1 = sprites1[i]
+            x = xs1[i]
+            i += 1
+            active2 = [spr for spr in active2 if spr[0] > x]
+            rect = sprite1.rect
+            for right, sprite2 in active2:
+                if rect.intersects(sprite2.rect):
+                    if collided:
+                        if not collided(sprite1,sprite2):
+                            continue
+                    if sprite1 not in collide:
+                        collide[sprite1] = []
+                    collide[sprite1].append(sprite2)
+            active1.append((x+rect.width, sprite1))
+        else:
+            if i >= n1 and not active1:
+                break
+            sprite2 = sprites2[j]
+            x = xs2[j]
+            j += 1
+            active1 = [spr for spr in active1 if spr[0] > x]
+            rect = sprite2.rect
+            for right, sprite1 in active1:
+                if rect.intersects(sprite1.rect):
+                    if collided:
+                        if not collided(sprite1,sprite2):
+                            continue
+                    if sprite1 not in collide:
+                        collide[sprite1] = []
+                    collide[sprite1].append(sprite2)
+            active2.append((x+rect.width, sprite2))
+    return collide
+
+
+def _get_sweep(group):
+    try:
+        sweep = group._sweep
+    except AttributeError:
+        sweep = None
+    if sweep is None:
+        sweep = _SweepList()
+        if hasattr(group, '_sprites'):
+            group._sweep = sweep
+    return sweep.update(group)
+
+
+class _SweepList(object):
+    """
+    Sprites of a group ordered by rect x position.
+
+    The order is retained between calls by sprite id, so sprites that
+    moved little are sorted in near linear time by insertion sort.
+    Sprites are retrieved from the group, and sprites removed from the
+    group are not referenced.
+    """
+
+    __slots__ = ['_order', '_ids']
+
+    def __init__(self):
+        self._order = []
+        self._ids = dict()
+
+    def update(self, group):
+        try:
+            members = group._sprites
+        except AttributeError:
+            members = dict([(id(sprite), sprite) for sprite in group])
+        ids = self._ids
+        order = [spriteID for spriteID in self._order if spriteID in members]
+        if len(order) != len(self._order):
+            ids.clear()
+            for spriteID in order:
+                ids[spriteID] = True
+        if len(order) != len(members):
+            for spriteID in members:
+                if spriteID not in ids:
+                    ids[spriteID] = True
+                    order.append(spriteID)
+        sprites = [members[spriteID] for spriteID in order]
+        xs = [sprite.rect.x for sprite in sprites]
+        self._sort(sprites, xs)
+        self._order = [id(sprite) for sprite in sprites]
+        return sprites, xs
+
+    def _sort(self, sprites, xs):
+        n = len(xs)
+        shifts = 0
+        for i in range(1, n):
+            x = xs[i]
+            if xs[i-1] > x:
+                sprite = sprites[i]
+                j = i
+                while j > 0 and xs[j-1] > x:
+                    xs[j] = xs[j-1]
+                    sprites[j] = sprites[j-1]
+                    j -= 1
+                xs[j] = x
+                sprites[j] = sprite
+                shifts += i - j
+                if shifts > n * 4:
+                    order = [(xs[k], k) for k in range(n)]
+                    order.sort()
+                    sprites[:] = [sprites[k] for x, k in order]
+                    xs[:] = [x for x, k in order]
+                    return None
+        return None
+
+
 def spritecollideany(sprite, group):
     """
     Sprite collision function.
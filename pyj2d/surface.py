@@ -235,11 +235,26 @@ class Surface(BufferedImage):
         g2d.dispose()
         return rects
 
-    def _blits(self, surfaces):
+    def _blits(self, surfaces, x=0, y=0):
         g2d = self.createGraphics()
         for surface, rect in surfaces:
             g2d.setComposite(self._alpha_composite[surface._alpha])
-            g2d.drawImage(surface, rect.x, rect.y, None)
+            g2d.drawImage(surface, rect.x+x, rect.y+y, None)
+        g2d.dispose()
+
+    def _blits_clip(self, surfaces, clip, x=0, y=0):
+        g2d = self.createGraphics()
+        g2d.setClip(clip.x, clip.y, clip.width, clip.height)
+        for surface, rect, area in surfaces:
+            g2d.setComposite(self._alpha_composite[surface._alpha])
+            if area is None:
+                g2d.drawImage(surface, rect.x+x, rect.y+y, None)
+            else:
+                g2d.drawImage(surface,
+                        rect.x+x, rect.y+y,
+                        rect.x+x+area[2], rect.y+y+area[3],
+                        area[0], area[1],
+                        area[0]+area[2], area[1]+area[3], None)
         g2d.dispose()
 
     def _blit_clear(self, surface, rect_list):
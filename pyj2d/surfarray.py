@@ -4,11 +4,15 @@
 """
 **Surfarray module**
 
-The module provides array access to surface pixel data. The functionality requires the JNumeric module as specified in the numeric module.
+The module provides array access to surface pixel data. The array copy functionality uses the numeric module, which is JNumeric if present, otherwise the builtin ndarray module. The pixels2d, pixels3d and pixels_alpha array views are ndarray objects that reference surface pixel data directly.
 """
 
-from java.awt.image import BufferedImage
+from java.awt.image import BufferedImage, Raster
+from java.awt.image import DataBufferInt, SinglePixelPackedSampleModel
+from java.util import Arrays
 from pyj2d.surface import Surface
+from pyj2d.ndarray import ndarray
+import jarray
 
 
 _initialized = False
@@ -20,8 +24,6 @@ def _init():
     """
     global numeric, _initialized
     from pyj2d.numeric import numeric
-    if not numeric:
-        raise ImportError("JNumeric module is required.")
     _initialized = True
 
 
@@ -33,9 +35,7 @@ def array2d(surface):
     """
     if not _initialized:
         _init()
-    data = numeric.zeros((surface.width * surface.height), 'i')
-    data = surface.getRGB(0, 0, surface.width, surface.height,
-                          data, 0, surface.width)
+    data = _get_columns(surface)
     array = numeric.reshape(data, (surface.width, surface.height))
     return array
 
@@ -48,11 +48,11 @@ def array3d(surface):
     """
     if not _initialized:
         _init()
-    data = surface.getRGB(0, 0, surface.width, surface.height,
-                          None, 0, surface.width)
-    data = numeric.array([(dat>>16 & 0xff, dat>>8 & 0xff, dat & 0xff)
-                          for dat in data])
-    array = numeric.reshape(data, (surface.width, surface.height,3))
+    data = _get_columns(surface)
+    raster = _get_raster(data, surface.height, surface.width, _rgb_masks)
+    data = raster.getPixels(0, 0, surface.height, surface.width,
+                            jarray.zeros(len(data)*3, 'i'))
+    array = numeric.reshape(data, (surface.width, surface.height, 3))
     return array
 
 
@@ -64,9 +64,10 @@ def array_alpha(surface):
     """
     if not _initialized:
         _init()
-    data = surface.getRGB(0, 0, surface.width, surface.height,
-                          None, 0, surface.width)
-    data = numeric.array([dat>>24 & 0xff for dat in data], numeric.Int8)
+    data = _get_columns(surface)
+    raster = _get_raster(data, surface.height, surface.width, _alpha_masks)
+    data = raster.getSamples(0, 0, surface.height, surface.width, 0,
+                             jarray.zeros(len(data), 'i'))
     array = numeric.reshape(data, (surface.width, surface.height))
     return array
 
@@ -90,26 +91,135 @@ def blit_array(surface, array):
     Generates image pixels from array data.
 
     Arguments include destination Surface and array of integer colors.
+    Array of RGB format sets pixels opaque, array of integer colors
+    sets pixels with the alpha of the color on surface with alpha.
     """
     if not _initialized:
         _init()
-    if len(array.shape) == 2:
-        data = numeric.transpose(array, (1,0))
-        data = numeric.ravel(data)
-    else:
-        data = array[:,:,0]*0x10000 | array[:,:,1]*0x100 | array[:,:,2]
-        data = numeric.transpose(data, (1,0))
-        data = numeric.ravel(data)
-    if not surface.getColorModel().hasAlpha():
-        surface.setRGB(0, 0, surface.width, surface.height,
-                       data, 0, surface.width)
-    else:
-        surf = Surface((surface.width, surface.height),
-                       BufferedImage.TYPE_INT_RGB)
-        surf.setRGB(0, 0, surface.width, surface.height,
-                    data, 0, surface.width)
-        g2d = surface.createGraphics()
-        g2d.drawImage(surf, 0, 0, None)
-        g2d.dispose()
+    width, height = array.shape[0], array.shape[1]
+    if width != surface.width or height != surface.height:
+        raise ValueError('array must match surface dimensions')
+    data = _get_data(array)
+    if len(array.shape) == 3:
+        data = _get_rgb(data, width, height)
+    for x in range(width):
+        surface.setRGB(x, 0, 1, height, data, x*height, 1)
     return None
 
+
+def map_array(surface, array):
+    """
+    Return mapped array of the RGB array argument.
+
+    Array of RGB format arranged by [x,y] is mapped to array of integer
+    colors of opaque pixels.
+    """
+    if not _initialized:
+        _init()
+    width, height = array.shape[0], array.shape[1]
+    data = _get_rgb(_get_data(array), width, height)
+    return numeric.reshape(data, (width, height))
+
+
+_rgb_masks = [0xff0000, 0xff00, 0xff]
+
+_alpha_masks = [-0x1000000]
+
+
+def _get_data(array):
+    #int array data in C order
+    if isinstance(array, ndarray):
+        if array.typecode() == 'i':
+            return array.tojarray()
+        array = array.astype('i')
+        return array.tojarray()
+    array = numeric.ravel(array).astype(numeric.Int)
+    return jarray.array(array.tolist(), 'i')
+
+
+def _get_rgb(data, width, height):
+    #pack array data of RGB format in opaque int pixels
+    pixels = jarray.zeros(width*height, 'i')
+    Arrays.fill(pixels, -0x1000000)
+    raster = _get_raster(pixels, height, width, _rgb_masks)
+    raster.setPixels(0, 0, height, width, data)
+    return pixels
+
+
+def _get_columns(surface):
+    #pixels arranged by [x,y]
+    width, height = surface.width, surface.height
+    data = jarray.zeros(width*height, 'i')
+    for x in range(width):
+        surface.getRGB(x, 0, 1, height, data, x*height, 1)
+    return data
+
+
+def _get_raster(data, width, height, masks):
+    #raster unpacks and packs channels of int pixels in data
+    return Raster.createPackedRaster(DataBufferInt(data, len(data)),
+                                     width, height, width, masks, None)
+
+
+def pixels2d(surface):
+    """
+    Return array view of the Surface argument.
+
+    Array references pixel data arranged by [x,y] in integer color format.
+    Refer to pixels3d for view semantics.
+    """
+    data, offset, scanline = _get_pixels(surface)
+    return ndarray((surface.width, surface.height),
+                   data, offset, (1, scanline))
+
+
+def pixels3d(surface):
+    """
+    Return array view of the Surface argument.
+
+    Array references pixel data arranged by [x,y] in RGB format.
+    The view references the surface data buffer, so a change to the
+    array is immediately a change to the surface and drawing on the
+    surface is immediately seen in the array. Surface lock is not
+    required and the view remains valid for the life of the surface.
+    The view should not be used on a thread other than the one drawing
+    on the surface. Obtaining a view of a surface stops Java2D from
+    caching it as an accelerated image.
+    Surface of int RGB or ARGB format is required, otherwise raises
+    ValueError.
+    """
+    data, offset, scanline = _get_pixels(surface)
+    return ndarray((surface.width, surface.height, 3),
+                   data, offset, (1, scanline, 0), 16, (0, 0, -8))
+
+
+def pixels_alpha(surface):
+    """
+    Return array view of the Surface argument.
+
+    Array references pixel data arranged by [x,y] of pixel alpha value.
+    Surface with per-pixel alpha is required, otherwise raises
+    ValueError. Refer to pixels3d for view semantics.
+    """
+    if not surface.getColorModel().hasAlpha():
+        raise ValueError('unsupported colormasks for alpha reference array')
+    data, offset, scanline = _get_pixels(surface)
+    return ndarray((surface.width, surface.height),
+                   data, offset, (1, scanline), 24)
+
+
+def _get_pixels(surface):
+    if surface.getType() not in (BufferedImage.TYPE_INT_ARGB,
+                                 BufferedImage.TYPE_INT_RGB):
+        raise ValueError('unsupported surface format for reference array')
+    raster = surface.getRaster()
+    databuffer = raster.getDataBuffer()
+    model = raster.getSampleModel()
+    if not (isinstance(databuffer, DataBufferInt) and
+            isinstance(model, SinglePixelPackedSampleModel)):
+        raise ValueError('unsupported surface format for reference array')
+    scanline = model.getScanlineStride()
+    offset = (databuffer.getOffset()
+              - raster.getSampleModelTranslateY() * scanline
+              - raster.getSampleModelTranslateX())
+    return databuffer.getData(), offset, scanline
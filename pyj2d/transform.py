@@ -8,21 +8,56 @@ The module provides surface transformation functionality.
 """
 
 from math import pi as _pi, fabs as _fabs, sin as _sin, cos as _cos, ceil as _ceil
-from java.awt.image import BufferedImage, AffineTransformOp
-from java.awt import RenderingHints
+from java.awt.image import BufferedImage
+from java.awt import RenderingHints, AlphaComposite
 from java.awt.geom import AffineTransform
+from java.lang import Runnable, Thread, Runtime
+from java.util import LinkedHashMap, WeakHashMap, ArrayList
+from java.util.concurrent import Callable
+from java.util.concurrent.locks import ReentrantLock
 from pyj2d.surface import Surface
+from pyj2d.quality import set_quality, get_quality, _set_hints
+from pyj2d.util import _get_executor
+import jarray
+import sys
+try:
+    from pyj2d import Transform as _Transform
+except ImportError:
+    _Transform = None
 
 
 _deg_rad = _pi/180.0
 
 
-def rotate(surface, angle):
+def _get_hints():
+    hints = {}
+    hints['fast'] = RenderingHints(RenderingHints.KEY_INTERPOLATION,
+                        RenderingHints.VALUE_INTERPOLATION_NEAREST_NEIGHBOR)
+    hints['fast'].put(RenderingHints.KEY_RENDERING,
+                      RenderingHints.VALUE_RENDER_SPEED)
+    hints['balanced'] = RenderingHints(RenderingHints.KEY_INTERPOLATION,
+                            RenderingHints.VALUE_INTERPOLATION_BILINEAR)
+    hints['quality'] = RenderingHints(RenderingHints.KEY_INTERPOLATION,
+                            RenderingHints.VALUE_INTERPOLATION_BICUBIC)
+    hints['quality'].put(RenderingHints.KEY_RENDERING,
+                         RenderingHints.VALUE_RENDER_QUALITY)
+    hints['quality'].put(RenderingHints.KEY_ALPHA_INTERPOLATION,
+                         RenderingHints.VALUE_ALPHA_INTERPOLATION_QUALITY)
+    return hints
+
+_hints = _get_hints()
+
+
+def rotate(surface, angle, dest=None, quality=None):
     """
     Return Surface rotated by the given angle.
+
+    An optional destination surface can be provided, used if of
+    sufficient size, or a subsurface of it if larger than required.
+    Optional quality argument of profile, which defaults to module setting.
     """
     if not angle:
-        return surface.copy()
+        return _copy(surface, dest)
     theta = angle * _deg_rad
     width_i = surface.getWidth()
     height_i = surface.getHeight()
@@ -30,15 +65,16 @@ def rotate(surface, angle):
     sin_theta = _fabs( _sin(theta) )
     width_f = int( (width_i * cos_theta) + (height_i * sin_theta) )
     height_f = int( (width_i * sin_theta) + (height_i * cos_theta) )
-    surf = Surface((width_f, height_f), BufferedImage.TYPE_INT_ARGB)
+    surf = _get_surface(width_f, height_f, dest)
     at = AffineTransform()
     at.translate(width_f/2.0, height_f/2.0)
     at.rotate(-theta)
     g2d = surf.createGraphics()
+    if dest is not None:
+        _clear(g2d, width_f, height_f)
     ot = g2d.getTransform()
     g2d.setTransform(at)
-    g2d.setRenderingHint(RenderingHints.KEY_INTERPOLATION,
-                         RenderingHints.VALUE_INTERPOLATION_BILINEAR)
+    _set_hints(g2d, _hints, quality)
     g2d.drawImage(surface, -width_i//2, -height_i//2, None)
     g2d.setTransform(ot)
     g2d.dispose()
@@ -47,14 +83,20 @@ def rotate(surface, angle):
     return surf
 
 
-def rotozoom(surface, angle, size):
+def rotozoom(surface, angle, size, dest=None, quality=None):
     """
     Return Surface rotated and resized by the given angle and size.
+
+    An optional destination surface can be provided, used if of
+    sufficient size, or a subsurface of it if larger than required.
+    Optional quality argument of profile, which defaults to module setting.
     """
     if not angle:
         width = int(surface.getWidth() * size)
         height = int(surface.getHeight() * size)
-        return scale(surface, (width, height))
+        if dest is not None:
+            dest = _get_surface(width, height, dest)
+        return scale(surface, (width, height), dest, quality)
     theta = angle * _deg_rad
     width_i = int(surface.getWidth() * size)
     height_i = int(surface.getHeight() * size)
@@ -66,15 +108,16 @@ def rotozoom(surface, angle, size):
     height_f = int( _ceil((width_i * sin_theta) + (height_i * cos_theta)) )
     if height_f % 2:
         height_f += 1
-    surf = Surface((width_f, height_f), BufferedImage.TYPE_INT_ARGB)
+    surf = _get_surface(width_f, height_f, dest)
     at = AffineTransform()
     at.translate(width_f/2.0, height_f/2.0)
     at.rotate(-theta)
     g2d = surf.createGraphics()
+    if dest is not None:
+        _clear(g2d, width_f, height_f)
     ot = g2d.getTransform()
     g2d.setTransform(at)
-    g2d.setRenderingHint(RenderingHints.KEY_INTERPOLATION,
-                         RenderingHints.VALUE_INTERPOLATION_BILINEAR)
+    _set_hints(g2d, _hints, quality)
     g2d.drawImage(surface, -width_i//2, -height_i//2, width_i, height_i, None)
     g2d.setTransform(ot)
     g2d.dispose()
@@ -83,19 +126,21 @@ def rotozoom(surface, angle, size):
     return surf
 
 
-def scale(surface, size, dest=None):
+def scale(surface, size, dest=None, quality=None):
     """
     Return Surface resized by the given size.
 
     An optional destination surface can be provided.
+    Optional quality argument of profile, which defaults to module setting.
     """
     if not dest:
         surf = Surface(size, BufferedImage.TYPE_INT_ARGB)
     else:
         surf = dest
     g2d = surf.createGraphics()
-    g2d.setRenderingHint(RenderingHints.KEY_INTERPOLATION,
-                         RenderingHints.VALUE_INTERPOLATION_BILINEAR)
+    if dest:
+        g2d.setComposite(AlphaComposite.Src)
+    _set_hints(g2d, _hints, quality)
     g2d.drawImage(surface, 0, 0, size[0], size[1], None)
     g2d.dispose()
     surf._colorkey = surface._colorkey
@@ -103,45 +148,331 @@ def scale(surface, size, dest=None):
     return surf
 
 
-def smoothscale(surface, size, dest=None):
+def smoothscale(surface, size, dest=None, quality=None):
     """
     Return Surface resized by the given size.
 
     An optional destination surface can be provided.
-    Calls scale().
+    Optional quality argument of profile, which defaults to module setting.
+    With 'quality' profile, downscaling is done in steps of half size
+    that average pixel areas, otherwise calls scale().
     """
-    return scale(surface, size, dest)
+    if quality is None:
+        quality = get_quality()
+    if quality == 'quality':
+        width = surface.getWidth()
+        height = surface.getHeight()
+        while (min(size) > 0 and
+               (width >= size[0]*2 or height >= size[1]*2)):
+            width = max(width//2, size[0])
+            height = max(height//2, size[1])
+            surface = scale(surface, (width, height), None, 'balanced')
+    return scale(surface, size, dest, quality)
 
 
 def scale2x(surface, dest=None):
     """
     Return Surface resized to twice its size.
 
+    Pixels are scaled with the Scale2x rule, which keeps edges of pixel
+    art sharp without interpolation.
     An optional destination surface can be provided.
+    The scaling is done by Transform.class, compiled with
+    'javac Transform.java', otherwise pixels are scaled by scale()
+    with 'fast' profile.
     """
-    return scale(surface,
-                 (surface.getWidth()*2, surface.getHeight()*2), dest)
+    width = surface.getWidth()
+    height = surface.getHeight()
+    if not _Transform:
+        return scale(surface, (width*2, height*2), dest, 'fast')
+    surf = _get_surface(width*2, height*2, dest)
+    src = surface.getRGB(0, 0, width, height, None, 0, width)
+    dst = jarray.zeros(width*height*4, 'i')
+    _Transform.scale2x(src, width, height, dst)
+    surf.setRGB(0, 0, width*2, height*2, dst, 0, width*2)
+    surf._colorkey = surface._colorkey
+    surf._alpha = surface._alpha
+    return surf
 
 
-def flip(surface, xbool=True, ybool=False):
+def flip(surface, xbool=True, ybool=False, dest=None):
     """
     Return Surface that is flipped horizontally, vertically, or both.
+
+    Pixels are copied without interpolation, by Transform.class
+    if available, compiled with 'javac Transform.java', directly between
+    surface rasters of the same int format.
+    An optional destination surface can be provided, used if of
+    sufficient size, or a subsurface of it if larger than required.
     """
-    if xbool and ybool:
-        at = AffineTransform.getScaleInstance(-1, -1)
-        at.translate(-surface.getHeight(), -surface.getHeight())
-    elif xbool:
-        at = AffineTransform.getScaleInstance(-1, 1)
-        at.translate(-surface.getWidth(), 0)
-    elif ybool:
-        at = AffineTransform.getScaleInstance(1, -1)
-        at.translate(0, -surface.getHeight())
+    if not xbool and not ybool:
+        if dest is None:
+            return surface
+        return _copy(surface, dest)
+    width = surface.getWidth()
+    height = surface.getHeight()
+    surf = _get_surface(width, height, dest)
+    if _Transform and _is_raster_flip(surface, surf):
+        _Transform.flip(surface.getRaster(), surf.getRaster(), xbool, ybool)
+        surf._colorkey = surface._colorkey
+        surf._alpha = surface._alpha
+        return surf
+    data = surface.getRGB(0, 0, width, height, None, 0, width)
+    if _Transform:
+        _Transform.flip(data, width, height, xbool, ybool, data)
     else:
-        return surface
-    op = AffineTransformOp(at, AffineTransformOp.TYPE_BILINEAR)
-    bimage = op.filter(surface, None)
-    surf = Surface(bimage)
+        data = _flip(data, width, height, xbool, ybool)
+    surf.setRGB(0, 0, width, height, data, 0, width)
+    surf._colorkey = surface._colorkey
+    surf._alpha = surface._alpha
+    return surf
+
+
+def _is_raster_flip(surface, surf):
+    #raster copy requires same int format and data not shared
+    if surface.getType() != surf.getType():
+        return False
+    if surface.getType() not in (BufferedImage.TYPE_INT_ARGB,
+                                 BufferedImage.TYPE_INT_RGB):
+        return False
+    data = surface.getRaster().getDataBuffer()
+    return data != surf.getRaster().getDataBuffer()
+
+
+def _flip(data, width, height, xbool, ybool):
+    data = data.tolist()
+    rows = [data[i:i+width] for i in range(0, width*height, width)]
+    if ybool:
+        rows.reverse()
+    data = []
+    for row in rows:
+        if xbool:
+            row.reverse()
+        data.extend(row)
+    return jarray.array(data, 'i')
+
+
+def _get_surface(width, height, dest):
+    if dest is not None:
+        if dest.getWidth() == width and dest.getHeight() == height:
+            return dest
+        elif dest.getWidth() >= width and dest.getHeight() >= height:
+            return dest.subsurface((0, 0, width, height))
+    return Surface((width, height), BufferedImage.TYPE_INT_ARGB)
+
+
+def _clear(g2d, width, height):
+    g2d.setComposite(AlphaComposite.Clear)
+    g2d.fillRect(0, 0, width, height)
+    g2d.setComposite(AlphaComposite.SrcOver)
+
+
+def _copy(surface, dest):
+    if dest is None:
+        return surface.copy()
+    surf = _get_surface(surface.getWidth(), surface.getHeight(), dest)
+    g2d = surf.createGraphics()
+    g2d.setComposite(AlphaComposite.Src)
+    g2d.drawImage(surface, 0, 0, None)
+    g2d.dispose()
     surf._colorkey = surface._colorkey
     surf._alpha = surface._alpha
     return surf
 
+
+def batch(jobs, workers=None, wait=True):
+    """
+    Return list of Surfaces from transform jobs run concurrently.
+
+    Argument jobs is a list of jobs, each a sequence of a transform
+    function followed by its arguments, such as (rotate, surface, 90).
+    Optional workers argument is the number of threads, defaults to
+    number of processors.
+    Optional wait argument, if False return list of futures, with
+    get() method that returns the Surface.
+    The results are in job order. An exception in a job is raised
+    after all jobs complete.
+    """
+    if workers is None:
+        workers = Runtime.getRuntime().availableProcessors()
+    tasks = ArrayList()
+    for job in jobs:
+        tasks.add(_TransformJob(job[0], tuple(job[1:])))
+    if workers < 2 and wait:
+        for task in tasks:
+            task._run()
+    else:
+        executor = _get_executor(max(1, workers))
+        if not wait:
+            return [executor.submit(task) for task in tasks]
+        executor.invokeAll(tasks)
+    for task in tasks:
+        if task._exception is not None:
+            raise task._exception
+    return [task._result for task in tasks]
+
+
+class _TransformJob(Callable):
+
+    def __init__(self, function, args):
+        self._function = function
+        self._args = args
+        self._result = None
+        self._exception = None
+
+    def _run(self):
+        try:
+            self._result = self._function(*self._args)
+        except Exception:
+            self._exception = sys.exc_info()[1]
+
+    def call(self):
+        self._run()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+class RotationCache(object):
+    """
+    RotationCache object.
+    """
+
+    def __init__(self, step=5.0, max_bytes=16777216):
+        """
+        Initialize RotationCache object.
+
+        Cache of rotated surfaces with angle quantized to step degrees.
+        Optional argument step is the angle step, defaults to 5.0,
+        and is adjusted to evenly divide 360.
+        Optional argument max_bytes is the limit of pixel bytes of
+        cached surfaces, least recently used surfaces are evicted.
+        Cached surfaces are shared and should not be modified, and
+        a source surface that is modified, including its colorkey and
+        alpha, requires clear(surface).
+        """
+        self._steps = max(1, int(round(360.0/step)))
+        self._step = 360.0 / self._steps
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._cache = LinkedHashMap(16, 0.75, True)
+        self._surfaces = WeakHashMap()
+        self._surface_count = 0
+        self._lock = ReentrantLock()
+
+    def __len__(self):
+        return self._cache.size()
+
+    def rotate(self, surface, angle):
+        """
+        Return Surface rotated by the given angle quantized to step.
+        """
+        return self._get(surface, self._get_index(angle), None)
+
+    def rotozoom(self, surface, angle, size):
+        """
+        Return Surface rotated and resized by the given angle quantized
+        to step and size.
+        """
+        return self._get(surface, self._get_index(angle), size)
+
+    def pregenerate(self, surface, size=None):
+        """
+        Generate rotations of surface at all steps on a background thread.
+
+        Optional argument size to generate rotozoom surfaces.
+        Return the thread, which can be joined to wait for completion.
+        """
+        thread = Thread(_RotationGenerate(self, surface, size))
+        thread.setDaemon(True)
+        thread.start()
+        return thread
+
+    def clear(self, surface=None):
+        """
+        Clear cached surfaces.
+
+        Optional argument surface to clear only rotations of surface.
+        """
+        self._lock.lock()
+        try:
+            if surface is None:
+                self._cache.clear()
+                self._surfaces.clear()
+                self._bytes = 0
+            else:
+                surface_key = self._surfaces.remove(surface)
+                iterator = self._cache.entrySet().iterator()
+                while surface_key is not None and iterator.hasNext():
+                    entry = iterator.next()
+                    if entry.getKey()[0] == surface_key:
+                        self._bytes -= self._get_bytes(entry.getValue())
+                        iterator.remove()
+        finally:
+            self._lock.unlock()
+        return None
+
+    def get_step(self):
+        """
+        Return angle step.
+        """
+        return self._step
+
+    def get_bytes(self):
+        """
+        Return pixel bytes of cached surfaces.
+        """
+        return self._bytes
+
+    def _get_index(self, angle):
+        return int(round(angle/self._step)) % self._steps
+
+    def _get_bytes(self, surface):
+        return surface.getWidth() * surface.getHeight() * 4
+
+    def _get(self, surface, index, size):
+        self._lock.lock()
+        try:
+            surface_key = self._surfaces.get(surface)
+            if surface_key is None:
+                self._surface_count += 1
+                surface_key = self._surface_count
+                self._surfaces.put(surface, surface_key)
+            key = (surface_key, index, size)
+            surf = self._cache.get(key)
+        finally:
+            self._lock.unlock()
+        if surf is None:
+            if size is None:
+                surf = rotate(surface, index*self._step)
+            else:
+                surf = rotozoom(surface, index*self._step, size)
+            self._put(key, surf)
+        return surf
+
+    def _put(self, key, surface):
+        self._lock.lock()
+        try:
+            surf = self._cache.put(key, surface)
+            if surf is not None:
+                self._bytes -= self._get_bytes(surf)
+            self._bytes += self._get_bytes(surface)
+            iterator = self._cache.values().iterator()
+            while self._bytes > self._max_bytes and self._cache.size() > 1:
+                self._bytes -= self._get_bytes(iterator.next())
+                iterator.remove()
+        finally:
+            self._lock.unlock()
+        return None
+
+
+class _RotationGenerate(Runnable):
+
+    def __init__(self, cache, surface, size):
+        self._cache = cache
+        self._surface = surface
+        self._size = size
+
+    def run(self):
+        for index in range(self._cache._steps):
+            self._cache._get(self._surface, index, self._size)
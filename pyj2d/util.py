@@ -7,7 +7,9 @@
 The module provides profiling functionality.
 """
 
-from java.lang import System
+from java.lang import System, Thread
+from java.util.concurrent import Executors, ThreadFactory
+from java.util.concurrent.locks import ReentrantLock
 
 
 class Timer(object):
@@ -62,6 +64,34 @@ class Timer(object):
             return t_ave
 
 
+def _get_executor(workers):
+    #shared executor, ForkJoinPool requires Java 7
+    _executors_lock.lock()
+    try:
+        if workers not in _executors:
+            try:
+                from java.util.concurrent import ForkJoinPool
+                _executors[workers] = ForkJoinPool(workers)
+            except ImportError:
+                _executors[workers] = Executors.newFixedThreadPool(
+                                        workers, _DaemonThreadFactory())
+        return _executors[workers]
+    finally:
+        _executors_lock.unlock()
+
+
+_executors = {}
+_executors_lock = ReentrantLock()
+
+
+class _DaemonThreadFactory(ThreadFactory):
+
+    def newThread(self, runnable):
+        thread = Thread(runnable)
+        thread.setDaemon(True)
+        return thread
+
+
 class _dict(dict):
     values = dict.itervalues
     keys = dict.iterkeys
@@ -14,7 +14,8 @@ def init(environ):
              test_draw_arc,
              test_draw_polygon,
              test_draw_line,
-             test_draw_lines]
+             test_draw_lines,
+             test_draw_quality]
     return tests
 
 
@@ -116,3 +117,21 @@ def test_draw_lines():
         assert c == pos[1]
     assert (rect.x,rect.y,rect.width,rect.height) == data[1]    # __:opov
 
+
+def test_draw_quality():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    assert pg.draw.get_quality() == 'balanced'
+    surface.fill((0,0,0))
+    pg.draw.line(surface, (255,0,0), (1,2), (15,9), 1, quality='fast')
+    for x in range(16):
+        for y in range(12):
+            assert surface.get_at((x,y)).r in (0,255)
+    pg.draw.set_quality('quality')
+    assert pg.draw.get_quality() == 'quality'
+    pg.draw.set_quality('balanced')
+    try:
+        pg.draw.set_quality('none')
+        assert False
+    except ValueError:
+        pass
@@ -43,6 +43,7 @@ from test import sprite_test
 from test import event_test
 from test import time_test
 from test import vector_test
+from test import mixer_test
 
 
 if executor in ('python', 'jython'):
@@ -102,7 +103,8 @@ lib_tests = [surface_test,
              sprite_test,
              event_test,
              time_test,
-             vector_test]
+             vector_test,
+             mixer_test]
 
 
 lib_test_name = {'surface_test': surface_test,
@@ -116,7 +118,8 @@ lib_test_name = {'surface_test': surface_test,
                  'sprite_test': sprite_test,
                  'event_test': event_test,
                  'time_test': time_test,
-                 'vector_test': vector_test}
+                 'vector_test': vector_test,
+                 'mixer_test': mixer_test}
 
 
 env = {}
@@ -0,0 +1,531 @@
+env = None
+pg = None
+
+
+def init(environ):
+    global env, pg
+    env = environ
+    pg = env['pg']
+    tests = [test_mixer_channel_state,
+             test_mixer_channel_steal,
+             test_mixer_unsigned_output,
+             test_mixer_music_position,
+             test_mixer_output_stream,
+             test_mixer_output_file,
+             test_mixer_sound_cache,
+             test_mixer_sound_convert,
+             test_mixer_sound_buffer,
+             test_mixer_effect_filter,
+             test_mixer_effect_limiter,
+             test_mixer_effect_ducking,
+             test_mixer_effect_smoothing,
+             test_mixer_latency]
+    return tests
+
+
+def _channel_state(mixer):
+    available = [id for id in mixer._channel_available.iterator()]
+    active = [id for id in mixer._channel_active.iterator()]
+    return available, active
+
+
+def _check_channel_state(mixer):
+    available, active = _channel_state(mixer)
+    assert len(available) == len(dict.fromkeys(available))
+    assert len(active) == len(dict.fromkeys(active))
+    for id in available:
+        assert id not in active
+
+
+def test_mixer_channel_state():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    mixer = pg.mixer
+    mixer.set_output(None, False)
+    mixer.init()
+    try:
+        sound = mixer.Sound(buffer='\x00'*16)
+        channel = mixer.Channel(0)
+        for i in range(200):
+            channel.play(sound)
+            _check_channel_state(mixer)
+            sound.play()
+            _check_channel_state(mixer)
+        for i in range(1000):
+            if not mixer.get_busy():
+                break
+            pg.time.wait(1)
+        pg.time.wait(20)
+        _check_channel_state(mixer)
+        available, active = _channel_state(mixer)
+        assert len(available) == mixer.get_num_channels()
+        assert len(active) == 0
+    finally:
+        mixer.quit()
+
+
+def test_mixer_channel_steal():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    mixer = pg.mixer
+    mixer.set_output(None, False)
+    mixer.init()
+    try:
+        sound = mixer.Sound(buffer='\x00'*16)
+        channels = []
+        for id in range(mixer.get_num_channels()):
+            channel = mixer.Channel(id)
+            channel.set_position((id, 0))
+            channel.play(sound, loops=-1)
+            channels.append(channel)
+        channel = channels[1]
+        channel.play(sound, loops=-1)
+        assert channel.get_position() == (1.0, 0.0)    # __:opov
+        stolen, rejected = mixer.get_voice_stats()
+        channel = mixer.find_channel(True)
+        assert channel is not None and channel.get_position() is not None
+        assert mixer.get_voice_stats() == (stolen, rejected)    # __:opov
+        channel.play(sound)
+        assert channel.get_position() is None
+        assert mixer.get_voice_stats() == (stolen+1, rejected)    # __:opov
+        assert sound.play() is None
+        assert mixer.get_voice_stats() == (stolen+1, rejected+1)    # __:opov
+    finally:
+        mixer.stop()
+        mixer.quit()
+
+
+def _wait(mixer):
+    for i in range(1000):
+        if not mixer.get_busy():
+            break
+        pg.time.wait(1)
+
+
+def test_mixer_unsigned_output():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    from java.io import ByteArrayOutputStream
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    output = ByteArrayOutputStream()
+    mixer.set_output(output, False)
+    mixer.init(22050, 8, 1, 1024)
+    try:
+        sound = mixer.Sound(buffer='\xa8'*300 + '\x6c'*300)
+        channel = mixer.Channel(0)
+        channel.play(sound)
+        _wait(mixer)
+        channel.set_volume(0.5)
+        channel.play(sound)
+        _wait(mixer)
+    finally:
+        mixer.quit()
+    data = [value & 0xff for value in output.toByteArray()]
+    assert len(data) == 1200
+    assert data[:600] == [168]*300 + [108]*300
+    assert data[600:] == [148]*300 + [118]*300
+
+
+def _pcm(values):
+    #16-bit little-endian audio data
+    return ''.join([chr(v & 0xff) + chr((v >> 8) & 0xff) for v in values])
+
+
+def _frames(data):
+    frames = []
+    for i in range(0, len(data)-1, 2):
+        frames.append((data[i] & 0xff) | (data[i+1] << 8))
+    return frames
+
+
+def test_mixer_music_position():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    from java.io import ByteArrayOutputStream, File
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    music_file = File.createTempFile('mixer_test', '.wav')
+    path = str(music_file.getPath())
+    try:
+        mixer.set_output(path, False)
+        mixer.init(22050, -16, 1, 1024)
+        try:
+            mixer.Sound(buffer=_pcm(range(26460))).play()
+            _wait(mixer)
+        finally:
+            mixer.quit()
+        output = ByteArrayOutputStream()
+        mixer.set_output(output, True)
+        mixer.init(22050, -16, 1, 1024)
+        try:
+            mixer.music.load(path)
+            mixer.music.play()
+            pg.time.wait(50)
+            mixer.music.set_pos(1.0)
+            pg.time.wait(50)
+            mixer.music.rewind()
+            pg.time.wait(50)
+            mixer.music.stop()
+        finally:
+            mixer.quit()
+    finally:
+        music_file.delete()
+    frames = _frames(output.toByteArray())
+    jumps = []
+    for i in range(1, len(frames)):
+        if frames[i] != frames[i-1] + 1:
+            jumps.append(frames[i])
+    assert frames[0] == 0
+    assert jumps == [22050, 0]
+
+
+def test_mixer_output_stream():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    from java.io import ByteArrayOutputStream
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    output = ByteArrayOutputStream()
+    mixer.set_output(output, False)
+    mixer.init(22050, -16, 2, 1024)
+    try:
+        sound_data = '\xe8\x03\x18\xfc' * 2000
+        sound = mixer.Sound(buffer=sound_data)
+        channel = mixer.Channel(0)
+        pg.event.clear()
+        channel.set_endevent(pg.USEREVENT)
+        channel.play(sound)
+        _wait(mixer)
+        pg.time.wait(20)
+        assert len(pg.event.get(pg.USEREVENT)) == 1
+        data = [value & 0xff for value in output.toByteArray()]
+        assert data == [ord(c) for c in sound_data]    # __:opov
+        channel.set_endevent()
+        channel.play(sound, loops=-1)
+        channel.pause()
+        pg.time.wait(20)
+        size = output.size()
+        channel.fadeout(50)
+        channel.unpause()
+        _wait(mixer)
+        pg.time.wait(20)
+        fade_len = int(50 * 22050 * 4 / 1000)
+        fade_len -= fade_len % 4
+        assert output.size() - size == fade_len
+        assert len(pg.event.get(pg.USEREVENT)) == 0
+    finally:
+        mixer.quit()
+
+
+def test_mixer_output_file():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    from java.io import File, RandomAccessFile
+    from java.lang import Integer, Short
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    output_file = File.createTempFile('mixer_test', '.wav')
+    try:
+        mixer.set_output(str(output_file.getPath()), False)
+        mixer.init(22050, -16, 2, 1024)
+        try:
+            sound = mixer.Sound(buffer='\xe8\x03\x18\xfc' * 2000)
+            sound.play(loops=2)
+            _wait(mixer)
+        finally:
+            mixer.quit()
+        assert output_file.length() == 44 + 8000 * 3
+        wav = RandomAccessFile(output_file, 'r')
+        try:
+            wav.seek(4)
+            assert Integer.reverseBytes(wav.readInt()) == 36 + 8000 * 3
+            wav.seek(40)
+            assert Integer.reverseBytes(wav.readInt()) == 8000 * 3
+            wav.seek(44)
+            assert Short.reverseBytes(wav.readShort()) == 1000
+            assert Short.reverseBytes(wav.readShort()) == -1000
+        finally:
+            wav.close()
+    finally:
+        output_file.delete()
+
+
+def _write_wav(wav_file, frequency, channels, data):
+    # __pragma__ ('skip')
+    from java.io import ByteArrayInputStream
+    from java.lang import String
+    from javax.sound.sampled import AudioFileFormat, AudioFormat
+    from javax.sound.sampled import AudioInputStream, AudioSystem
+    # __pragma__ ('noskip')
+    data = String(data).getBytes('ISO-8859-1')
+    audio_format = AudioFormat(frequency, 16, channels, True, False)
+    stream = AudioInputStream(ByteArrayInputStream(data), audio_format,
+                              len(data) // (2*channels))
+    AudioSystem.write(stream, AudioFileFormat.Type.WAVE, wav_file)
+
+
+def _is_shared(sound1, sound2):
+    # __pragma__ ('skip')
+    from java.lang import System
+    # __pragma__ ('noskip')
+    return ( System.identityHashCode(sound1._sound_object)
+             == System.identityHashCode(sound2._sound_object) )
+
+
+def test_mixer_sound_cache():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    from java.io import File
+    from pyj2d import Mixer as AudioMixer
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    mixer.set_output(None, False)
+    mixer.init(22050, -16, 2, 1024)
+    limit = AudioMixer.getSoundCacheLimit()
+    files = [File.createTempFile('mixer_test', '.wav') for i in range(3)]
+    try:
+        for wav_file in files:
+            _write_wav(wav_file, 22050.0, 2, '\xe8\x03\x18\xfc' * 1000)
+        paths = [str(wav_file.getPath()) for wav_file in files]
+        AudioMixer.clearSoundCache()
+        sound = mixer.Sound(paths[0])
+        assert AudioMixer.getSoundCacheSize() == 4000
+        assert _is_shared(mixer.Sound(paths[0]), sound)
+        assert AudioMixer.getSoundCacheSize() == 4000
+        AudioMixer.setSoundCacheLimit(8000)
+        sound1 = mixer.Sound(paths[1])
+        mixer.Sound(paths[0])
+        mixer.Sound(paths[2])
+        assert AudioMixer.getSoundCacheSize() == 8000
+        assert _is_shared(mixer.Sound(paths[0]), sound)
+        assert not _is_shared(mixer.Sound(paths[1]), sound1)
+    finally:
+        AudioMixer.setSoundCacheLimit(limit)
+        AudioMixer.clearSoundCache()
+        mixer.quit()
+        for wav_file in files:
+            wav_file.delete()
+
+
+def test_mixer_sound_convert():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    from java.io import File
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    mixer.set_output(None, False)
+    mixer.init(22050, -16, 2, 1024)
+    wav_file = File.createTempFile('mixer_test', '.wav')
+    try:
+        _write_wav(wav_file, 44100.0, 1, '\xe8\x03' * 4410)
+        sound = mixer.Sound(str(wav_file.getPath()))
+        assert round(sound.get_length(), 3) == 0.1
+        assert _frames(sound.get_raw()) == [1000] * (2205*2)
+    finally:
+        mixer.quit()
+        wav_file.delete()
+
+
+def test_mixer_sound_buffer():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    import jarray
+    from array import array
+    from java.nio import ByteBuffer
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    mixer.set_output(None, False)
+    mixer.init(22050, -16, 2, 1024)
+    try:
+        values = [1, -2, 3, -4] * 100
+        for buffer in (jarray.array(values, 'b'), array('b', values)):
+            sound = mixer.Sound(buffer=buffer)
+            raw = sound.get_raw()
+            assert list(raw) == values
+            raw[1] = 9
+            assert buffer[1] == -2
+            buffer[0] = 9
+            assert sound.get_raw()[0] == 9
+        data = jarray.array(values, 'b')
+        sound = mixer.Sound(buffer=ByteBuffer.wrap(data))
+        raw = sound.get_raw()
+        assert raw.isReadOnly()
+        assert raw.remaining() == len(values)
+        data[0] = 9
+        assert raw.get(0) == 9
+        assert round(sound.get_length(), 6) == round(400 / 88200.0, 6)
+    finally:
+        mixer.quit()
+
+
+def _square(amplitude, period, frames):
+    return [amplitude - 2*amplitude*((i//(period//2)) % 2)
+            for i in range(frames)]
+
+
+def _peak(samples):
+    return max([abs(v) for v in samples])
+
+
+def test_mixer_effect_filter():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    from java.io import ByteArrayOutputStream
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    output = ByteArrayOutputStream()
+    mixer.set_output(output, False)
+    mixer.init(22050, -16, 1, 1024)
+    try:
+        sound = mixer.Sound(buffer=_pcm(_square(10000, 10, 4410)))
+        channel = mixer.Channel(0)
+        channel.play(sound)
+        _wait(mixer)
+        channel.set_filter('lowpass', 200.0)
+        channel.play(sound)
+        _wait(mixer)
+    finally:
+        mixer.quit()
+    samples = _frames(output.toByteArray())
+    assert len(samples) == 4410 * 2
+    assert _peak(samples[3410:4410]) == 10000
+    assert _peak(samples[7820:8820]) < 1000
+
+
+def test_mixer_effect_limiter():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    from java.io import ByteArrayOutputStream
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    output = ByteArrayOutputStream()
+    mixer.set_output(output, True)
+    mixer.init(22050, -16, 1, 1024)
+    try:
+        sound = mixer.Sound(buffer=_pcm([30000, 15000, -30000, -15000] * 2205))
+        mixer.Channel(0).play(sound)
+        mixer.Channel(1).play(sound)
+        _wait(mixer)
+    finally:
+        mixer.quit()
+    samples = _frames(output.toByteArray())
+    assert _peak(samples) > 32000
+    for i in range(0, len(samples), 2):
+        #shape kept with gain change, not clipped
+        assert abs(samples[i] - 2*samples[i+1]) <= abs(samples[i]) // 100 + 2
+
+
+def test_mixer_effect_ducking():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    from java.io import ByteArrayOutputStream, File
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    music_file = File.createTempFile('mixer_test', '.wav')
+    output = ByteArrayOutputStream()
+    try:
+        _write_wav(music_file, 22050.0, 1, _pcm([10000] * 22050))
+        mixer.set_output(output, True)
+        mixer.init(22050, -16, 1, 1024)
+        try:
+            mixer.music.load(str(music_file.getPath()))
+            mixer.music.set_ducking(0.5)
+            channel = mixer.Channel(0)
+            channel.set_sidechain()
+            mixer.music.play()
+            pg.time.wait(200)
+            channel.play(mixer.Sound(buffer=_pcm(_square(8000, 10, 4410))))
+            while channel.get_busy():
+                pg.time.wait(1)
+            pg.time.wait(500)
+            mixer.music.stop()
+        finally:
+            mixer.quit()
+    finally:
+        music_file.delete()
+    samples = _frames(output.toByteArray())
+    levels = [sum(samples[i:i+500]) // 500
+              for i in range(0, len(samples)-499, 500)]
+    assert levels[0] == 10000
+    assert min(levels) < 5500
+    assert levels[-1] > 8000
+
+
+def test_mixer_effect_smoothing():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    # __pragma__ ('skip')
+    from java.io import ByteArrayOutputStream
+    # __pragma__ ('noskip')
+    mixer = pg.mixer
+    output = ByteArrayOutputStream()
+    mixer.set_output(output, True)
+    mixer.init(22050, -16, 1, 1024)
+    try:
+        channel = mixer.Channel(0)
+        channel.set_filter('lowpass', 8000.0)
+        channel.play(mixer.Sound(buffer=_pcm(_square(10000, 10, 22050))))
+        pg.time.wait(200)
+        channel.set_filter('lowpass', 200.0)
+        pg.time.wait(300)
+        channel.stop()
+    finally:
+        mixer.quit()
+    samples = _frames(output.toByteArray())
+    peaks = [_peak(samples[i:i+512])
+             for i in range(512, len(samples)-511, 512)]
+    start = peaks[0]
+    end = peaks[-1]
+    assert end < start // 10
+    assert len([p for p in peaks if end*2 < p < start*9//10]) >= 3
+    for i in range(1, len(peaks)):
+        assert peaks[i-1] - peaks[i] < start // 2
+
+
+def test_mixer_latency():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    mixer = pg.mixer
+    mixer.init(22050, -16, 2, 4096)
+    if not mixer.get_init():
+        #requires audio line
+        raise NotImplementedError
+    try:
+        buffer_time = mixer._bufferSize * 1000.0 / mixer._byteRate
+        sound = mixer.Sound(buffer='\x00\x01' * 22050)
+        sound.play(loops=-1)
+        underruns = [mixer.get_underruns()]
+        pg.time.wait(200)
+        latency, target = mixer.get_latency()
+        underruns.append(mixer.get_underruns())
+        mixer.set_low_latency(True)
+        pg.time.wait(200)
+        low_latency, low_target = mixer.get_latency()
+        underruns.append(mixer.get_underruns())
+        mixer.set_low_latency(False)
+        pg.time.wait(200)
+        latency_restored = mixer.get_latency()[0]
+        underruns.append(mixer.get_underruns())
+    finally:
+        mixer.set_low_latency(False)
+        mixer.quit()
+    assert latency > 0.0
+    assert round(target, 3) == round(buffer_time, 3)
+    assert 0.0 < low_latency < latency
+    assert low_latency <= buffer_time
+    assert low_target < target
+    assert latency_restored > low_latency
+    assert underruns[0] >= 0
+    for i in range(1, len(underruns)):
+        assert underruns[i] >= underruns[i-1]
@@ -7,7 +7,15 @@ def init(environ):
     env = environ
     pg = env['pg']
     tests = [test_sprite,
-             test_sprite_group]
+             test_sprite_group,
+             test_sprite_group_camera,
+             test_sprite_parallelgroup,
+             test_sprite_orderedupdates,
+             test_sprite_layeredupdates,
+             test_sprite_layeredupdates_index,
+             test_sprite_layereddirty,
+             test_sprite_layereddirty_camera,
+             test_sprite_groupcollide]
     return tests
 
 
@@ -104,3 +112,278 @@ def test_sprite_group():
             assert g.has([s[0],s[1],s[2]]) == r[2]
             assert g.has([s[2],s[5]],s[6]) == r[3]
 
+
+
+def test_sprite_group_camera():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    surface = env['surface']
+    s = []
+    for pos in ((105,5), (5,5)):
+        sprite = pg.sprite.Sprite()
+        sprite.image = pg.Surface((4,4))
+        sprite.image.fill((255,0,0))
+        sprite.rect = sprite.image.get_rect(topleft=pos)
+        s.append(sprite)
+    camera = pg.Rect(100,0,20,20)
+    for Group in (pg.sprite.Group, pg.sprite.RenderUpdates):
+        surface.fill((0,0,0))
+        grp = Group(s)
+        rects = grp.draw(surface, camera)
+        assert surface.get_at((6,6)).r == 255
+        if Group is pg.sprite.RenderUpdates:
+            assert len(rects) == 1
+            assert rects[0].x == 5 and rects[0].y == 5
+    camera.x = 0
+    surface.fill((0,0,0))
+    rects = grp.draw(surface, camera)
+    assert len(rects) == 1 and rects[0].x == 5
+
+
+def test_sprite_parallelgroup():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    class Spr(pg.sprite.Sprite):
+        def __init__(self):
+            pg.sprite.Sprite.__init__(self)
+            self.count = 0
+        def update(self, step):
+            if step < 0 and self.count:
+                raise ValueError
+            self.count += step
+    s = [Spr() for i in range(100)]
+    grp = pg.sprite.ParallelGroup(s, workers=4, threshold=10)
+    grp.update(2)
+    assert len(grp.get_update_times()) == 4
+    for sprite in s:
+        assert sprite.count == 2
+    try:
+        grp.update(-1)
+        assert False
+    except ValueError:
+        pass
+    grp = pg.sprite.ParallelGroup(s[:5], workers=4, threshold=10)
+    grp.update(1)
+    assert len(grp.get_update_times()) == 1
+    assert s[0].count == 3 and s[5].count == 2
+
+
+def test_sprite_orderedupdates():
+    Sprite = pg.sprite.Sprite
+    s = [Sprite() for i in range(200)]
+    grp = pg.sprite.OrderedUpdates(s)
+    for i in range(0, 200, 2):
+        grp.remove(s[i])
+    assert grp.sprites() == s[1::2]
+    grp.add(s[0])
+    assert grp.sprites()[-1] == s[0]
+    for sprite in grp:
+        if sprite is s[1]:
+            grp.remove(s[3])
+    assert len(grp) == 100
+    assert s[3] not in grp.sprites()
+    grp = pg.sprite.OrderedUpdates(s)
+    sprites = []
+    for sprite in grp:
+        if sprite is s[0]:
+            grp.remove(s[1:150])
+            grp.add(Sprite())
+            grp.remove(s[199])
+        sprites.append(sprite)
+    if env['platform'] != 'pc':    #pg iterates a copy of the sprites
+        assert len(sprites) == 50 and s[199] not in sprites
+
+
+def test_sprite_layeredupdates():
+    Sprite = pg.sprite.Sprite
+    s = [Sprite() for i in range(8)]
+    grp = pg.sprite.LayeredUpdates()
+    for i in range(8):
+        grp.add(s[i], layer=i%3)
+    assert grp.layers() == [0,1,2]
+    assert grp.sprites() == [s[0],s[3],s[6],s[1],s[4],s[7],s[2],s[5]]
+    assert grp.get_sprites_from_layer(1) == [s[1],s[4],s[7]]
+    grp.remove(s[3])
+    assert grp.sprites() == [s[0],s[6],s[1],s[4],s[7],s[2],s[5]]
+    grp.change_layer(s[0], 1)
+    assert grp.get_layer_of_sprite(s[0]) == 1
+    assert grp.sprites() == [s[6],s[1],s[4],s[7],s[0],s[2],s[5]]
+    grp.move_to_front(s[6])
+    assert grp.layers() == [1,2]
+    assert grp.get_top_sprite() == s[6]
+    grp.move_to_back(s[5])
+    assert grp.layers() == [0,1,2]
+    assert grp.get_sprite(0) == s[5]
+    grp.switch_layer(1, 2)
+    assert grp.sprites() == [s[5],s[2],s[6],s[1],s[4],s[7],s[0]]
+    assert grp.get_layer_of_sprite(s[2]) == 1
+    assert grp.remove_sprites_of_layer(2) == [s[1],s[4],s[7],s[0]]
+    assert grp.sprites() == [s[5],s[2],s[6]]
+    assert len(grp) == 3
+
+
+def test_sprite_layeredupdates_index():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    Sprite = pg.sprite.Sprite
+    grp = pg.sprite.LayeredUpdates()
+    for i in range(120):
+        sprite = Sprite()
+        size = 2 + (i%7)**3
+        sprite.rect = pg.Rect((i*37)%300-50, (i*53)%300-50, size, size)
+        grp.add(sprite, layer=i%5)
+    grp.set_index(True, 8)
+    for step in range(2):
+        for pos in ((0,0), (10,20), (-40,-40), (150,151), (260,90)):
+            sprites = [sprite for sprite in grp
+                       if sprite.rect.collidepoint(pos)]
+            assert grp.get_sprites_at(pos) == sprites
+            rect = pg.Rect(pos, (30,20))
+            sprites = [sprite for sprite in grp
+                       if sprite.rect.colliderect(rect)]
+            assert grp.get_sprites_in(rect) == sprites
+            sprites = grp.get_sprites_within(pos, 15)
+            for sprite in grp.get_sprites_in((pos[0]-5,pos[1]-5,10,10)):
+                assert sprite in sprites
+        for sprite in grp.sprites()[::3]:
+            sprite.rect.x += 40
+        grp.update()
+    sprite = grp.get_sprite(0)
+    grp.change_layer(sprite, 10)
+    sprite.rect.topleft = (500,500)
+    grp.update_index(sprite)
+    assert grp.get_sprites_at((501,501)) == [sprite]
+    grp.remove(sprite)
+    assert grp.get_sprites_at((501,501)) == []
+
+
+def test_sprite_layereddirty():
+    surface = env['surface']
+    background = pg.Surface(surface.get_size())
+    background.fill((0,0,0))
+    surface.fill((0,0,0))
+    s = []
+    for i in range(3):
+        sprite = pg.sprite.DirtySprite()
+        sprite.image = pg.Surface((4,4))
+        sprite.image.fill((255,0,0))
+        sprite.rect = sprite.image.get_rect(topleft=(i*6,0))
+        s.append(sprite)
+    grp = pg.sprite.LayeredDirty(s)
+    assert s[0].dirty == 1
+    grp.set_timing_treshold(1000)
+    grp._use_update = True
+    rects = grp.draw(surface, background)
+    assert len(rects) == 3
+    assert s[0].dirty == 0 and s[1].dirty == 0 and s[2].dirty == 0
+    assert surface.get_at((1,1)).r == 255
+    rects = grp.draw(surface)
+    assert len(rects) == 0
+    s[1].rect.x += 1
+    s[1].dirty = 1
+    rects = grp.draw(surface)
+    assert len(rects) == 1
+    assert rects[0].width == 5 and rects[0].height == 4
+    assert surface.get_at((6,1)).r == 0 and surface.get_at((7,1)).r == 255
+    s[2].visible = 0
+    assert s[2].dirty == 1
+    rects = grp.draw(surface)
+    assert len(rects) == 1
+    assert surface.get_at((13,1)).r == 0
+    s[0].dirty = 2
+    rects = grp.draw(surface)
+    assert len(rects) == 1 and s[0].dirty == 2
+    grp.remove(s[0])
+    rects = grp.draw(surface)
+    if env['platform'] == 'pc':    #pg reports removed sprite area twice
+        assert len(rects) == 2
+    else:
+        assert len(rects) == 1
+    s[2].rect.x = 8
+    s[2].visible = 1
+    grp.draw(surface)
+    grp.remove(s[1], s[2])
+    rects = grp.draw(surface)
+    if env['platform'] != 'pc':    #pg reports overlapping areas separately
+        assert len(rects) == 1
+        assert rects[0].x == 7 and rects[0].width == 5
+    assert surface.get_at((9,1)).r == 0
+
+
+def test_sprite_layereddirty_camera():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    surface = env['surface']
+    background = pg.Surface(surface.get_size())
+    background.fill((0,0,0))
+    surface.fill((0,0,0))
+    s = []
+    for pos in ((105,5), (12,12)):
+        sprite = pg.sprite.DirtySprite()
+        sprite.image = pg.Surface((4,4))
+        sprite.image.fill((255,0,0))
+        sprite.rect = sprite.image.get_rect(topleft=pos)
+        s.append(sprite)
+    grp = pg.sprite.LayeredDirty(s)
+    grp.set_timing_treshold(1000)
+    grp._use_update = True
+    camera = pg.Rect(100,0,20,20)
+    rects = grp.draw(surface, background, camera)
+    assert len(rects) == 1 and rects[0] == surface.get_rect()
+    assert surface.get_at((6,6)).r == 255 and surface.get_at((13,13)).r == 0
+    rects = grp.draw(surface, camera=camera)
+    assert len(rects) == 0
+    s[0].rect.x += 1
+    s[0].dirty = 1
+    rects = grp.draw(surface, camera=camera)
+    assert len(rects) == 1
+    assert rects[0].x == 5 and rects[0].width == 5
+    assert surface.get_at((5,6)).r == 0 and surface.get_at((9,6)).r == 255
+    s[0].rect.x = 150
+    s[0].dirty = 1
+    rects = grp.draw(surface, camera=camera)
+    assert len(rects) == 1 and rects[0].x == 6
+    assert surface.get_at((7,6)).r == 0
+    camera.x = 0
+    rects = grp.draw(surface, camera=camera)
+    assert len(rects) == 1 and rects[0] == surface.get_rect()
+    assert surface.get_at((13,13)).r == 255 and surface.get_at((7,6)).r == 0
+
+
+def test_sprite_groupcollide():
+    Sprite = pg.sprite.Sprite
+    grp1 = pg.sprite.Group()
+    grp2 = pg.sprite.Group()
+    for i in range(80):
+        sprite = Sprite()
+        sprite.rect = pg.Rect((i*37)%200, (i*53)%200, 5+(i%4)*10, 5+(i%3)*10)
+        if i % 2:
+            grp1.add(sprite)
+        else:
+            grp2.add(sprite)
+    for step in range(3):
+        for sprite in grp2:
+            sprite.rect.x += 3
+        for collided in (None, pg.sprite.collide_circle,
+                         pg.sprite.collide_rect_ratio(1.5),
+                         pg.sprite.collide_rect,
+                         pg.sprite.collide_rect_ratio(0.75)):
+            collide = pg.sprite.groupcollide(grp1, grp2, False, False, collided)
+            for sprite1 in grp1:
+                sprites = []
+                for sprite2 in grp2:
+                    if collided is None:
+                        if sprite1.rect.colliderect(sprite2.rect):
+                            sprites.append(sprite2)
+                    elif collided(sprite1, sprite2):
+                        sprites.append(sprite2)
+                if sprites:
+                    assert len(collide[sprite1]) == len(sprites)
+                    for sprite2 in sprites:
+                        assert sprite2 in collide[sprite1]
+                else:
+                    assert sprite1 not in collide
+    collide = pg.sprite.groupcollide(grp1, grp1, False, False)
+    assert len(collide) == len(grp1)
+    collide = pg.sprite.groupcollide(grp1, grp2, True, False)
+    assert len(grp1) == 40 - len(collide)
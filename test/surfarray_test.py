@@ -15,14 +15,21 @@ def init(environ):
              test_surfarray_make_surface,
              test_surfarray_array2d,
              test_surfarray_array3d,
-             test_surfarray_array_alpha]
+             test_surfarray_array_alpha,
+             test_surfarray_array_layout,
+             test_surfarray_array_ops,
+             test_surfarray_map_array,
+             test_surfarray_pixels2d,
+             test_surfarray_pixels3d,
+             test_surfarray_pixels_region,
+             test_surfarray_pixels_alpha]
     return tests
 
 
 def check_implemented():
     global implemented
     if env['platform'] in ['jvm', 'pc']:
-        #jvm uses jnumeric, pc uses numpy
+        #jvm uses jnumeric or ndarray, pc uses numpy
         try:
             surface = pg.Surface((1,1))
             pg.surfarray.array2d(surface)
@@ -150,3 +157,147 @@ def test_surfarray_array_alpha():
         assert array2[0,0] & 0xff == 255
         assert array2[1,0] & 0xff == 0
 
+
+def test_surfarray_array_layout():
+    if not implemented or env['platform'] == 'js':
+        raise NotImplementedError
+    surface = pg.Surface((15,10), pg.SRCALPHA)
+    surface.fill((0,0,0,255))
+    surface.set_at((3,7), (255,10,20,100))
+    array3d = pg.surfarray.array3d(surface)
+    assert array3d[3,7,0] == 255 and array3d[3,7,1] == 10
+    assert array3d[7,3,0] == 0
+    array_alpha = pg.surfarray.array_alpha(surface)
+    assert array_alpha[3,7] == 100 and array_alpha[7,3] == 255
+    array2d = pg.surfarray.array2d(surface)
+    surface2 = pg.Surface((15,10), pg.SRCALPHA)
+    pg.surfarray.blit_array(surface2, array2d)
+    assert surface2.get_at((3,7)) == (255,10,20,100)
+    assert surface2.get_at((7,3)) == (0,0,0,255)
+    surface2.fill((0,0,0,0))
+    pg.surfarray.blit_array(surface2, array3d)
+    assert surface2.get_at((3,7)) == (255,10,20,255)
+    assert surface2.get_at((7,3)) == (0,0,0,255)
+
+
+def test_surfarray_array_ops():
+    if not implemented or env['platform'] == 'js':
+        raise NotImplementedError
+    surface = pg.Surface((15,10))
+    surface.fill((100,20,6))
+    surface.set_at((3,7), (200,40,8))
+    array = pg.surfarray.array3d(surface)
+    array2 = (array // 2) + 1
+    assert array2[3,7,0] == 101 and array2[3,7,2] == 5
+    assert array2[7,3,1] == 11
+    array2 = array * [1,2,3]
+    assert array2[3,7,1] == 80 and array2[3,7,2] == 24
+    array2 = (array & 0xf0) >> 4
+    assert array2[3,7,0] == 12 and array2[3,7,2] == 0
+    array2 = array.transpose((1,0,2))
+    assert array2.shape == (10,15,3)
+    assert array2[7,3,0] == 200
+    array2 = array[2:5,6:8]
+    array2 += 10
+    assert array[3,7,0] == 210 and array[1,7,0] == 100
+    pg.surfarray.blit_array(surface, array)
+    assert surface.get_at((3,7)) == (210,50,18,255)
+
+
+def test_surfarray_map_array():
+    if not implemented or env['platform'] == 'js':
+        raise NotImplementedError
+    surface = pg.Surface((15,10))
+    surface.fill((0,0,0))
+    surface.set_at((3,7), (255,10,20))
+    array3d = pg.surfarray.array3d(surface)
+    array = pg.surfarray.map_array(surface, array3d)
+    assert array.shape == (15,10)
+    assert array[3,7] & 0xffffff == 0xff0a14
+    assert array[7,3] & 0xffffff == 0
+
+
+def test_surfarray_pixels2d():
+    if env['platform'] not in ['jvm', 'pc'] or not (
+            implemented or env['platform'] == 'jvm'):
+        raise NotImplementedError
+    surface = pg.Surface((15,10), pg.SRCALPHA)
+    surface.fill((0,0,0,255))
+    array = pg.surfarray.pixels2d(surface)
+    assert array.shape == (15,10)
+    assert array[1,2] & 0xffffff == 0
+    array[1,2] = 0x640000ff
+    assert surface.get_at((1,2)) == (0,0,255,100)
+    surface.set_at((3,4), (255,0,0,100))
+    assert array[3,4] == 0x64ff0000
+    subsurface = surface.subsurface((2,3,5,4))
+    subarray = pg.surfarray.pixels2d(subsurface)
+    assert subarray.shape == (5,4)
+    assert subarray[1,1] == array[3,4]
+    del subarray
+    del array
+
+
+def test_surfarray_pixels3d():
+    if env['platform'] not in ['jvm', 'pc'] or not (
+            implemented or env['platform'] == 'jvm'):
+        raise NotImplementedError
+    surface = pg.Surface((15,10), pg.SRCALPHA)
+    surface.fill((0,0,0,255))
+    array = pg.surfarray.pixels3d(surface)
+    assert array.shape == (15,10,3)
+    array[1,2] = (0,0,255)
+    assert surface.get_at((1,2)) == (0,0,255,255)
+    for i in range(10):
+        array[5,i,1] = 100
+    assert surface.get_at((5,9)) == (0,100,0,255)
+    surface.set_at((3,4), (255,0,10,255))
+    assert array[3,4,0] == 255 and array[3,4,1] == 0 and array[3,4,2] == 10
+    del array
+
+
+def test_surfarray_pixels_region():
+    if env['platform'] not in ['jvm', 'pc'] or not (
+            implemented or env['platform'] == 'jvm'):
+        raise NotImplementedError
+    surface = pg.Surface((15,10), pg.SRCALPHA)
+    surface.fill((0,0,0,255))
+    array = pg.surfarray.pixels3d(surface)
+    array[2:6, 1:9:2] = (10,20,30)
+    assert surface.get_at((2,1)) == (10,20,30,255)
+    assert surface.get_at((5,7)) == (10,20,30,255)
+    assert surface.get_at((5,8)) == (0,0,0,255)
+    assert surface.get_at((6,1)) == (0,0,0,255)
+    array[8:12, 1:9:2, 1] = array[2:6, 1:9:2, 2]
+    assert surface.get_at((11,7)) == (0,30,0,255)
+    region = array[8:12, 1:9:2]
+    assert region.shape == (4,4,3)
+    assert region[3,3,1] == 30 and region[3,3,2] == 0
+    array2d = pg.surfarray.pixels2d(surface)
+    array2d[::-3, 9] = 0x640000ff
+    assert surface.get_at((14,9)) == (0,0,255,100)
+    assert surface.get_at((2,9)) == (0,0,255,100)
+    assert surface.get_at((1,9)) == (0,0,0,255)
+    del region
+    del array2d
+    del array
+
+
+def test_surfarray_pixels_alpha():
+    if env['platform'] not in ['jvm', 'pc'] or not (
+            implemented or env['platform'] == 'jvm'):
+        raise NotImplementedError
+    surface = pg.Surface((15,10), pg.SRCALPHA)
+    surface.fill((255,0,0,255))
+    array = pg.surfarray.pixels_alpha(surface)
+    assert array.shape == (15,10)
+    assert array[1,2] == 255
+    array[1,2] = 100
+    assert surface.get_at((1,2)) == (255,0,0,100)
+    del array
+    surface = pg.Surface((15,10))
+    try:
+        pg.surfarray.pixels_alpha(surface)
+        assert False
+    except ValueError:
+        pass
@@ -15,7 +15,12 @@ def init(environ):
     tests = [test_transform_rotate,
              test_transform_rotozoom,
              test_transform_scale,
-             test_transform_flip]
+             test_transform_flip,
+             test_transform_scale2x,
+             test_transform_rotationcache,
+             test_transform_dest,
+             test_transform_quality,
+             test_transform_batch]
     return tests
 
 
@@ -63,3 +68,134 @@ def test_transform_flip():
     assert surf.get_size() == (width, height)    # __:opov
     assert surf.get_at((5,5)).r == 0 and surf.get_at((width-5,5)).r == 255
 
+
+
+def test_transform_scale2x():
+    surf = pg.Surface((2,2))
+    surf.fill((255,0,0))
+    surf.set_at((1,1), (0,0,0))
+    surf = pg.transform.scale2x(surf)
+    assert surf.get_size() == (4,4)    # __:opov
+    assert surf.get_at((2,2)).r == 255 and surf.get_at((3,2)).r == 0
+    assert surf.get_at((2,3)).r == 0 and surf.get_at((3,3)).r == 0
+    assert surf.get_at((1,1)).r == 255 and surf.get_at((1,3)).r == 255
+
+
+def test_transform_rotationcache():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    surface.fill((0,0,0))
+    surface.fill((255,0,0), (0,0,width//2,height))
+    cache = pg.transform.RotationCache(step=90)
+    surf = cache.rotate(surface, 181)
+    assert surf.get_size() == (width, height)    # __:opov
+    assert surf.get_at((5,5)).r == 0 and surf.get_at((width-5,5)).r == 255
+    assert cache.rotate(surface, 179) is surf
+    assert cache.rotate(surface, -180) is surf
+    assert len(cache) == 1 and cache.get_bytes() == width*height*4
+    surf = cache.rotozoom(surface, 180, 2.0)
+    assert int(surf.get_width()/width) == 2 and int(surf.get_height()/height) == 2
+    assert len(cache) == 2
+    cache.clear(surface)
+    assert len(cache) == 0 and cache.get_bytes() == 0
+    cache.pregenerate(surface).join()
+    assert len(cache) == 4
+    cache = pg.transform.RotationCache(step=90, max_bytes=width*height*4*2)
+    cache.pregenerate(surface).join()
+    assert len(cache) == 2 and cache.get_bytes() <= width*height*4*2
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_transform_dest():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    surface.fill((0,0,0))
+    surface.fill((255,0,0), (0,0,width//2,height))
+    dest = pg.Surface((width*3, height*3), pg.SRCALPHA)
+    dest.fill((0,255,0,255))
+    surf = pg.transform.rotate(surface, 180, dest)
+    assert surf.get_size() == (width, height)    # __:opov
+    assert surf.get_parent() is dest
+    assert surf.get_at((5,5)).r == 0 and surf.get_at((width-5,5)).r == 255
+    surf = pg.transform.rotate(surface, 45, dest)
+    assert surf.get_parent() is dest
+    assert surf.get_at((0,0)).a == 0
+    surf = pg.transform.rotozoom(surface, 180, 2.0, dest)
+    assert surf.get_parent() is dest
+    assert surf.get_at((5,5)).r == 0 and surf.get_at((width*2-5,5)).r == 255
+    dest = pg.Surface((width, height), pg.SRCALPHA)
+    surf = pg.transform.flip(surface, True, True, dest)
+    assert surf is dest
+    assert surf.get_at((5,5)).r == 0 and surf.get_at((width-5,5)).r == 255
+    surf = pg.transform.flip(surface, False, False, dest)
+    assert surf is dest and surf.get_at((5,5)).r == 255
+    source = pg.Surface((8,4), pg.SRCALPHA)
+    source.fill((10,20,30,100))
+    source.set_at((0,0), (200,100,50,7))
+    dest = pg.Surface((12,8), pg.SRCALPHA)
+    surf = pg.transform.flip(source, True, True, dest)
+    assert surf.get_parent() is dest
+    assert surf.get_at((7,3)) == (200,100,50,7)    # __:opov
+    assert surf.get_at((0,0)) == (10,20,30,100)    # __:opov
+    dest = pg.Surface((width//2, height//2), pg.SRCALPHA)
+    surf = pg.transform.rotate(surface, 180, dest)
+    assert surf is not dest and surf.get_size() == (width, height)    # __:opov
+
+
+def test_transform_quality():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    assert pg.transform.get_quality() == 'balanced'
+    surf = pg.Surface((8,8))
+    surf.fill((0,0,0))
+    for x in range(0,8,2):
+        surf.fill((255,0,0), (x,0,1,8))
+    surf_scaled = pg.transform.scale(surf, (16,16), quality='fast')
+    assert surf_scaled.get_at((0,0)).r == 255 and surf_scaled.get_at((1,0)).r == 255
+    assert surf_scaled.get_at((2,0)).r == 0 and surf_scaled.get_at((3,0)).r == 0
+    surf_scaled = pg.transform.smoothscale(surf, (2,2), quality='quality')
+    assert surf_scaled.get_size() == (2,2)    # __:opov
+    assert abs(surf_scaled.get_at((0,0)).r - 127) < 16
+    pg.transform.set_quality('fast')
+    assert pg.transform.get_quality() == 'fast'
+    assert pg.draw.get_quality() == 'fast'
+    pg.transform.set_quality('balanced')
+    try:
+        pg.transform.set_quality('none')
+        assert False
+    except ValueError:
+        pass
+
+
+def test_transform_batch():
+    if env['platform'] != 'jvm':
+        raise NotImplementedError
+    surface.fill((0,0,0))
+    surface.fill((255,0,0), (0,0,width//2,height))
+    jobs = []
+    for i in range(20):
+        jobs.append((pg.transform.rotate, surface, 180))
+        jobs.append((pg.transform.scale, surface, (width+i, height)))
+        jobs.append((pg.transform.flip, surface, True, False))
+    surfs = pg.transform.batch(jobs, workers=4)
+    assert len(surfs) == len(jobs)
+    for i in range(20):
+        surf = surfs[i*3]
+        assert surf.get_size() == (width, height)    # __:opov
+        assert surf.get_at((5,5)).r == 0 and surf.get_at((width-5,5)).r == 255
+        assert surfs[i*3+1].get_size() == (width+i, height)    # __:opov
+        surf = surfs[i*3+2]
+        assert surf.get_at((5,5)).r == 0 and surf.get_at((width-5,5)).r == 255
+    futures = pg.transform.batch(jobs[:3], workers=2, wait=False)
+    assert futures[1].get().get_size() == (width, height)    # __:opov
+    surfs = pg.transform.batch(jobs[:3], workers=1)
+    assert surfs[1].get_size() == (width, height)    # __:opov
+    nested = [(pg.transform.batch, jobs[:3], 5)] * 8
+    for surfs in pg.transform.batch(nested, workers=4):
+        assert surfs[1].get_size() == (width, height)    # __:opov
+    try:
+        pg.transform.batch([(pg.transform.scale, surface)], workers=2)
+        assert False
+    except TypeError:
+        pass